@@ -4,8 +4,8 @@ from flask_babel import Babel, _
 from dotenv import load_dotenv
 import os
 
-from .models import UserModel, SeasonModel
 from .extensions import db, login_manager
+from .identity import identity_cache, current_season
 
 # 🌍 Initialize Babel
 babel = Babel()
@@ -18,15 +18,28 @@ def create_app():
     app.config['SQLALCHEMY_DATABASE_URI'] = os.environ['DATABASE_URL']
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 
+    # 🧮 Tournament matrix storage backend: "rows" or "bitmap" (see app/matrix_store.py)
+    app.config['MATRIX_STORAGE'] = os.environ.get('MATRIX_STORAGE', 'rows')
+
+    # 📄 Player report PDFs: "weasyprint" (HTML templates) or "reportlab" (app/exports/pdf_reports.py)
+    app.config['PDF_ENGINE'] = os.environ.get('PDF_ENGINE', 'weasyprint')
+
+    # 🏷️ Release token for conditional GET ETags (app/conditional.py): a deploy must not 304 old pages.
+    # Defaults to a hash of the app's files, so every worker and host of one deploy agrees on it
+    from .conditional import source_fingerprint
+    app.config['RELEASE'] = os.environ.get('RELEASE') or source_fingerprint(app.root_path)
+
     # 🌐 Babel config
     app.config['BABEL_DEFAULT_LOCALE'] = 'en'
     app.config['BABEL_TRANSLATION_DIRECTORIES'] = 'translations'
     app.config['LANGUAGES'] = ['en', 'pt']
 
-    # 🔐 Login manager
+    # 🔐 Login manager (user rows come from the per-worker identity cache, app/identity.py)
+    identity_cache.init_app(app)
+
     @login_manager.user_loader
     def load_user(user_id):
-        return UserModel.query.get(int(user_id))
+        return identity_cache.load_user(int(user_id))
 
     db.init_app(app)
     login_manager.init_app(app)
@@ -56,12 +69,7 @@ def create_app():
 
     @app.context_processor
     def inject_current_season():
-        season_id = session.get('season_id')
-        if not season_id or not getattr(current_user, 'is_authenticated', False):
-            return dict(current_season=None)
-
-        season = SeasonModel.query.filter_by(id=season_id, user_id=current_user.id).first()
-        return dict(current_season=season)
+        return dict(current_season=current_season())
 
     # 🧩 Register Blueprints (after globals/context are set)
     from .players.routes import players_bp
@@ -82,4 +90,41 @@ def create_app():
     app.register_blueprint(export_bp)
     app.register_blueprint(season_bp)
 
+    # 📦 Fingerprinted/precompressed static assets (flask assets build)
+    from .assets import init_assets
+    init_assets(app)
+
+    # 🗃️ Rendered export cache, keyed by the season's data version (app/export_cache.py)
+    from .export_cache import export_cache
+    export_cache.init_app(app)
+
+    # 📊 Dashboard/history aggregates, keyed by the season's data version (app/aggregate_cache.py)
+    from .aggregate_cache import aggregate_cache
+    aggregate_cache.init_app(app)
+
+    # 🧾 Background PDF export jobs (app/export_jobs.py)
+    from .export_jobs import export_jobs
+    export_jobs.init_app(app)
+
+    # ⏱️ Per-request SQL count/time (Server-Timing) and N+1 detection in debug/testing
+    from .sql_instrumentation import sql_instrumentation
+    sql_instrumentation.init_app(app)
+
+    # 📈 Prometheus /metrics (app/metrics.py; multi-worker via PROMETHEUS_MULTIPROC_DIR)
+    from .metrics import init_metrics
+    init_metrics(app)
+
+    # 🔬 On-demand cProfile of single requests (X-Profile: 1), see app/profiler.py
+    from .profiler import init_profiler
+    init_profiler(app)
+
+    # 🗜️ On-the-fly Brotli/gzip for HTML, CSV and JSON responses
+    from .compression import CompressionMiddleware
+    app.config.setdefault('COMPRESS_MIN_SIZE', int(os.environ.get('COMPRESS_MIN_SIZE', 500)))
+    app.wsgi_app = CompressionMiddleware(app.wsgi_app, min_size=app.config['COMPRESS_MIN_SIZE'])
+
+    # 🛠️ CLI commands (flask migrate-links, ...)
+    from .commands import register_commands
+    register_commands(app)
+
     return app
\ No newline at end of file
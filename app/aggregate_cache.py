@@ -0,0 +1,195 @@
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+from flask import current_app
+
+from .data_version import data_version
+from .metrics import count_cache_lookup
+from .profiler import is_profiling
+
+# Cache for season aggregates (dashboard totals, player history counts,
+# tournament matrix summaries): plain Python data, computed once per season
+# data version and shared by every viewer.
+#
+# Keys include data_version(season_id), which every write route bumps in
+# the same transaction as its change, so a read after a write always
+# recomputes; nothing has to be deleted. Old versions simply stop being
+# asked for and leave through LRU/TTL.
+#
+# AGGREGATE_CACHE = "memory" (per worker LRU + TTL), "disk" (files in
+# AGGREGATE_CACHE_DIR, shared by all workers on the host) or "none".
+
+
+class MemoryBackend:
+    """In-process LRU with a TTL."""
+
+    def __init__(self, max_entries, ttl):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class DiskBackend:
+    """Pickled entries in a directory shared by all workers; mtime drives TTL and LRU."""
+
+    def __init__(self, directory, max_entries, ttl):
+        self.directory = directory
+        self.max_entries = max_entries
+        self.ttl = ttl
+
+    def _path(self, key):
+        return os.path.join(self.directory, key)
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            if os.path.getmtime(path) < time.time() - self.ttl:
+                return None
+            with open(path, 'rb') as f:
+                value = pickle.load(f)
+        except (FileNotFoundError, EOFError, pickle.UnpicklingError):
+            return None
+        return value
+
+    def set(self, key, value):
+        os.makedirs(self.directory, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.directory, prefix='.tmp-')
+        with os.fdopen(fd, 'wb') as f:
+            pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, self._path(key))
+        self._evict()
+
+    def _entries(self):
+        try:
+            return [e for e in os.scandir(self.directory) if e.is_file() and not e.name.startswith('.')]
+        except FileNotFoundError:
+            return []
+
+    def _evict(self):
+        entries = self._entries()
+        if len(entries) <= self.max_entries:
+            return
+        entries.sort(key=lambda e: e.stat().st_mtime)
+        for entry in entries[:len(entries) - self.max_entries]:
+            try:
+                os.remove(entry.path)
+            except FileNotFoundError:
+                pass  # another worker evicted it first
+
+    def clear(self):
+        for entry in self._entries():
+            os.remove(entry.path)
+
+    def __len__(self):
+        return len(self._entries())
+
+
+class AggregateCache:
+
+    def __init__(self, app=None):
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('AGGREGATE_CACHE', os.environ.get('AGGREGATE_CACHE', 'memory'))
+        app.config.setdefault('AGGREGATE_CACHE_TTL', int(os.environ.get('AGGREGATE_CACHE_TTL', 3600)))
+        app.config.setdefault('AGGREGATE_CACHE_SIZE', int(os.environ.get('AGGREGATE_CACHE_SIZE', 1024)))
+        app.config.setdefault('AGGREGATE_CACHE_DIR', os.environ.get(
+            'AGGREGATE_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'team-manager-aggregates')))
+
+        config = app.config
+        if config['AGGREGATE_CACHE'] == 'memory':
+            backend = MemoryBackend(config['AGGREGATE_CACHE_SIZE'], config['AGGREGATE_CACHE_TTL'])
+        elif config['AGGREGATE_CACHE'] == 'disk':
+            backend = DiskBackend(config['AGGREGATE_CACHE_DIR'], config['AGGREGATE_CACHE_SIZE'],
+                                  config['AGGREGATE_CACHE_TTL'])
+        elif config['AGGREGATE_CACHE'] == 'none':
+            backend = None
+        else:
+            raise ValueError(f"Unknown AGGREGATE_CACHE backend '{config['AGGREGATE_CACHE']}'")
+        app.extensions['aggregate_cache'] = backend
+
+    @property
+    def backend(self):
+        return current_app.extensions['aggregate_cache']
+
+    def _count(self, counter):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+        count_cache_lookup('aggregate', counter)
+
+    def key(self, kind, user_id, season_id, params=None):
+        payload = json.dumps(
+            [kind, user_id, season_id, data_version(season_id), params or {}],
+            sort_keys=True, default=str,
+        )
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def get_or_compute(self, kind, user_id, season_id, compute, params=None):
+        """Cached ``compute()`` for the season's current data version.
+
+        ``compute`` must return picklable plain data (no ORM instances).
+        """
+        backend = self.backend
+        if backend is None or is_profiling():
+            return compute()
+
+        key = self.key(kind, user_id, season_id, params)
+        value = backend.get(key)
+        if value is not None:
+            self._count('hits')
+            return value
+        self._count('misses')
+        value = compute()
+        backend.set(key, value)
+        return value
+
+    def clear(self):
+        if self.backend is not None:
+            self.backend.clear()
+
+    def stats(self):
+        return {
+            'backend': current_app.config['AGGREGATE_CACHE'],
+            'hits': self.hits,
+            'misses': self.misses,
+            'entries': len(self.backend) if self.backend is not None else 0,
+        }
+
+
+aggregate_cache = AggregateCache()
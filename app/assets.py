@@ -0,0 +1,172 @@
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import shutil
+import urllib.request
+
+import click
+from flask import current_app, request, send_from_directory, url_for
+from flask.cli import AppGroup
+
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    BROTLI_AVAILABLE = False
+
+try:
+    import zopfli.gzip
+    ZOPFLI_AVAILABLE = True
+except ImportError:
+    ZOPFLI_AVAILABLE = False
+
+# Third-party files vendored into static/vendor by `flask assets build`.
+# Until a build has run, templates fall back to these CDN URLs.
+VENDOR_ASSETS = {
+    'vendor/bootstrap.min.css': 'https://cdn.jsdelivr.net/npm/bootstrap@5.3.3/dist/css/bootstrap.min.css',
+    'vendor/bootstrap.bundle.min.js': 'https://cdn.jsdelivr.net/npm/bootstrap@5.3.3/dist/js/bootstrap.bundle.min.js',
+    'vendor/chart.umd.js': 'https://cdn.jsdelivr.net/npm/chart.js@4.4.1/dist/chart.umd.js',
+}
+
+# Local files that get fingerprinted alongside the vendored ones
+LOCAL_ASSETS = [
+    'static.css',
+    'icons/favicon.svg',
+    'icons/team-manager-icon.svg',
+    'manifest.webmanifest',
+]
+
+DIST_DIR = 'dist'
+MANIFEST_FILE = 'manifest.json'
+COMPRESSIBLE = ('.css', '.js', '.svg', '.webmanifest', '.json')
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+
+assets_cli = AppGroup('assets', help='Build fingerprinted, precompressed static assets.')
+
+
+def _static_dir(app=None):
+    return os.path.join((app or current_app).root_path, 'static')
+
+
+def _hashed_name(name, data):
+    base, ext = os.path.splitext(name)
+    return f"{base}.{hashlib.sha256(data).hexdigest()[:10]}{ext}"
+
+
+def _write_variants(path, data):
+    """Write ``path`` plus Brotli (.br) and gzip (.gz) variants when worthwhile."""
+    with open(path, 'wb') as f:
+        f.write(data)
+    if not path.endswith(COMPRESSIBLE):
+        return
+
+    if BROTLI_AVAILABLE:
+        with open(path + '.br', 'wb') as f:
+            f.write(brotli.compress(data, quality=11))
+    gz = zopfli.gzip.compress(data) if ZOPFLI_AVAILABLE else gzip.compress(data, compresslevel=9)
+    with open(path + '.gz', 'wb') as f:
+        f.write(gz)
+
+
+@assets_cli.command('build')
+@click.option('--offline', is_flag=True, help="Reuse already vendored files instead of downloading.")
+def build_assets(offline):
+    """Vendor CDN files, fingerprint all assets and precompress them."""
+    static_dir = _static_dir()
+
+    for name, url in VENDOR_ASSETS.items():
+        target = os.path.join(static_dir, name)
+        if offline and os.path.exists(target):
+            continue
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        click.echo(f"⬇️ {url}")
+        with urllib.request.urlopen(url, timeout=30) as response, open(target, 'wb') as f:
+            shutil.copyfileobj(response, f)
+
+    dist_dir = os.path.join(static_dir, DIST_DIR)
+    shutil.rmtree(dist_dir, ignore_errors=True)
+
+    manifest = {}
+    for name in list(VENDOR_ASSETS) + LOCAL_ASSETS:
+        with open(os.path.join(static_dir, name), 'rb') as f:
+            data = f.read()
+        hashed = _hashed_name(name, data)
+        target = os.path.join(dist_dir, hashed)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        _write_variants(target, data)
+        manifest[name] = hashed
+        click.echo(f"📦 {name} → {DIST_DIR}/{hashed}")
+
+    with open(os.path.join(dist_dir, MANIFEST_FILE), 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    click.echo(f"✅ Built {len(manifest)} assets")
+
+
+def load_manifest(app):
+    path = os.path.join(_static_dir(app), DIST_DIR, MANIFEST_FILE)
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def asset_url(filename):
+    """Like ``url_for('static', filename=...)``, but resolves fingerprinted names.
+
+    Vendored files fall back to their CDN URL until ``flask assets build`` has run.
+    """
+    if filename in current_app.config['ASSET_MANIFEST']:
+        return url_for('static', filename=filename)
+    if filename in VENDOR_ASSETS:
+        return VENDOR_ASSETS[filename]
+    return url_for('static', filename=filename)
+
+
+def asset_version():
+    """Short fingerprint of the current build (used to version service-worker caches)."""
+    manifest = current_app.config['ASSET_MANIFEST']
+    if not manifest:
+        return 'dev'
+    return hashlib.sha256(json.dumps(manifest, sort_keys=True).encode()).hexdigest()[:10]
+
+
+def send_static(filename):
+    """Static handler: serve .br/.gz variants when accepted; hashed files are immutable."""
+    static_dir = _static_dir()
+    hashed = filename.startswith(DIST_DIR + '/')
+
+    for encoding, suffix in (('br', '.br'), ('gzip', '.gz')):
+        if request.accept_encodings[encoding] and os.path.isfile(os.path.join(static_dir, filename + suffix)):
+            response = send_from_directory(static_dir, filename + suffix,
+                                           mimetype=_mimetype(filename), max_age=IMMUTABLE_MAX_AGE if hashed else None)
+            response.headers['Content-Encoding'] = encoding
+            break
+    else:
+        response = send_from_directory(static_dir, filename, max_age=IMMUTABLE_MAX_AGE if hashed else None)
+
+    response.headers['Vary'] = 'Accept-Encoding'
+    if hashed:
+        response.headers['Cache-Control'] = f'public, max-age={IMMUTABLE_MAX_AGE}, immutable'
+    return response
+
+
+def _mimetype(filename):
+    if filename.endswith('.webmanifest'):
+        return 'application/manifest+json'
+    return mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+
+
+def init_assets(app):
+    app.config['ASSET_MANIFEST'] = load_manifest(app)
+
+    # url_for('static', filename='static.css') → static/dist/static.<hash>.css
+    @app.url_defaults
+    def fingerprint_static(endpoint, values):
+        if endpoint == 'static' and values.get('filename') in app.config['ASSET_MANIFEST']:
+            values['filename'] = f"{DIST_DIR}/{app.config['ASSET_MANIFEST'][values['filename']]}"
+
+    app.view_functions['static'] = send_static
+    app.jinja_env.globals['asset_url'] = asset_url
+    app.cli.add_command(assets_cli)
@@ -3,6 +3,7 @@ from flask_login import login_user, logout_user, login_required
 from werkzeug.security import generate_password_hash, check_password_hash
 from app.models import UserModel, SeasonModel
 from app.extensions import db
+from app.identity import identity_cache
 
 auth_bp = Blueprint('auth', __name__, url_prefix='/auth')
 
@@ -14,6 +15,7 @@ def login():
         user = UserModel.query.filter_by(email=email).first()
 
         if user and check_password_hash(user.password_hash, password):
+            identity_cache.invalidate_user(user.id)
             login_user(user)
 
             # ✅ Restore last selected season (or fall back to newest season)
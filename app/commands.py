@@ -0,0 +1,277 @@
+import os
+
+import click
+from flask.cli import with_appcontext
+
+from .extensions import db
+
+
+@click.command('migrate-links')
+@with_appcontext
+def migrate_links_command():
+    """Create the association tables and backfill them from the TEXT columns."""
+    from .roster import backfill_links
+
+    db.create_all()
+    registers, tournaments = backfill_links()
+    click.echo(f"✅ Linked {registers} practice registers and {tournaments} tournaments")
+
+
+@click.command('rebuild-aggregates')
+@click.option('--check', is_flag=True, help="Only verify the table, don't rebuild it.")
+@with_appcontext
+def rebuild_aggregates_command(check):
+    """Rebuild player_season_aggregate from scratch and verify it against a full recompute."""
+    from .stats import rebuild_aggregates, verify_aggregates
+
+    if not check:
+        db.create_all()
+        written = rebuild_aggregates()
+        click.echo(f"🔁 Rebuilt {written} player season aggregates")
+
+    mismatches = verify_aggregates()
+    for player_id, season_id, stored, expected in mismatches:
+        click.echo(f"❌ player {player_id} season {season_id}: stored {stored} expected {expected}")
+    if mismatches:
+        raise click.ClickException(f"{len(mismatches)} aggregate rows differ from a full recompute")
+    click.echo("✅ Aggregates match a full recompute")
+
+
+@click.command('convert-matrix')
+@click.argument('target', type=click.Choice(['rows', 'bitmap']))
+@with_appcontext
+def convert_matrix_command(target):
+    """Move every tournament matrix into the TARGET storage backend."""
+    from .matrix_store import convert_matrix
+    from .models import TournamentModel
+
+    db.create_all()
+    converted = convert_matrix(target, TournamentModel.query.order_by(TournamentModel.id).all())
+    db.session.commit()
+    click.echo(f"✅ Converted {converted} tournament matrices to '{target}' storage")
+    click.echo(f"ℹ️ Set MATRIX_STORAGE={target} before restarting the app")
+
+
+@click.command('migrate-matrix-key')
+@with_appcontext
+def migrate_matrix_key_command():
+    """Remove duplicate matrix cells and add the unique (tournament, opponent, period, player) key."""
+    from .matrix_store import add_matrix_unique_key
+
+    removed = add_matrix_unique_key()
+    db.session.commit()
+    click.echo(f"✅ Removed {removed} duplicate matrix cells; unique key in place")
+
+
+@click.command('bench-pdf')
+@click.option('--players', default='20,100,500', show_default=True, help="Comma-separated roster sizes.")
+@click.option('--repeat', default=3, show_default=True, help="Timed runs per case (best is reported).")
+@with_appcontext
+def bench_pdf_command(players, repeat):
+    """Compare WeasyPrint and ReportLab render time/memory for the player PDFs on synthetic rosters."""
+    import time
+    import tracemalloc
+    from datetime import date, datetime
+    from types import SimpleNamespace
+
+    from flask import current_app, render_template
+    from .exports import routes as exports
+    from .exports.pdf_reports import render_player_report, render_players_summary
+
+    def roster(n):
+        return [SimpleNamespace(
+            name=f"Player {i:03d}", alias=f"P{i}", escalao="Sub-10", n_carteira=str(10000 + i),
+            dob=date(2015, 1 + i % 12, 1 + i % 28), mobile_phone="910000000", email=f"player{i}@example.com",
+        ) for i in range(n)]
+
+    def enriched(players):
+        return [dict(vars(p), practice_minutes=1200, game_minutes=240, total_practices=20, total_games=10,
+                     behavior="Focused and respectful " * 4, technical_skills="Good dribbling " * 4,
+                     team_relation="Supportive", improvement_areas="Left hand finishing") for p in players]
+
+    logo_path = os.path.join(current_app.root_path, "static", "logo_illiabum.jpg")
+    logo_data = exports.encode_image_base64(logo_path)
+    now = datetime.now()
+
+    def engines(n):
+        players = roster(n)
+        cases = {
+            'reportlab': {
+                'report': lambda: render_player_report(enriched(players), "2024/2025", logo_path),
+                'summary': lambda: render_players_summary(players, "2024/2025", now, logo_path),
+            },
+        }
+        if exports.WEASYPRINT_AVAILABLE:
+            cases['weasyprint'] = {
+                'report': lambda: exports.HTML(string=render_template(
+                    "player_pdf.html", players=enriched(players), logo_data=logo_data, season_name="2024/2025"
+                )).write_pdf(),
+                'summary': lambda: exports.HTML(string=render_template(
+                    "players_summary.html", players=players, logo_data=logo_data, season_name="2024/2025", now=now
+                )).write_pdf(),
+            }
+        return cases
+
+    if not exports.WEASYPRINT_AVAILABLE:
+        click.echo("⚠️ WeasyPrint not available - benchmarking ReportLab only")
+
+    click.echo(f"{'players':>7}  {'engine':<10} {'pdf':<8} {'seconds':>8} {'peak MiB':>9} {'size KiB':>9}")
+    for n in [int(v) for v in players.split(',')]:
+        for engine, reports in engines(n).items():
+            for report, render in reports.items():
+                best = float('inf')
+                for _ in range(repeat):
+                    started = time.perf_counter()
+                    pdf = render()
+                    best = min(best, time.perf_counter() - started)
+
+                # Separate run: tracing slows rendering down too much to time it
+                tracemalloc.start()
+                render()
+                peak = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+
+                click.echo(f"{n:>7}  {engine:<10} {report:<8} {best:>8.2f} {peak / 2**20:>9.1f} {len(pdf) / 1024:>9.0f}")
+
+
+@click.command('season-export')
+@click.argument('season_id', type=int)
+@click.option('-o', '--output', type=click.Path(dir_okay=False), help="File to write (default: stdout).")
+@click.option('--compress', type=click.Choice(['none', 'gzip', 'zstd']), default='gzip', show_default=True)
+@with_appcontext
+def season_export_command(season_id, output, compress):
+    """Write SEASON_ID as an NDJSON season archive."""
+    from .models import SeasonModel
+    from .season_archive import iter_season_archive, compress_stream
+
+    season = db.session.get(SeasonModel, season_id)
+    if season is None:
+        raise click.ClickException(f"Season {season_id} not found")
+
+    stream = open(output, 'wb') if output else click.get_binary_stream('stdout')
+    try:
+        for chunk in compress_stream(iter_season_archive(season.user_id, season.id), compress):
+            stream.write(chunk)
+    except ValueError as exc:
+        raise click.ClickException(str(exc))
+    finally:
+        if output:
+            stream.close()
+    if output:
+        click.echo(f"✅ Wrote season '{season.name}' to {output}", err=True)
+
+
+@click.command('season-import')
+@click.argument('archive', type=click.File('rb'))
+@click.option('--user', 'user', required=True, help="Username, email or id of the account to import into.")
+@click.option('--name', help="Name for the new season (default: the archived one).")
+@with_appcontext
+def season_import_command(archive, user, name):
+    """Load an NDJSON season ARCHIVE (optionally gzip/zstd) as a new season."""
+    import time
+    from .models import UserModel
+    from .season_archive import open_archive, import_season_archive
+
+    account = UserModel.query.filter(db.or_(
+        UserModel.username == user,
+        UserModel.email == user,
+        UserModel.id == (int(user) if user.isdigit() else None),
+    )).first()
+    if account is None:
+        raise click.ClickException(f"User '{user}' not found")
+
+    started = time.perf_counter()
+    try:
+        season, counts = import_season_archive(open_archive(archive), account.id, name=name)
+        db.session.commit()
+    except (ValueError, UnicodeDecodeError, OSError, EOFError) as exc:
+        db.session.rollback()
+        raise click.ClickException(str(exc))
+
+    rows = sum(counts.values())
+    click.echo(f"✅ Imported {rows} records as season {season.id} '{season.name}' "
+               f"in {time.perf_counter() - started:.1f}s")
+    for record_type, count in counts.items():
+        click.echo(f"   {record_type:<20} {count:>8}")
+
+
+@click.command('season-rollover')
+@click.argument('season_ids', type=int, nargs=-1, required=True)
+@click.option('--name', required=True, help="Name of the new seasons (e.g. 2025/2026).")
+@click.option('--year', default='', help="Year of the new seasons.")
+@click.option('--exercises/--no-exercises', default=True, show_default=True, help="Copy the exercise library.")
+@click.option('--evaluations', is_flag=True, help="Copy each player's last evaluation.")
+@with_appcontext
+def season_rollover_command(season_ids, name, year, exercises, evaluations):
+    """Start a new season for each of SEASON_IDS, copying players (and more), in one transaction."""
+    from .models import SeasonModel
+    from .rollover import rollover_season
+
+    entities = ['players'] + ['exercises'] * exercises + ['evaluations'] * evaluations
+    sources = SeasonModel.query.filter(SeasonModel.id.in_(season_ids)).all()
+    missing = set(season_ids) - {s.id for s in sources}
+    if missing:
+        raise click.ClickException(f"Seasons not found: {', '.join(map(str, sorted(missing)))}")
+
+    for source in sources:
+        target = SeasonModel(user_id=source.user_id, name=name, year=year)
+        db.session.add(target)
+        db.session.flush()
+        summary = rollover_season(source.user_id, source.id, target.id, entities)
+        copied = ", ".join(f"{count} {entity}" for entity, count in summary.items())
+        click.echo(f"🔁 Season {source.id} '{source.name}' → {target.id} '{name}': {copied}")
+    db.session.commit()
+    click.echo(f"✅ Rolled over {len(sources)} seasons")
+
+
+@click.command('migrate-indexes')
+@with_appcontext
+def migrate_indexes_command():
+    """Create the indexes declared on the models that the database is missing."""
+    from .query_plans import create_missing_indexes
+
+    created = create_missing_indexes()
+    db.session.commit()
+    for name in created:
+        click.echo(f"➕ {name}")
+    click.echo(f"✅ Created {len(created)} missing indexes")
+
+
+@click.command('check-query-plans')
+@click.option('--users', default=50, show_default=True, help="Accounts to seed (2 seasons of data each).")
+@click.option('--verbose', '-v', is_flag=True, help="Print every plan.")
+@with_appcontext
+def check_query_plans_command(users, verbose):
+    """Seed throwaway data, EXPLAIN the hot queries and fail if any reads a whole table. Rolls back."""
+    from .query_plans import check_hot_queries, seed_plan_dataset
+
+    try:
+        results = check_hot_queries(seed_plan_dataset(users=users))
+    finally:
+        db.session.rollback()
+
+    failures = 0
+    for name, (plan, scans) in results.items():
+        if scans:
+            failures += 1
+            click.echo(f"❌ {name}: full scan of {', '.join(sorted(scans))}")
+        else:
+            click.echo(f"✅ {name}")
+        if verbose or scans:
+            for line in plan:
+                click.echo(f"     {line}")
+    if failures:
+        raise click.ClickException(f"{failures} hot queries fall back to a sequential scan (run `flask migrate-indexes`?)")
+
+
+def register_commands(app):
+    app.cli.add_command(migrate_links_command)
+    app.cli.add_command(rebuild_aggregates_command)
+    app.cli.add_command(convert_matrix_command)
+    app.cli.add_command(migrate_matrix_key_command)
+    app.cli.add_command(bench_pdf_command)
+    app.cli.add_command(season_export_command)
+    app.cli.add_command(season_import_command)
+    app.cli.add_command(season_rollover_command)
+    app.cli.add_command(migrate_indexes_command)
+    app.cli.add_command(check_query_plans_command)
@@ -0,0 +1,187 @@
+import zlib
+
+from werkzeug.http import parse_accept_header
+
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    BROTLI_AVAILABLE = False
+
+# Text responses worth compressing on the fly (PDFs/images are already compressed)
+DEFAULT_MIMETYPES = (
+    'text/html',
+    'text/csv',
+    'text/plain',
+    'text/css',
+    'text/javascript',
+    'application/javascript',
+    'application/json',
+    'application/manifest+json',
+    'image/svg+xml',
+)
+
+
+class _GzipStream:
+    def __init__(self, level):
+        self._z = zlib.compressobj(level, zlib.DEFLATED, 31)  # 31 → gzip container
+
+    def process(self, data):
+        return self._z.compress(data)
+
+    def flush(self):
+        return self._z.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        return self._z.flush()
+
+
+class _BrotliStream:
+    def __init__(self, quality):
+        self._b = brotli.Compressor(quality=quality)
+
+    def process(self, data):
+        return self._b.process(data)
+
+    def flush(self):
+        return self._b.flush()
+
+    def finish(self):
+        return self._b.finish()
+
+
+class CompressionMiddleware:
+    """WSGI middleware compressing eligible responses with Brotli or gzip.
+
+    - Negotiates ``Accept-Encoding`` (Brotli preferred when installed).
+    - Only compresses allowlisted content types, skips responses that already
+      carry a ``Content-Encoding`` (e.g. precompressed static files) and
+      anything smaller than ``min_size`` bytes.
+    - Streams: bodies are compressed chunk by chunk and flushed every
+      ``flush_size`` input bytes, so generator responses stay incremental.
+    """
+
+    def __init__(self, app, min_size=500, mimetypes=DEFAULT_MIMETYPES,
+                 gzip_level=6, brotli_quality=4, flush_size=16 * 1024):
+        self.app = app
+        self.min_size = min_size
+        self.mimetypes = frozenset(mimetypes)
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.flush_size = flush_size
+
+    def __call__(self, environ, start_response):
+        encoding = self._negotiate(environ.get('HTTP_ACCEPT_ENCODING', ''))
+        if encoding is None or environ.get('REQUEST_METHOD') == 'HEAD' or 'HTTP_RANGE' in environ:
+            return self.app(environ, start_response)
+
+        state = {}
+
+        def capture_start_response(status, headers, exc_info=None):
+            if exc_info and state.get('started'):
+                raise exc_info[1].with_traceback(exc_info[2])
+            state.update(status=status, headers=headers, exc_info=exc_info)
+            return self._write_unsupported
+
+        app_iter = self.app(environ, capture_start_response)
+        return self._respond(app_iter, state, encoding, start_response)
+
+    @staticmethod
+    def _write_unsupported(data):
+        raise RuntimeError('CompressionMiddleware does not support the WSGI write() callable')
+
+    def _negotiate(self, accept_encoding):
+        accepted = parse_accept_header(accept_encoding)
+        if BROTLI_AVAILABLE and accepted['br']:
+            return 'br'
+        if accepted['gzip']:
+            return 'gzip'
+        return None
+
+    def _eligible(self, status, headers):
+        code = int(status.split(' ', 1)[0])
+        if code < 200 or code in (204, 206, 304):
+            return False
+
+        values = {}
+        for name, value in headers:
+            values[name.lower()] = value
+        if 'content-encoding' in values:
+            return False
+        if 'no-transform' in values.get('cache-control', ''):
+            return False
+        mimetype = values.get('content-type', '').split(';', 1)[0].strip().lower()
+        if mimetype not in self.mimetypes:
+            return False
+        length = values.get('content-length')
+        if length is not None and length.isdigit() and int(length) < self.min_size:
+            return False
+        return True
+
+    def _start(self, start_response, state, encoding=None):
+        headers = state['headers']
+        if encoding:
+            vary = [v for n, v in headers if n.lower() == 'vary']
+            headers = [
+                (n, f'W/{v}' if n.lower() == 'etag' and not v.startswith('W/') else v)
+                for n, v in headers
+                if n.lower() not in ('content-length', 'vary')
+            ]
+            headers.append(('Content-Encoding', encoding))
+            headers.append(('Vary', ', '.join(vary + ['Accept-Encoding'])))
+        state['started'] = True
+        start_response(state['status'], headers, state.get('exc_info'))
+
+    def _compressor(self, encoding):
+        if encoding == 'br':
+            return _BrotliStream(self.brotli_quality)
+        return _GzipStream(self.gzip_level)
+
+    def _respond(self, app_iter, state, encoding, start_response):
+        try:
+            chunks = iter(app_iter)
+            decided = False
+            pending, size = [], 0
+            compressor = None
+            unflushed = 0
+
+            for chunk in chunks:
+                if not chunk:
+                    continue
+                if not decided:
+                    # Headers are known once the first body chunk exists
+                    decided = True
+                    if not self._eligible(state['status'], state['headers']):
+                        self._start(start_response, state)
+                        yield chunk
+                        yield from chunks
+                        return
+
+                if compressor is None:
+                    pending.append(chunk)
+                    size += len(chunk)
+                    if size < self.min_size:
+                        continue
+                    compressor = self._compressor(encoding)
+                    self._start(start_response, state, encoding)
+                    chunk = b''.join(pending)
+                    pending = None
+
+                out = compressor.process(chunk)
+                unflushed += len(chunk)
+                if unflushed >= self.flush_size:
+                    out += compressor.flush()
+                    unflushed = 0
+                if out:
+                    yield out
+
+            if compressor is None:
+                # Empty, ineligible or below the threshold: send as-is
+                self._start(start_response, state)
+                if pending:
+                    yield b''.join(pending)
+            else:
+                yield compressor.finish()
+        finally:
+            if hasattr(app_iter, 'close'):
+                app_iter.close()
@@ -0,0 +1,78 @@
+import hashlib
+import json
+import os
+from functools import wraps
+
+from flask import current_app, make_response, request, session
+from flask_babel import get_locale
+from flask_login import current_user
+
+from .data_version import data_version
+from .profiler import is_profiling
+
+# Conditional GET for season pages.
+#
+# A page's HTML depends on who asks, which season is selected, the
+# season's data (its version, bumped by every write) and the locale.
+# @conditional_get hashes those into a weak ETag and answers a matching
+# If-None-Match with 304 after a single primary-key query, before the view
+# runs any of its own. No Last-Modified is sent: a date alone can't tell a
+# locale switch or a deploy apart, so validation is on the ETag only.
+#
+# Only decorate views whose output is fully determined by those inputs:
+# season-scoped, read-only GETs. Nothing that depends on the clock (e.g. a
+# "last N weeks" default window). Pending flash messages are part of the
+# tag too, and so is RELEASE, so a deploy with new templates never
+# answers 304 with an old page. RELEASE defaults to a hash of the app's
+# files, identical in every worker and host running the same code.
+
+
+def source_fingerprint(root):
+    """Hash of every file under ``root`` (code, templates, static, translations)."""
+    digest = hashlib.sha256()
+    for directory, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(d for d in dirnames if d != '__pycache__' and not d.startswith('.'))
+        for name in sorted(filenames):
+            if name.startswith('.') or name.endswith('.pyc'):
+                continue
+            path = os.path.join(directory, name)
+            digest.update(os.path.relpath(path, root).encode())
+            with open(path, 'rb') as f:
+                digest.update(hashlib.sha256(f.read()).digest())
+    return digest.hexdigest()[:12]
+
+
+def _etag(season_id, version):
+    payload = json.dumps([
+        current_app.config['RELEASE'],
+        current_user.get_id(),
+        season_id,
+        version,
+        str(get_locale()),
+        request.full_path,
+        session.get('_flashes'),  # pending flash messages show up on the page
+    ])
+    return hashlib.sha256(payload.encode()).hexdigest()[:32]
+
+
+def conditional_get(view):
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        season_id = session.get('season_id')
+        if (request.method not in ('GET', 'HEAD') or not season_id or not current_user.is_authenticated
+                or is_profiling()):
+            return view(*args, **kwargs)
+
+        etag = _etag(season_id, data_version(season_id))
+
+        if request.if_none_match.contains_weak(etag):
+            response = current_app.response_class(status=304)
+        else:
+            response = make_response(view(*args, **kwargs))
+            if response.status_code != 200:
+                return response
+
+        response.set_etag(etag, weak=True)
+        response.headers['Cache-Control'] = 'private, no-cache'
+        return response
+    return wrapper
@@ -0,0 +1,51 @@
+from datetime import datetime
+
+from flask import g, has_app_context
+from sqlalchemy.dialects import postgresql, sqlite
+
+from .extensions import db
+from .models import SeasonDataVersionModel
+
+# Every route that writes season data calls bump_data_version() before its
+# commit, so the new version lands in the same transaction as the change.
+# Anything derived from a season's data (export cache entries, ...) keys on
+# data_version() and goes stale automatically.
+
+
+def data_version(season_id):
+    """Current data version of the season (0 if never written); read once per request."""
+    versions = g.setdefault('data_versions', {}) if has_app_context() else {}
+    if season_id not in versions:
+        version = db.session.query(SeasonDataVersionModel.version).filter_by(season_id=season_id).scalar()
+        versions[season_id] = version or 0
+    return versions[season_id]
+
+
+def bump_data_version(season_id):
+    """Increment the season's data version. Does not commit."""
+    if not season_id:
+        return
+    if has_app_context():
+        g.setdefault('data_versions', {}).pop(season_id, None)
+
+    dialects = {'postgresql': postgresql, 'sqlite': sqlite}
+    dialect = dialects.get(db.session.get_bind().dialect.name)
+    if dialect is None:
+        row = db.session.get(SeasonDataVersionModel, season_id)
+        if row is None:
+            db.session.add(SeasonDataVersionModel(season_id=season_id, version=1))
+        else:
+            row.version += 1
+        return
+
+    stmt = dialect.insert(SeasonDataVersionModel).values(
+        season_id=season_id, version=1, updated_at=datetime.utcnow()
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=['season_id'],
+        set_={
+            'version': SeasonDataVersionModel.version + 1,
+            'updated_at': stmt.excluded.updated_at,
+        },
+    )
+    db.session.execute(stmt)
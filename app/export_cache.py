@@ -0,0 +1,146 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from io import BytesIO
+
+from flask import current_app, request, send_file
+from flask_babel import get_locale
+
+from .data_version import data_version
+from .metrics import count_cache_lookup, observe_pdf
+from .profiler import is_profiling
+
+# Content-addressed cache for rendered exports.
+#
+# The key hashes the export kind, its parameters, the owner, the locale and
+# the season's data version, so any write to the season makes old entries
+# unreachable; they age out through LRU eviction. The key doubles as the
+# ETag, which lets a client's If-None-Match be answered before anything is
+# queried or rendered.
+#
+# Entries live as files in EXPORT_CACHE_DIR, bounded by EXPORT_CACHE_MAX_BYTES
+# (mtime is refreshed on every hit, eviction removes the oldest first).
+
+
+class ExportCache:
+
+    def __init__(self, app=None):
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('EXPORT_CACHE_DIR', os.environ.get(
+            'EXPORT_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'team-manager-exports')))
+        app.config.setdefault('EXPORT_CACHE_MAX_BYTES', int(os.environ.get(
+            'EXPORT_CACHE_MAX_BYTES', 200 * 1024 * 1024)))
+        app.extensions['export_cache'] = self
+
+    @property
+    def directory(self):
+        return current_app.config['EXPORT_CACHE_DIR']
+
+    def key(self, kind, user_id, season_id, params=None):
+        payload = json.dumps(
+            [kind, user_id, season_id, data_version(season_id), str(get_locale()), params or {}],
+            sort_keys=True, default=str,
+        )
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, key)
+
+    def _count(self, counter):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+        count_cache_lookup('export', counter)
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+            os.utime(path)  # LRU: most recently used
+        except FileNotFoundError:
+            self._count('misses')
+            return None
+        self._count('hits')
+        return data
+
+    def put(self, key, data):
+        os.makedirs(self.directory, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.directory, prefix='.tmp-')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp, self._path(key))
+        self._evict()
+
+    def _entries(self):
+        try:
+            entries = [e for e in os.scandir(self.directory) if e.is_file() and not e.name.startswith('.')]
+        except FileNotFoundError:
+            return []
+        return [(e.stat().st_mtime, e.stat().st_size, e.path) for e in entries]
+
+    def _evict(self):
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        limit = current_app.config['EXPORT_CACHE_MAX_BYTES']
+        for _, size, path in entries:
+            if total <= limit:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass  # another worker evicted it first
+            total -= size
+
+    def clear(self):
+        for _, _, path in self._entries():
+            os.remove(path)
+
+    def stats(self):
+        entries = self._entries()
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'not_modified': self.not_modified,
+            'entries': len(entries),
+            'bytes': sum(size for _, size, _ in entries),
+        }
+
+    def send(self, key, render, mimetype, download_name):
+        """Serve the export for ``key``: 304 if the client has it, else cached or freshly rendered bytes.
+
+        ``render`` is only called on a miss and must return the file's bytes.
+        """
+        if request.if_none_match.contains_weak(key) and not is_profiling():
+            self._count('not_modified')
+            response = current_app.response_class(status=304)
+            state = 'not-modified'
+        else:
+            data = None if is_profiling() else self.get(key)
+            state = 'hit'
+            if data is None:
+                started = time.perf_counter()
+                data = render()
+                if mimetype == 'application/pdf':
+                    observe_pdf(request.endpoint, time.perf_counter() - started, len(data))
+                self.put(key, data)
+                state = 'miss'
+            response = send_file(BytesIO(data), mimetype=mimetype,
+                                 download_name=download_name, as_attachment=True)
+
+        response.set_etag(key)
+        response.headers['Cache-Control'] = 'private, no-cache'
+        response.headers['X-Export-Cache'] = state
+        return response
+
+
+export_cache = ExportCache()
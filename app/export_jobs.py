@@ -0,0 +1,234 @@
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime, timedelta
+
+from .export_cache import export_cache
+from .metrics import observe_pdf
+from .extensions import db
+from .models import ExportJobModel
+
+try:
+    from weasyprint import HTML
+    WEASYPRINT_AVAILABLE = True
+except (ImportError, OSError):
+    WEASYPRINT_AVAILABLE = False
+
+# Background rendering for WeasyPrint exports.
+#
+# The export_job table is the queue. A request renders the template (cheap),
+# stores the HTML as a "queued" job and returns straight away. Dispatcher
+# threads claim queued jobs and hand the HTML to a process pool for
+# write_pdf(), so the CPU-heavy part never runs on a request thread. Any web
+# process can pick up any job; no broker is needed.
+#
+# EXPORT_JOB_WORKERS = pool size per web process, default 1 (0 renders in the
+# dispatcher thread itself, handy for development). Every gunicorn worker
+# has its own pool, so a host runs WEB_CONCURRENCY × EXPORT_JOB_WORKERS
+# renderer processes; pool processes are only spawned once a job arrives.
+# gunicorn.conf.py starts the dispatchers in post_fork so jobs queued
+# before a worker restart are picked up without waiting for a request.
+# Idle dispatchers poll every EXPORT_JOB_POLL_INTERVAL seconds (a read);
+# expiring stuck and old jobs is a write, done at most once per
+# EXPORT_JOB_HOUSEKEEPING_INTERVAL per process.
+#
+# Batch exports (many PDFs for one response) use render_many(), backed by a
+# separate pool of EXPORT_BATCH_WORKERS processes per web process (default
+# 2). With gunicorn that is WEB_CONCURRENCY × (EXPORT_JOB_WORKERS +
+# EXPORT_BATCH_WORKERS) WeasyPrint processes per host at most, each with its
+# own copy of the renderer; raise it only where cores outnumber web workers.
+
+
+def render_pdf(html):
+    """HTML → PDF bytes. Runs in a pool process."""
+    return HTML(string=html).write_pdf()
+
+
+class ExportJobRunner:
+
+    def __init__(self, app=None):
+        self.app = None
+        self._pid = None
+        self._pool = None
+        self._batch_pool = None
+        self._batch_pid = None
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._next_housekeeping = 0
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('EXPORT_JOB_WORKERS', int(os.environ.get('EXPORT_JOB_WORKERS', 1)))
+        app.config.setdefault('EXPORT_JOB_TIMEOUT', 600)         # seconds before a render is given up
+        app.config.setdefault('EXPORT_JOB_RETENTION', 24 * 3600)  # seconds finished jobs are kept
+        app.config.setdefault('EXPORT_JOB_POLL_INTERVAL', 5)
+        app.config.setdefault('EXPORT_JOB_HOUSEKEEPING_INTERVAL', 600)
+        app.config.setdefault('EXPORT_BATCH_WORKERS', int(os.environ.get('EXPORT_BATCH_WORKERS', 2)))
+        app.extensions['export_jobs'] = self
+        self.app = app
+
+    def enqueue(self, user_id, season_id, kind, filename, html, cache_key=None, cached=False):
+        """Store a queued job (commits) and wake a dispatcher.
+
+        With ``cached`` (an export cache hit on ``cache_key``) the job is stored
+        as already done; its bytes stay in the export cache only.
+        """
+        job = ExportJobModel(
+            user_id=user_id,
+            season_id=season_id,
+            kind=kind,
+            filename=filename,
+            cache_key=cache_key,
+        )
+        if cached:
+            job.status, job.finished_at = 'done', datetime.utcnow()
+        else:
+            job.status, job.html = 'queued', html
+        db.session.add(job)
+        db.session.commit()
+
+        if not cached:
+            self.start()
+            self._wakeup.set()
+        return job
+
+    def start(self):
+        """Start this process's dispatchers (again after a fork: threads don't survive it)."""
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            workers = self.app.config['EXPORT_JOB_WORKERS']
+            self._pool = self._new_pool() if workers > 0 else None
+            for i in range(max(workers, 1)):
+                threading.Thread(target=self._dispatch, name=f'export-job-{i}', daemon=True).start()
+
+    def _new_pool(self, workers=None):
+        # spawn, not fork: forking a multi-threaded web process is unsafe
+        return ProcessPoolExecutor(
+            workers or self.app.config['EXPORT_JOB_WORKERS'],
+            mp_context=multiprocessing.get_context('spawn'),
+        )
+
+    def _get_batch_pool(self):
+        workers = self.app.config['EXPORT_BATCH_WORKERS']
+        if workers <= 0:
+            return None
+        with self._lock:
+            if self._batch_pid != os.getpid():
+                self._batch_pid = os.getpid()
+                self._batch_pool = self._new_pool(workers)
+            return self._batch_pool
+
+    def render_many(self, calls):
+        """Run ``fn(*args)`` for each ``(key, fn, args)`` in the batch pool.
+
+        ``fn`` must be a module-level function. Yields ``(key, result)`` in
+        completion order; a failed call yields its exception as the result.
+        """
+        pool = self._get_batch_pool()
+        if pool is None:
+            for key, fn, args in calls:
+                try:
+                    yield key, fn(*args)
+                except Exception as exc:
+                    yield key, exc
+            return
+
+        try:
+            futures = {pool.submit(fn, *args): key for key, fn, args in calls}
+        except BrokenProcessPool:
+            with self._lock:
+                self._batch_pid = None  # recreated on the next batch
+            raise
+        for future in as_completed(futures):
+            exc = future.exception()
+            if isinstance(exc, BrokenProcessPool):
+                with self._lock:
+                    self._batch_pid = None
+            yield futures[future], exc if exc is not None else future.result()
+
+    def _dispatch(self):
+        while True:
+            with self.app.app_context():
+                try:
+                    job_id = self._claim()
+                    if job_id is not None:
+                        self._run(job_id)
+                except Exception:
+                    self.app.logger.exception("Export job dispatcher error")
+                    db.session.rollback()
+                    job_id = None
+
+            if job_id is None:
+                self._wakeup.wait(self.app.config['EXPORT_JOB_POLL_INTERVAL'])
+                self._wakeup.clear()
+
+    def _claim(self):
+        """Atomically move the oldest queued job to running. Returns its id or None."""
+        while True:
+            job_id = db.session.query(ExportJobModel.id).filter_by(
+                status='queued'
+            ).order_by(ExportJobModel.id).limit(1).scalar()
+            if job_id is None:
+                self._housekeeping()
+                return None
+
+            claimed = ExportJobModel.query.filter_by(id=job_id, status='queued').update(
+                {'status': 'running', 'started_at': datetime.utcnow()}, synchronize_session=False
+            )
+            db.session.commit()
+            if claimed:
+                return job_id
+            # Another dispatcher got it first: try the next one
+
+    def _housekeeping(self):
+        config = self.app.config
+        with self._lock:
+            if time.monotonic() < self._next_housekeeping:
+                return
+            self._next_housekeeping = time.monotonic() + config['EXPORT_JOB_HOUSEKEEPING_INTERVAL']
+        now = datetime.utcnow()
+
+        # A render whose process died never reports back
+        ExportJobModel.query.filter(
+            ExportJobModel.status == 'running',
+            ExportJobModel.started_at < now - timedelta(seconds=config['EXPORT_JOB_TIMEOUT']),
+        ).update({'status': 'failed', 'error': 'Timed out', 'html': None, 'finished_at': now},
+                 synchronize_session=False)
+
+        ExportJobModel.query.filter(
+            ExportJobModel.created_at < now - timedelta(seconds=config['EXPORT_JOB_RETENTION'])
+        ).delete(synchronize_session=False)
+        db.session.commit()
+
+    def _run(self, job_id):
+        job = db.session.get(ExportJobModel, job_id)
+        started = time.perf_counter()
+        try:
+            if self._pool is None:
+                pdf = render_pdf(job.html)
+            else:
+                future = self._pool.submit(render_pdf, job.html)
+                pdf = future.result(timeout=self.app.config['EXPORT_JOB_TIMEOUT'])
+        except BrokenProcessPool:
+            self._pool = self._new_pool()
+            job.status, job.error = 'failed', "Renderer process crashed"
+        except Exception as exc:
+            job.status, job.error = 'failed', str(exc) or exc.__class__.__name__
+        else:
+            job.status, job.result = 'done', pdf
+            observe_pdf(f'export_jobs.{job.kind}', time.perf_counter() - started, len(pdf))
+            if job.cache_key:
+                export_cache.put(job.cache_key, pdf)
+
+        job.html = None
+        job.finished_at = datetime.utcnow()
+        db.session.commit()
+
+
+export_jobs = ExportJobRunner()
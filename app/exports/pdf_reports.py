@@ -0,0 +1,174 @@
+from io import BytesIO
+from xml.sax.saxutils import escape
+
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4, landscape
+from reportlab.lib.styles import ParagraphStyle
+from reportlab.lib.units import cm
+from reportlab.pdfgen import canvas
+from reportlab.platypus import (
+    SimpleDocTemplate, Paragraph, Table, TableStyle, Image, Spacer, PageBreak, KeepTogether,
+)
+from reportlab.lib.utils import ImageReader
+
+# ReportLab Platypus versions of player_pdf.html and players_summary.html.
+# They take the same data the templates get and need no GTK libraries.
+
+NAVY = colors.HexColor('#003366')
+
+# CSS px → pt (1px = 1/96 in, 1pt = 1/72 in), for sizes taken from the templates
+PX = 0.75
+
+TITLE = ParagraphStyle('title', fontName='Helvetica-Bold', fontSize=20, leading=24, textColor=NAVY)
+SUBTITLE = ParagraphStyle('subtitle', fontName='Helvetica-Bold', fontSize=12, leading=16)
+SECTION = ParagraphStyle('section', fontName='Helvetica-Bold', fontSize=14, leading=17, textColor=colors.white)
+BODY = ParagraphStyle('body', fontName='Helvetica', fontSize=12, leading=17)
+CELL = ParagraphStyle('cell', fontName='Helvetica', fontSize=9, leading=11)
+HEAD_CELL = ParagraphStyle('head_cell', parent=CELL, fontName='Helvetica-Bold', textColor=colors.white)
+SUMMARY_TITLE = ParagraphStyle('summary_title', fontName='Helvetica-Bold', fontSize=18, leading=22, textColor=NAVY)
+
+
+def _text(value):
+    # Same output as Jinja's {{ value }}, escaped for Paragraph markup
+    return escape(str(value))
+
+
+def _logo(logo_path, height):
+    if not logo_path:
+        return None
+    width, h = ImageReader(logo_path).getSize()
+    return Image(logo_path, width=width * height / h, height=height)
+
+
+def _header(logo_path, logo_height, *lines):
+    """Logo next to the title lines, underlined like the templates' <header>."""
+    logo = _logo(logo_path, logo_height)
+    cells = [[logo, list(lines)]] if logo else [[list(lines)]]
+    widths = [logo.drawWidth + 0.5 * cm, None] if logo else [None]
+    table = Table(cells, colWidths=widths, hAlign='LEFT')
+    table.setStyle(TableStyle([
+        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+        ('LEFTPADDING', (0, 0), (-1, -1), 0),
+        ('LINEBELOW', (0, 0), (-1, -1), 2, NAVY),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
+    ]))
+    return table
+
+
+def _section(title, rows):
+    data = [[Paragraph(title, SECTION)]]
+    data += [[Paragraph(f"<b>{label}:</b> {_text(value)}", BODY)] for label, value in rows]
+    table = Table(data, colWidths=['100%'])
+    table.setStyle(TableStyle([
+        ('BOX', (0, 0), (-1, -1), 1, colors.black),
+        ('BACKGROUND', (0, 0), (-1, 0), NAVY),
+        ('LEFTPADDING', (0, 0), (-1, -1), 12),
+        ('RIGHTPADDING', (0, 0), (-1, -1), 12),
+        ('TOPPADDING', (0, 1), (-1, 1), 10),
+        ('BOTTOMPADDING', (0, -1), (-1, -1), 10),
+    ]))
+    return KeepTogether([table, Spacer(1, 0.7 * cm)])
+
+
+def render_player_report(players, season_name, logo_path=None):
+    """Player evaluation pages (one per enriched player dict) → PDF bytes."""
+    buffer = BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=A4, title="Player Evaluation",
+                            leftMargin=2 * cm, rightMargin=2 * cm, topMargin=2 * cm, bottomMargin=2 * cm)
+
+    story = []
+    for i, player in enumerate(players):
+        if i:
+            story.append(PageBreak())
+        story.append(_header(
+            logo_path, 80 * PX,  # player_pdf.html: .logo { height: 80px }
+            Paragraph("Player Evaluation", TITLE),
+            Paragraph(f"{_text(player['name'])} – {_text(season_name)}", SUBTITLE),
+        ))
+        story.append(Spacer(1, 0.5 * cm))
+        story.append(_section("Personal Info", [
+            ("Alias", player['alias']),
+            ("Escalão", player['escalao']),
+            ("Carteira Nº", player['n_carteira']),
+            ("Date of Birth", player['dob']),
+            ("Phone", player['mobile_phone']),
+            ("Email", player['email']),
+        ]))
+        story.append(_section("Season Stats", [
+            ("Minutes Practiced", player['practice_minutes']),
+            ("Minutes Played", player['game_minutes']),
+            ("Total Practices", player['total_practices']),
+            ("Total Games", player['total_games']),
+        ]))
+        story.append(_section("Coach Evaluation", [
+            ("Behavior", player['behavior']),
+            ("Technical Skills", player['technical_skills']),
+            ("Team Relation", player['team_relation']),
+            ("Improvement Areas", player['improvement_areas']),
+        ]))
+
+    doc.build(story)
+    return buffer.getvalue()
+
+
+class _FooterCanvas(canvas.Canvas):
+    """Canvas that holds pages back so the footer can say "Page X of Y"."""
+
+    footer_text = ""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._pages = []
+
+    def showPage(self):
+        self._pages.append(dict(self.__dict__))
+        self._startPage()
+
+    def save(self):
+        total = len(self._pages)
+        for number, page in enumerate(self._pages, start=1):
+            self.__dict__.update(page)
+            width, _ = self._pagesize
+            self.setStrokeColor(colors.HexColor('#cccccc'))
+            self.line(2 * cm, 1.6 * cm, width - 2 * cm, 1.6 * cm)
+            self.setFont('Helvetica', 9)
+            self.setFillColor(colors.HexColor('#555555'))
+            self.drawCentredString(width / 2, 1.1 * cm, f"{self.footer_text} – Page {number} of {total}")
+            super().showPage()
+        super().save()
+
+
+def render_players_summary(players, season_name, now, logo_path=None):
+    """Roster table (PlayerModel rows, already sorted) → landscape PDF bytes."""
+    buffer = BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=landscape(A4), title="Team Roster",
+                            leftMargin=2 * cm, rightMargin=2 * cm, topMargin=2 * cm, bottomMargin=2 * cm)
+
+    columns = ["Escalão", "Nº Carteira", "Alias", "Name", "DOB", "Phone", "Email"]
+    rows = [[Paragraph(c, HEAD_CELL) for c in columns]]
+    for p in players:
+        rows.append([
+            Paragraph(_text(value), CELL)
+            for value in (p.escalao, p.n_carteira, p.alias, p.name, p.dob, p.mobile_phone, p.email)
+        ])
+
+    table = Table(rows, repeatRows=1, colWidths=[2.5 * cm, 2.8 * cm, 3 * cm, 5.5 * cm, 2.7 * cm, 3 * cm, None])
+    table.setStyle(TableStyle([
+        ('GRID', (0, 0), (-1, -1), 1, colors.HexColor('#999999')),
+        ('BACKGROUND', (0, 0), (-1, 0), NAVY),
+        ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+        ('TOPPADDING', (0, 0), (-1, -1), 4),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 4),
+    ]))
+
+    story = [
+        _header(logo_path, 60 * PX, Paragraph(f"Team Roster – {_text(season_name)}", SUMMARY_TITLE)),  # .logo: 60px
+        Spacer(1, 0.5 * cm),
+        table,
+    ]
+
+    footer_canvas = type('_RosterCanvas', (_FooterCanvas,), {
+        'footer_text': f"Printed on {now.strftime('%Y-%m-%d')}",
+    })
+    doc.build(story, canvasmaker=footer_canvas)
+    return buffer.getvalue()
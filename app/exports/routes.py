@@ -1,6 +1,7 @@
-from flask import Blueprint, send_file, current_app, make_response, session, url_for, redirect, request, render_template, send_file
+from flask import Blueprint, current_app, session, url_for, redirect, request, render_template, jsonify, Response, stream_with_context, abort
+from werkzeug.utils import secure_filename
 from flask_login import login_required, current_user
-from io import BytesIO, StringIO
+from io import BytesIO
 from reportlab.lib.units import cm
 from reportlab.pdfgen import canvas
 from reportlab.lib import colors
@@ -15,10 +16,21 @@ except (ImportError, OSError):
 from datetime import datetime
 import csv
 import os
+import zipfile
 import base64
 from reportlab.platypus import Image as PlatypusImage
 
-from app.models import TournamentModel, TournamentMatrixModel, PlayerModel, PracticeRegisterModel, PlayerSeasonStatsModel, SeasonModel, PracticeExerciseModel
+from app.models import TournamentModel, PlayerModel, PracticeRegisterModel, PlayerSeasonStatsModel, PracticeExerciseModel, ExportJobModel, PracticeAttendanceModel
+from app.extensions import db
+from app.export_jobs import export_jobs, render_pdf
+from app.export_cache import export_cache
+from app.exports.pdf_reports import render_player_report, render_players_summary
+from app.stats import aggregate_totals, EMPTY_TOTALS
+from app.matrix_store import get_matrix_store, MINUTES_PER_PERIOD
+from app.identity import identity_cache, current_season
+from app.conditional import conditional_get
+from app.metrics import observe_pdf, count_csv_rows
+from app.season_archive import iter_season_archive, compress_stream, ZSTD_AVAILABLE
 
 export_bp = Blueprint('export', __name__, url_prefix='/export')
     
@@ -44,6 +56,13 @@ def generate_tournament_pdf(tournament_id):
     if tournament.season_id != season_id:
         return "⛔ Tournament is not in current season", 403
 
+    key = export_cache.key('tournament_pdf', current_user.id, season_id, {'tournament_id': tournament.id})
+    return export_cache.send(key, lambda: _render_tournament_pdf(tournament),
+                             'application/pdf', f"tournament_{tournament.id}_sheet.pdf")
+
+
+def _render_tournament_pdf(tournament):
+    """ReportLab tournament sheet → PDF bytes."""
     buffer = BytesIO()
     c = canvas.Canvas(buffer, pagesize=landscape(A4))
     width, height = landscape(A4)
@@ -60,16 +79,12 @@ def generate_tournament_pdf(tournament_id):
     cell_height = 15
     table_top_y = y_start - 60
 
-    matrix_entries = TournamentMatrixModel.query.filter_by(tournament_id=tournament_id).all()
-    matrix_lookup = {
-        (entry.player_name.strip(), entry.opponent_name.strip(), entry.period): entry.played
-        for entry in matrix_entries
-    }
+    matrix_lookup = get_matrix_store().load_cells(tournament)
 
     minutes_played = defaultdict(int)
-    for entry in matrix_entries:
-        if entry.played:
-            minutes_played[entry.player_name.strip()] += 6
+    for (player, _, _), played in matrix_lookup.items():
+        if played:
+            minutes_played[player] += MINUTES_PER_PERIOD
 
     if tournament.coach_notes:
         c.setFont("Helvetica-Oblique", 9)
@@ -108,13 +123,11 @@ def generate_tournament_pdf(tournament_id):
             y = height - margin - 60
 
     c.save()
-    buffer.seek(0)
-    return send_file(buffer, as_attachment=True,
-                     download_name=f"tournament_{tournament.id}_sheet.pdf",
-                     mimetype='application/pdf')
+    return buffer.getvalue()
 
 @export_bp.route('/tournament/<int:tournament_id>/export/csv')
 @login_required
+@conditional_get
 def export_tournament_csv(tournament_id):
 
     season_id = session.get('season_id')
@@ -130,35 +143,57 @@ def export_tournament_csv(tournament_id):
     if tournament.season_id != season_id:
         return "⛔ Tournament is not in current season", 403
 
-    matrix_entries = TournamentMatrixModel.query.filter_by(tournament_id=tournament_id).all()
-
-    # Write to a text buffer
-    text_buffer = StringIO()
-    writer = csv.writer(text_buffer)
-    writer.writerow(["Player", "Opponent", "Period", "Played"])
-
-    for entry in matrix_entries:
-        writer.writerow([
-            entry.player_name,
-            entry.opponent_name,
-            f"P{entry.period}",
-            "Yes" if entry.played else "No"
-        ])
-
-    # Convert to bytes
-    bytes_buffer = BytesIO()
-    bytes_buffer.write(text_buffer.getvalue().encode('utf-8'))
-    bytes_buffer.seek(0)
-
-    return send_file(
-        bytes_buffer,
-        as_attachment=True,
-        download_name=f"tournament_{tournament.id}_matrix.csv",
-        mimetype='text/csv'
+    cells = get_matrix_store().load_cells(tournament)
+
+    rows = (
+        [player, opponent, f"P{period}", "Yes" if played else "No"]
+        for (player, opponent, period), played in cells.items()
     )
+    return _stream_csv(f"tournament_{tournament.id}_matrix.csv", ["Player", "Opponent", "Period", "Played"], rows)
+
+# Rows fetched per round trip (yield_per / server-side cursor) and written per chunk
+CSV_BATCH_ROWS = 1000
+
+# compression → (mimetype, file extension) for season archives
+ARCHIVE_MIMETYPES = {
+    'gzip': ('application/gzip', '.ndjson.gz'),
+    'zstd': ('application/zstd', '.ndjson.zst'),
+    'none': ('application/x-ndjson', '.ndjson'),
+}
+
+
+class _CsvLine:
+    """csv.writer target that hands each formatted line back instead of storing it."""
+
+    def write(self, line):
+        return line
+
+
+def _stream_csv(filename, header, rows):
+    """Streamed CSV download; ``rows`` is consumed lazily, so memory stays flat."""
+    writer = csv.writer(_CsvLine())
+    route = request.endpoint
+
+    def generate():
+        count = 0
+        chunk = [writer.writerow(header)]
+        for row in rows:
+            chunk.append(writer.writerow(row))
+            count += 1
+            if len(chunk) >= CSV_BATCH_ROWS:
+                yield ''.join(chunk)
+                chunk = []
+        yield ''.join(chunk)
+        count_csv_rows(route, count)
+
+    response = Response(stream_with_context(generate()), mimetype='text/csv')
+    response.headers['Content-Disposition'] = f'attachment; filename={filename}'
+    return response
+
 
 @export_bp.route('/minutes/csv')
 @login_required
+@conditional_get
 def export_minutes_csv():
 
     season_id = session.get('season_id')
@@ -166,47 +201,24 @@ def export_minutes_csv():
         return redirect(url_for('season.manage_seasons'))  # or return a default response
 
     players = PlayerModel.query.filter_by(user_id=current_user.id, season_id=season_id).order_by(PlayerModel.name).all()
-    registers = PracticeRegisterModel.query.filter_by(user_id=current_user.id, season_id=season_id).all()
-
-    user_tournament_ids = [t.id for t in TournamentModel.query.filter_by(user_id=current_user.id, season_id=season_id).all()]
-    matrix_entries = TournamentMatrixModel.query.filter(
-        TournamentMatrixModel.tournament_id.in_(user_tournament_ids),
-        TournamentMatrixModel.played == True
-    ).all()
-
-    dashboard_data = defaultdict(lambda: {"minutes_played": 0, "practice_minutes": 0})
-
-    for entry in matrix_entries:
-        dashboard_data[entry.player_name]["minutes_played"] += 6
+    totals = aggregate_totals(current_user.id, season_id, players)
 
-    for reg in registers:
-        duration = reg.duration_minutes or 0
-        for p in reg.players_present.split(','):
-            name = p.strip()
-            if name:
-                dashboard_data[name]["practice_minutes"] += duration
-
-    # Prepare CSV
-    si = StringIO()
-    writer = csv.writer(si)
-    writer.writerow(["Player", "Minutes Played", "Practice Minutes", "Total Minutes"])
+    def rows():
+        for player in players:
+            stats = totals.get(player.name, EMPTY_TOTALS)
+            yield [
+                player.name,
+                stats.game_minutes,
+                stats.practice_minutes,
+                stats.game_minutes + stats.practice_minutes
+            ]
 
-    for player in players:
-        stats = dashboard_data.get(player.name, {'minutes_played': 0, 'practice_minutes': 0})
-        writer.writerow([
-            player.name,
-            stats["minutes_played"],
-            stats["practice_minutes"],
-            stats["minutes_played"] + stats["practice_minutes"]
-        ])
-
-    output = make_response(si.getvalue())
-    output.headers["Content-Disposition"] = "attachment; filename=dashboard_minutes.csv"
-    output.headers["Content-type"] = "text/csv"
-    return output
+    return _stream_csv("dashboard_minutes.csv",
+                       ["Player", "Minutes Played", "Practice Minutes", "Total Minutes"], rows())
 
 @export_bp.route('/totals/csv')
 @login_required
+@conditional_get
 def export_totals_csv():
 
     season_id = session.get('season_id')
@@ -214,47 +226,24 @@ def export_totals_csv():
         return redirect(url_for('season.manage_seasons'))  # or return a default response
     
     players = PlayerModel.query.filter_by(user_id=current_user.id, season_id=season_id).order_by(PlayerModel.name).all()
-    totals_data = defaultdict(lambda: {"games_played": 0, "practices_attended": 0})
-
-    user_tournament_ids = [t.id for t in TournamentModel.query.filter_by(user_id=current_user.id, season_id=season_id).all()]
-    matrix_entries = TournamentMatrixModel.query.filter(
-        TournamentMatrixModel.tournament_id.in_(user_tournament_ids),
-        TournamentMatrixModel.played == True
-    ).all()
+    totals_data = aggregate_totals(current_user.id, season_id, players)
 
-    seen_games = set()
-    for entry in matrix_entries:
-        key = (entry.player_name.strip(), entry.tournament_id, entry.opponent_name.strip())
-        if key not in seen_games:
-            totals_data[entry.player_name.strip()]["games_played"] += 1
-            seen_games.add(key)
+    def rows():
+        for player in players:
+            totals = totals_data.get(player.name, EMPTY_TOTALS)
+            yield [
+                player.name,
+                totals.games_played,
+                totals.practices_attended,
+                totals.games_played + totals.practices_attended
+            ]
 
-    practice_registers = PracticeRegisterModel.query.filter_by(user_id=current_user.id, season_id=season_id).all()
-    for reg in practice_registers:
-        players_present = [p.strip() for p in reg.players_present.split(',') if p.strip()]
-        for p in players_present:
-            totals_data[p]["practices_attended"] += 1
-
-    si = StringIO()
-    writer = csv.writer(si)
-    writer.writerow(["Player", "Games Played", "Practices Attended", "Total Activities"])
-
-    for player in players:
-        totals = totals_data.get(player.name, {'games_played': 0, 'practices_attended': 0})
-        writer.writerow([
-            player.name,
-            totals["games_played"],
-            totals["practices_attended"],
-            totals["games_played"] + totals["practices_attended"]
-        ])
-
-    output = make_response(si.getvalue())
-    output.headers["Content-Disposition"] = "attachment; filename=dashboard_totals.csv"
-    output.headers["Content-type"] = "text/csv"
-    return output
+    return _stream_csv("dashboard_totals.csv",
+                       ["Player", "Games Played", "Practices Attended", "Total Activities"], rows())
 
 @export_bp.route('/export/players/csv')
 @login_required
+@conditional_get
 def export_players_csv():
     player_id = request.args.get('player_id')
     season_id = session.get('season_id')
@@ -263,31 +252,127 @@ def export_players_csv():
     if player_id:
         query = query.filter_by(id=player_id)
 
-    players = query.all()
+    rows = (
+        [p.alias or '', p.name, p.escalao, p.n_carteira, p.dob, p.mobile_phone, p.email]
+        for p in query.order_by(PlayerModel.id).yield_per(CSV_BATCH_ROWS)
+    )
+    filename = f"{'player' if player_id else 'all_players'}_export.csv"
+    return _stream_csv(filename, ['Alias', 'Name', 'Escalão', 'Carteira', 'DOB', 'Phone', 'Email'], rows)
 
-    si = StringIO()
-    writer = csv.writer(si)
-    writer.writerow(['Alias', 'Name', 'Escalão', 'Carteira', 'DOB', 'Phone', 'Email'])
 
-    for p in players:
-        writer.writerow([p.alias or '', p.name, p.escalao, p.n_carteira, p.dob, p.mobile_phone, p.email])
+@export_bp.route('/season/matrix/csv')
+@login_required
+@conditional_get
+def export_season_matrix_csv():
+    """Every matrix cell of the season, one row per player × opponent × period."""
+    season_id = session.get('season_id')
+    if not season_id:
+        return redirect(url_for('season.manage_seasons'))
 
-    response = make_response(si.getvalue())
-    filename = f"{'player' if player_id else 'all_players'}_export.csv"
-    response.headers['Content-Disposition'] = f'attachment; filename={filename}'
-    response.headers['Content-Type'] = 'text/csv'
-    return response
+    tournaments = {
+        t.id: t for t in TournamentModel.query.filter_by(user_id=current_user.id, season_id=season_id)
+    }
+    cells = get_matrix_store().iter_season_cells(current_user.id, season_id, CSV_BATCH_ROWS)
+
+    def rows():
+        for tournament_id, player, opponent, period, played in cells:
+            t = tournaments.get(tournament_id)
+            yield [
+                tournament_id,
+                t.date if t else '',
+                t.team_name if t else '',
+                opponent,
+                f"P{period}",
+                player,
+                "Yes" if played else "No",
+                MINUTES_PER_PERIOD if played else 0,
+            ]
+
+    return _stream_csv(
+        "season_matrix.csv",
+        ["Tournament", "Date", "Team", "Opponent", "Period", "Player", "Played", "Minutes"],
+        rows()
+    )
 
-@export_bp.route('/export/players/pdf-html')
+
+@export_bp.route('/season/attendance/csv')
 @login_required
-def export_players_pdf_html():
-    if not WEASYPRINT_AVAILABLE:
-        return "WeasyPrint not available on this system. Please use CSV export or install GTK libraries.", 503
-    
-    player_id = request.args.get('player_id')
+@conditional_get
+def export_season_attendance_csv():
+    """Every practice attendance of the season, one row per register × player."""
+    season_id = session.get('season_id')
+    if not season_id:
+        return redirect(url_for('season.manage_seasons'))
+
+    a, r, p = PracticeAttendanceModel, PracticeRegisterModel, PlayerModel
+    rows = db.session.query(
+        r.date, r.id, r.duration_minutes, p.name
+    ).join(
+        a, a.register_id == r.id
+    ).join(
+        p, p.id == a.player_id
+    ).filter(
+        r.user_id == current_user.id,
+        r.season_id == season_id,
+    ).order_by(r.date, r.id, p.name).yield_per(CSV_BATCH_ROWS)
+
+    return _stream_csv(
+        "season_attendance.csv",
+        ["Date", "Practice", "Duration (min)", "Player"],
+        ([date, register_id, duration or 0, name] for date, register_id, duration, name in rows)
+    )
+
+@export_bp.route('/season/archive')
+@login_required
+@conditional_get
+def export_season_archive():
+    """Whole season as a streamed NDJSON archive (``?compress=gzip|zstd|none``)."""
     season_id = session.get('season_id')
-    season = SeasonModel.query.get(season_id)
-    season_name = season.name if season else "Current Season"
+    if not season_id:
+        return redirect(url_for('season.manage_seasons'))
+
+    season = current_season()
+    if not season:
+        return "⛔ Unauthorized", 403
+
+    compression = request.args.get('compress', 'gzip')
+    if compression not in ARCHIVE_MIMETYPES or (compression == 'zstd' and not ZSTD_AVAILABLE):
+        return f"Unsupported compression '{compression}'", 400
+    mimetype, extension = ARCHIVE_MIMETYPES[compression]
+
+    lines = iter_season_archive(current_user.id, season.id)
+    response = Response(stream_with_context(compress_stream(lines, compression)), mimetype=mimetype)
+    filename = secure_filename(f"season_{season.name}") + extension
+    response.headers['Content-Disposition'] = f'attachment; filename={filename}'
+    return response
+
+
+@export_bp.record_once
+def _load_logo(state):
+    # Read and base64-encode the report logo once, not on every export
+    logo_path = os.path.join(state.app.root_path, "static", "logo_illiabum.jpg")
+    if not os.path.exists(logo_path):
+        logo_path = None
+    state.app.config['EXPORT_LOGO_PATH'] = logo_path
+    state.app.config['EXPORT_LOGO_DATA'] = encode_image_base64(logo_path) if logo_path else None
+
+
+def _logo_path():
+    return current_app.config['EXPORT_LOGO_PATH']
+
+
+def _logo_data():
+    return current_app.config['EXPORT_LOGO_DATA']
+
+
+def _season_name(season_id):
+    season = identity_cache.load_season(current_user.id, season_id)
+    return season.name if season else "Current Season"
+
+
+def _player_report_data(season_id, player_id=None):
+    """(enriched player dicts, season name) for the player report, whichever engine renders it."""
+    season_name = _season_name(season_id)
 
     players = PlayerModel.query.filter_by(user_id=current_user.id, season_id=season_id)
     if player_id:
@@ -295,34 +380,25 @@ def export_players_pdf_html():
 
     players = players.all()
 
-    # Calculate stats dynamically per player
-    registers = PracticeRegisterModel.query.filter_by(user_id=current_user.id, season_id=season_id).all()
-    matrix_entries = TournamentMatrixModel.query.filter_by(user_id=current_user.id, season_id=season_id).all()
+    # Practice/game stats for all selected players from the aggregate table
+    totals = aggregate_totals(current_user.id, season_id, players)
+
+    # Season evaluation fields, one query for the whole roster
+    evaluations = {
+        stats.player_id: stats
+        for stats in PlayerSeasonStatsModel.query.filter(
+            PlayerSeasonStatsModel.season_id == season_id,
+            PlayerSeasonStatsModel.player_id.in_([p.id for p in players]),
+        )
+    }
 
     enriched = []
     for p in players:
-        # Practice stats
-        practice_minutes = 0
-        total_practices = 0
-        for r in registers:
-            if p.name in (r.players_present or ""):
-                practice_minutes += r.duration_minutes or 0
-                total_practices += 1
-
-        # Game stats
-        game_minutes = 0
-        games_seen = set()
-        for entry in matrix_entries:
-            if entry.player_name == p.name and entry.played:
-                game_minutes += 6
-                games_seen.add((entry.tournament_id, entry.opponent_name))
-
-        total_games = len(games_seen)
-
-        # Season evaluation fields
-        stats = PlayerSeasonStatsModel.query.filter_by(player_id=p.id, season_id=season_id).first()
+        t = totals.get(p.name, EMPTY_TOTALS)
+        stats = evaluations.get(p.id)
 
         enriched.append({
+            "id": p.id,
             "name": p.name,
             "alias": p.alias,
             "escalao": p.escalao,
@@ -330,75 +406,275 @@ def export_players_pdf_html():
             "dob": p.dob,
             "mobile_phone": p.mobile_phone,
             "email": p.email,
-            "practice_minutes": practice_minutes,
-            "game_minutes": game_minutes,
-            "total_practices": total_practices,
-            "total_games": total_games,
+            "practice_minutes": t.practice_minutes,
+            "game_minutes": t.game_minutes,
+            "total_practices": t.practices_attended,
+            "total_games": t.games_played,
             "behavior": getattr(stats, "behavior", "—"),
             "technical_skills": getattr(stats, "technical_skills", "—"),
             "team_relation": getattr(stats, "team_relation", "—"),
             "improvement_areas": getattr(stats, "improvement_areas", "—")
         })
 
-    # Inline logo
-    logo_path = os.path.join(current_app.root_path, "static", "logo_illiabum.jpg")
-    logo_data = encode_image_base64(logo_path) if os.path.exists(logo_path) else None
+    return enriched, season_name
+
+
+def _summary_players(season_id):
+    return PlayerModel.query.filter_by(
+        user_id=current_user.id,
+        season_id=season_id
+    ).order_by(
+        PlayerModel.escalao,
+        PlayerModel.n_carteira,
+        PlayerModel.dob
+    ).all()
+
 
-    html = render_template(
+def _player_report_html(season_id, player_id=None):
+    """Render player_pdf.html for the season roster (or a single player)."""
+    enriched, season_name = _player_report_data(season_id, player_id)
+
+    return render_template(
         "player_pdf.html",
         players=enriched,
-        logo_data=logo_data,
+        logo_data=_logo_data(),
         season_name=season_name
     )
 
-    pdf = BytesIO()
-    HTML(string=html).write_pdf(pdf)
-    pdf.seek(0)
 
-    return send_file(
-        pdf,
-        mimetype="application/pdf",
-        download_name="player_export.pdf",
-        as_attachment=True
+def _players_summary_html(season_id, player_id=None):
+    """Render players_summary.html for the season roster."""
+    return render_template(
+        "players_summary.html",
+        players=_summary_players(season_id),
+        logo_data=_logo_data(),
+        season_name=_season_name(season_id),
+        now=datetime.now()
+    )
+
+
+def _player_report_reportlab(season_id, player_id=None):
+    enriched, season_name = _player_report_data(season_id, player_id)
+    return render_player_report(enriched, season_name, _logo_path())
+
+
+def _players_summary_reportlab(season_id, player_id=None):
+    return render_players_summary(_summary_players(season_id), _season_name(season_id), datetime.now(), _logo_path())
+
+
+# kind → (HTML builder for WeasyPrint, ReportLab renderer, download name)
+EXPORT_JOB_KINDS = {
+    'players_pdf': (_player_report_html, _player_report_reportlab, "player_export.pdf"),
+    'players_summary_pdf': (_players_summary_html, _players_summary_reportlab, "players_summary.pdf"),
+}
+
+PDF_ENGINES = ('weasyprint', 'reportlab')
+
+
+def _pdf_engine():
+    """?engine=… (or form field), else PDF_ENGINE; ReportLab whenever WeasyPrint is missing."""
+    engine = request.values.get('engine') or current_app.config['PDF_ENGINE']
+    if engine not in PDF_ENGINES:
+        engine = PDF_ENGINES[0]
+    if engine == 'weasyprint' and not WEASYPRINT_AVAILABLE:
+        return 'reportlab'
+    return engine
+
+
+def _render_player_pdf(kind, season_id, player_id, engine):
+    build_html, render_reportlab, _ = EXPORT_JOB_KINDS[kind]
+    if engine == 'reportlab':
+        return render_reportlab(season_id, player_id)
+    return HTML(string=build_html(season_id, player_id)).write_pdf()
+
+
+def _job_params(kind, player_id=None, engine=None):
+    """Export cache parameters; the summary prints today's date, so it is keyed per day."""
+    if kind == 'players_summary_pdf':
+        return {'date': datetime.now().date(), 'engine': engine}
+    return {'player_id': str(player_id) if player_id else None, 'engine': engine}
+
+
+def _send_player_pdf(kind, player_id=None):
+    season_id = session.get('season_id')
+    engine = _pdf_engine()
+    filename = EXPORT_JOB_KINDS[kind][2]
+
+    key = export_cache.key(kind, current_user.id, season_id, _job_params(kind, player_id, engine))
+    return export_cache.send(
+        key,
+        lambda: _render_player_pdf(kind, season_id, player_id, engine),
+        "application/pdf",
+        filename
     )
 
+
+@export_bp.route('/export/players/pdf-html')
+@login_required
+def export_players_pdf_html():
+    return _send_player_pdf('players_pdf', request.args.get('player_id'))
+
 @export_bp.route('/export/players/pdf-summary')
 @login_required
 def export_players_summary_pdf_html():
-    if not WEASYPRINT_AVAILABLE:
-        return "WeasyPrint not available on this system. Please use CSV export or install GTK libraries.", 503
-    
+    return _send_player_pdf('players_summary_pdf')
+
+
+class _ZipStream:
+    """Write-only file for ZipFile; drain() hands out what was written so far."""
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+
+@export_bp.route('/export/players/report-cards')
+@login_required
+@conditional_get
+def export_player_report_cards():
+    """One report PDF per player, rendered in parallel and streamed into a ZIP."""
+    season_id = session.get('season_id')
+    if not season_id:
+        return redirect(url_for('season.manage_seasons'))
+
+    engine = _pdf_engine()
+    # All players' stats in one pass
+    enriched, season_name = _player_report_data(season_id)
+    logo_path, logo_data = _logo_path(), _logo_data()
+
+    cached, calls, used_names = [], [], set()
+    for player in enriched:
+        filename = secure_filename(player["alias"] or player["name"]) or f"player_{player['id']}"
+        if filename in used_names:
+            filename = f"{filename}_{player['id']}"
+        used_names.add(filename)
+        filename += ".pdf"
+
+        # Same cache entries as the single-player export
+        key = export_cache.key('players_pdf', current_user.id, season_id,
+                               _job_params('players_pdf', player["id"], engine))
+        pdf = export_cache.get(key)
+        if pdf is not None:
+            cached.append((filename, pdf))
+        elif engine == 'reportlab':
+            calls.append(((filename, key), render_player_report, ([player], season_name, logo_path)))
+        else:
+            html = render_template("player_pdf.html", players=[player], logo_data=logo_data, season_name=season_name)
+            calls.append(((filename, key), render_pdf, (html,)))
+
+    def generate():
+        stream = _ZipStream()
+        failures = []
+        with zipfile.ZipFile(stream, 'w', zipfile.ZIP_DEFLATED) as archive:
+            for filename, pdf in cached:
+                archive.writestr(filename, pdf)
+                yield stream.drain()
+
+            # Each PDF is added as soon as its render finishes
+            for (filename, key), pdf in export_jobs.render_many(calls):
+                if isinstance(pdf, Exception):
+                    failures.append(f"{filename}: {pdf}")
+                    continue
+                export_cache.put(key, pdf)
+                observe_pdf('export.export_player_report_cards', None, len(pdf))  # rendered in parallel: size only
+                archive.writestr(filename, pdf)
+                yield stream.drain()
+
+            if failures:
+                archive.writestr("ERRORS.txt", "\n".join(failures))
+        yield stream.drain()
+
+    response = Response(stream_with_context(generate()), mimetype='application/zip')
+    response.headers['Content-Disposition'] = f'attachment; filename={secure_filename(season_name)}_report_cards.zip'
+    return response
+
+
+# 🧾 Background export jobs: POST queues the render, the page polls for it
+
+def _job_status(job):
+    return {
+        "id": job.id,
+        "kind": job.kind,
+        "status": job.status,
+        "error": job.error,
+        "status_url": url_for('export.export_job_status', job_id=job.id),
+        "download_url": url_for('export.download_export_job', job_id=job.id) if job.status == 'done' else None,
+    }
+
+
+@export_bp.route('/jobs', methods=['POST'])
+@login_required
+def create_export_job():
     season_id = session.get('season_id')
+    if not season_id:
+        return jsonify({"error": "No season selected"}), 400
 
-    players = PlayerModel.query.filter_by(
-        user_id=current_user.id,
-        season_id=season_id
-    ).order_by(
-        PlayerModel.escalao,
-        PlayerModel.n_carteira,
-        PlayerModel.dob
-    ).all()
+    kind = request.form.get('kind')
+    if kind not in EXPORT_JOB_KINDS:
+        return jsonify({"error": f"Unknown export: {kind}"}), 400
 
-    logo_path = os.path.join(current_app.root_path, "static", "logo_illiabum.jpg")
-    logo_data = encode_image_base64(logo_path) if os.path.exists(logo_path) else None
+    build_html, _, filename = EXPORT_JOB_KINDS[kind]
+    player_id = request.form.get('player_id') or None
+    engine = _pdf_engine()
 
-    html = render_template(
-        "players_summary.html",
-        players=players,
-        logo_data=logo_data,
-        now=datetime.now()
-    )
+    # Unchanged data: hand back the cached PDF without queueing a render
+    key = export_cache.key(kind, current_user.id, season_id, _job_params(kind, player_id, engine))
+    cached = export_cache.get(key)
+    if cached is None and engine == 'reportlab':
+        # Fast enough to draw right here; the job is recorded as done
+        cached = _render_player_pdf(kind, season_id, player_id, engine)
+        export_cache.put(key, cached)
 
-    pdf = BytesIO()
-    HTML(string=html).write_pdf(pdf)
-    pdf.seek(0)
+    if cached is not None:
+        job = export_jobs.enqueue(current_user.id, season_id, kind, filename, None, cache_key=key, cached=True)
+    else:
+        html = build_html(season_id, player_id)
+        job = export_jobs.enqueue(current_user.id, season_id, kind, filename, html, cache_key=key)
+    return jsonify(_job_status(job)), 202
 
-    return send_file(
-        pdf,
-        mimetype="application/pdf",
-        download_name="players_summary.pdf",
-        as_attachment=True
-    )
+
+@export_bp.route('/jobs/<int:job_id>')
+@login_required
+def export_job_status(job_id):
+    job = ExportJobModel.query.get_or_404(job_id)
+
+    # 🔐 Ownership check
+    if job.user_id != current_user.id:
+        return "⛔ Unauthorized", 403
+
+    # Picks up jobs left queued by a web process that has since exited
+    export_jobs.start()
+    return jsonify(_job_status(job))
+
+
+@export_bp.route('/jobs/<int:job_id>/download')
+@login_required
+def download_export_job(job_id):
+    job = ExportJobModel.query.get_or_404(job_id)
+
+    # 🔐 Ownership check
+    if job.user_id != current_user.id:
+        return "⛔ Unauthorized", 403
+    if job.status != 'done':
+        return jsonify(_job_status(job)), 409
+
+    def stored_result():
+        if job.result is None:
+            abort(410)  # done from a cache entry that has since been evicted: export again
+        return job.result
+
+    return export_cache.send(job.cache_key, stored_result, "application/pdf", job.filename)
 
 @export_bp.route('/practice-register/pdf')
 @login_required
@@ -413,6 +689,13 @@ def export_practice_register_pdf():
     year = request.args.get('year', type=int) or datetime.now().year
     month = request.args.get('month', type=int) or datetime.now().month
 
+    key = export_cache.key('practice_register_pdf', current_user.id, season_id, {'year': year, 'month': month})
+    return export_cache.send(key, lambda: _render_practice_register_pdf(season_id, year, month),
+                             'application/pdf', f"practice_register_{year}_{month:02d}.pdf")
+
+
+def _render_practice_register_pdf(season_id, year, month):
+    """ReportLab monthly attendance sheet → PDF bytes."""
     # Calculate date range for the month
     from calendar import monthrange
     _, last_day = monthrange(year, month)
@@ -434,7 +717,7 @@ def export_practice_register_pdf():
     ).order_by(PlayerModel.name).all()
     
     # Get season name
-    season = SeasonModel.query.get(season_id)
+    season = identity_cache.load_season(current_user.id, season_id)
     season_name = season.name if season else f"Season {season_id}"
 
     # Build attendance matrix: player_name -> {date -> present}
@@ -475,10 +758,7 @@ def export_practice_register_pdf():
         c.setFont("Helvetica-Oblique", 11)
         c.drawString(margin, y, "No practice sessions recorded for this month.")
         c.save()
-        buffer.seek(0)
-        return send_file(buffer, as_attachment=True,
-                        download_name=f"practice_register_{year}_{month:02d}.pdf",
-                        mimetype='application/pdf')
+        return buffer.getvalue()
 
     # Calculate table dimensions
     player_col_width = 180  # Increased width for full names
@@ -616,15 +896,4 @@ def export_practice_register_pdf():
         y_summary -= 12
 
     c.save()
-    buffer.seek(0)
-    
-    return send_file(buffer, as_attachment=True,
-                    download_name=f"practice_register_{year}_{month:02d}.pdf",
-                    mimetype='application/pdf')
-
-    c.save()
-    buffer.seek(0)
-    
-    return send_file(buffer, as_attachment=True,
-                    download_name=f"practice_register_{year}_{month:02d}.pdf",
-                    mimetype='application/pdf')
\ No newline at end of file
+    return buffer.getvalue()
\ No newline at end of file
@@ -1,8 +1,29 @@
-from flask import Blueprint, render_template
+from flask import Blueprint, render_template, current_app, make_response
 from flask_login import login_required
+import json
+import os
+
+from app.assets import asset_url, asset_version, VENDOR_ASSETS, LOCAL_ASSETS
 
 home_bp = Blueprint('home', __name__)
 
 @home_bp.route('/')
 def index():
-    return render_template('index.html')
\ No newline at end of file
+    return render_template('index.html')
+
+@home_bp.route('/sw.js')
+def service_worker():
+    # Served from the site root so the worker's scope covers the whole app.
+    # The precache list is injected so it follows the fingerprinted asset names.
+    shell_urls = ['/'] + [asset_url(name) for name in list(VENDOR_ASSETS) + LOCAL_ASSETS]
+    with open(os.path.join(current_app.root_path, 'static', 'sw.js')) as f:
+        script = f.read()
+
+    response = make_response(
+        f"self.SHELL_URLS = {json.dumps(shell_urls)};\n"
+        f"self.ASSET_VERSION = {json.dumps(asset_version())};\n" + script
+    )
+    response.mimetype = 'application/javascript'
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['Service-Worker-Allowed'] = '/'
+    return response
@@ -0,0 +1,175 @@
+import threading
+import time
+from collections import namedtuple
+
+from flask import g, session
+from flask_login import current_user
+from sqlalchemy import inspect
+from sqlalchemy.orm import make_transient_to_detached
+
+from .data_version import data_version
+from .extensions import db
+from .models import UserModel, SeasonModel, PlayerModel
+
+# Request-scoped identity: the user, the validated current season and its
+# roster, built at most once per request on ``g.identity``.
+#
+# Behind it sits a per-worker TTL cache of plain column snapshots. A hit is
+# turned back into a session-bound instance without any SQL (so routes can
+# still modify and commit current_user). Season rows and the roster are
+# revalidated against the season's data version (one query per request,
+# shared with everything else keyed on it), so changes made by other
+# workers are seen immediately. User rows have no version and are trusted
+# for IDENTITY_USER_TTL seconds only.
+#
+# IDENTITY_CACHE_TTL = seconds an entry is trusted (0 disables the cache).
+# invalidate_user() (set_season, login) only reaches this worker's cache.
+
+RosterPlayer = namedtuple('RosterPlayer', 'id name alias')  # alias falls back to the name
+
+
+def _snapshot(obj):
+    return {attr.key: getattr(obj, attr.key) for attr in inspect(obj).mapper.column_attrs}
+
+
+def _attach(model, values):
+    """Session-bound ``model`` instance from a snapshot, without querying."""
+    key = inspect(model).identity_key_from_primary_key((values['id'],))
+    existing = db.session.identity_map.get(key)
+    if existing is not None:
+        return existing
+    obj = model(**values)
+    make_transient_to_detached(obj)
+    db.session.add(obj)
+    return obj
+
+
+class IdentityCache:
+
+    def __init__(self, app=None):
+        self._entries = {}
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('IDENTITY_CACHE_TTL', 30)
+        app.config.setdefault('IDENTITY_USER_TTL', 5)
+        app.config.setdefault('IDENTITY_CACHE_SIZE', 1024)
+        app.extensions['identity_cache'] = self
+        self.app = app
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            return None
+        return entry[1]
+
+    def set(self, key, value, ttl=None):
+        ttl = min(ttl, self.app.config['IDENTITY_CACHE_TTL']) if ttl else self.app.config['IDENTITY_CACHE_TTL']
+        if ttl <= 0:
+            return
+        now = time.monotonic()
+        with self._lock:
+            if len(self._entries) >= self.app.config['IDENTITY_CACHE_SIZE']:
+                self._entries = {k: e for k, e in self._entries.items() if e[0] >= now}
+                while len(self._entries) >= self.app.config['IDENTITY_CACHE_SIZE']:
+                    self._entries.pop(next(iter(self._entries)))  # oldest first
+            self._entries[key] = (now + ttl, value)
+
+    def invalidate_user(self, user_id):
+        """Drop everything cached for the user (their row, seasons and rosters)."""
+        with self._lock:
+            self._entries = {k: e for k, e in self._entries.items() if k[1] != user_id}
+
+    def clear(self):
+        with self._lock:
+            self._entries = {}
+
+    def load_user(self, user_id):
+        values = self.get(('user', user_id))
+        if values is not None:
+            return _attach(UserModel, values)
+        user = db.session.get(UserModel, user_id)
+        if user is not None:
+            self.set(('user', user_id), _snapshot(user), ttl=self.app.config['IDENTITY_USER_TTL'])
+        return user
+
+    def load_season(self, user_id, season_id):
+        """The season if it belongs to the user, else None; one data-version query on a hit."""
+        version = data_version(season_id)
+        cached = self.get(('season', user_id, season_id))
+        if cached is not None and cached[0] == version:
+            return _attach(SeasonModel, cached[1])
+        season = SeasonModel.query.filter_by(id=season_id, user_id=user_id).first()
+        if season is not None:
+            self.set(('season', user_id, season_id), (version, _snapshot(season)))
+        return season
+
+    def load_roster(self, user_id, season_id):
+        """[RosterPlayer] sorted by alias; one data-version query on a hit."""
+        version = data_version(season_id)
+        cached = self.get(('roster', user_id, season_id))
+        if cached is not None and cached[0] == version:
+            return cached[1]
+
+        rows = db.session.query(PlayerModel.id, PlayerModel.name, PlayerModel.alias).filter_by(
+            user_id=user_id, season_id=season_id
+        )
+        roster = sorted(
+            (RosterPlayer(id, name, alias or name) for id, name, alias in rows),
+            key=lambda p: p.alias.lower(),
+        )
+        self.set(('roster', user_id, season_id), (version, roster))
+        return roster
+
+
+identity_cache = IdentityCache()
+
+
+class RequestIdentity:
+    """What a request knows about who is asking; every part is loaded on first use."""
+
+    _unset = object()
+
+    def __init__(self):
+        self._season = self._unset
+        self._roster = None
+
+    @property
+    def user(self):
+        return current_user if getattr(current_user, 'is_authenticated', False) else None
+
+    @property
+    def season(self):
+        """Current season from the session, validated against the user (None if not theirs)."""
+        if self._season is self._unset:
+            season_id = session.get('season_id')
+            self._season = None
+            if season_id and self.user is not None:
+                self._season = identity_cache.load_season(self.user.id, season_id)
+        return self._season
+
+    @property
+    def season_id(self):
+        return self.season.id if self.season is not None else None
+
+    @property
+    def roster(self):
+        if self._roster is None:
+            self._roster = identity_cache.load_roster(self.user.id, self.season_id) if self.season else []
+        return self._roster
+
+
+def get_identity():
+    if 'identity' not in g:
+        g.identity = RequestIdentity()
+    return g.identity
+
+
+def current_season():
+    return get_identity().season
+
+
+def season_roster():
+    return get_identity().roster
@@ -0,0 +1,326 @@
+from flask import current_app
+from sqlalchemy import func, distinct, cast, text
+from sqlalchemy.dialects import postgresql, sqlite
+
+from .extensions import db
+from .models import TournamentMatrixModel, TournamentMatrixBitmapModel
+from .roster import split_csv
+
+# Storage backends for the tournament playing-time matrix.
+#
+# Both expose the same cell-level API, where a cell is keyed by
+# (player_name, opponent_name, period) and maps to ``played``:
+#   load_cells(tournament)            -> {(player, opponent, period): bool}
+#   save_cells(tournament, cells)     -> merge cells into storage (no commit),
+#                                        returns how many cells changed
+#   delete_player / delete_opponent / delete_tournament
+#   player_names(tournament)          -> names with stored cells
+#   iter_season_cells(user_id, season_id)
+#                                     -> streams (tournament_id, player, opponent, period, played)
+#   game_totals(user_id, season_id, player_names) -> {name: (minutes, games)}
+#
+# Select with MATRIX_STORAGE = "rows" (default) or "bitmap".
+
+PERIODS = (1, 2, 3, 4)
+MINUTES_PER_PERIOD = 6
+
+
+class RowMatrixStore:
+    """One TournamentMatrixModel row per player × opponent × period."""
+
+    name = 'rows'
+
+    def _query(self, tournament):
+        return TournamentMatrixModel.query.filter_by(
+            tournament_id=tournament.id,
+            season_id=tournament.season_id,
+            user_id=tournament.user_id,
+        )
+
+    def load_cells(self, tournament):
+        return {
+            (m.player_name.strip(), m.opponent_name.strip(), m.period): bool(m.played)
+            for m in self._query(tournament).order_by(TournamentMatrixModel.id)
+        }
+
+    def save_cells(self, tournament, cells):
+        """Diff against stored cells and upsert only new/changed ones in one statement."""
+        m = TournamentMatrixModel
+        existing = {
+            (player, opponent, period): played
+            for player, opponent, period, played in self._query(tournament).with_entities(
+                m.player_name, m.opponent_name, m.period, m.played)
+        }
+
+        rows = []
+        changed = 0
+        for (player, opponent, period), played in cells.items():
+            stored = existing.get((player, opponent, period))
+            if stored is not None and bool(stored) == played:
+                continue
+            if bool(stored) != played:
+                changed += 1
+            rows.append(dict(
+                tournament_id=tournament.id,
+                user_id=tournament.user_id,
+                season_id=tournament.season_id,
+                player_name=player,
+                opponent_name=opponent,
+                period=period,
+                played=played,
+            ))
+
+        if rows:
+            self._upsert(rows)
+        return changed
+
+    def _upsert(self, rows):
+        """INSERT ... ON CONFLICT (cell key) DO UPDATE SET played = excluded.played."""
+        dialects = {'postgresql': postgresql, 'sqlite': sqlite}
+        dialect = dialects.get(db.session.get_bind().dialect.name)
+        if dialect is None:
+            # No native upsert: fall back to per-cell ORM merge
+            for row in rows:
+                entry = TournamentMatrixModel.query.filter_by(
+                    tournament_id=row['tournament_id'], opponent_name=row['opponent_name'],
+                    period=row['period'], player_name=row['player_name'],
+                ).first()
+                if entry is None:
+                    db.session.add(TournamentMatrixModel(**row))
+                else:
+                    entry.played = row['played']
+            return
+
+        stmt = dialect.insert(TournamentMatrixModel).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=['tournament_id', 'opponent_name', 'period', 'player_name'],
+            set_={'played': stmt.excluded.played},
+        )
+        db.session.execute(stmt)
+
+    def delete_player(self, tournament, player_name):
+        self._query(tournament).filter_by(player_name=player_name).delete()
+
+    def delete_opponent(self, tournament, opponent_name):
+        self._query(tournament).filter_by(opponent_name=opponent_name).delete()
+
+    def delete_tournament(self, tournament):
+        TournamentMatrixModel.query.filter_by(
+            tournament_id=tournament.id, season_id=tournament.season_id
+        ).delete()
+
+    def player_names(self, tournament, opponent_name=None):
+        query = self._query(tournament)
+        if opponent_name is not None:
+            query = query.filter_by(opponent_name=opponent_name)
+        return {name for (name,) in query.with_entities(TournamentMatrixModel.player_name).distinct()}
+
+    def iter_season_cells(self, user_id, season_id, batch_size=1000):
+        """Server-side cursor over every cell of the season, in batches."""
+        m = TournamentMatrixModel
+        rows = db.session.query(
+            m.tournament_id, m.player_name, m.opponent_name, m.period, m.played
+        ).filter(
+            m.user_id == user_id,
+            m.season_id == season_id,
+        ).order_by(m.tournament_id, m.id).yield_per(batch_size)
+
+        for tournament_id, player, opponent, period, played in rows:
+            yield tournament_id, player.strip(), opponent.strip(), period, bool(played)
+
+    def game_totals(self, user_id, season_id, player_names=None):
+        """Grouped in SQL; a game is a distinct (tournament, opponent) with a played period."""
+        m = TournamentMatrixModel
+        game_key = cast(m.tournament_id, db.String) + ':' + m.opponent_name
+        query = db.session.query(
+            m.player_name,
+            func.count() * MINUTES_PER_PERIOD,
+            func.count(distinct(game_key)),
+        ).filter(
+            m.user_id == user_id,
+            m.season_id == season_id,
+            m.played.is_(True),
+        )
+        if player_names is not None:
+            query = query.filter(m.player_name.in_(player_names))
+
+        return {
+            name: (minutes, games)
+            for name, minutes, games in query.group_by(m.player_name)
+        }
+
+
+class BitmapMatrixStore:
+    """One TournamentMatrixBitmapModel row per tournament with packed cells.
+
+    The row keeps its own player/opponent layout, so names stay stored after
+    they leave the roster (same as the row store) until explicitly deleted.
+    """
+
+    name = 'bitmap'
+
+    def _row(self, tournament):
+        return db.session.get(TournamentMatrixBitmapModel, tournament.id)
+
+    @staticmethod
+    def decode(row):
+        """Return (players, opponents, bits) for a bitmap row."""
+        players = split_csv(row.player_names)
+        opponents = split_csv(row.opponent_names)
+        return players, opponents, int.from_bytes(row.cells or b'', 'little')
+
+    @staticmethod
+    def encode(players, opponents, cells):
+        bits = 0
+        for pi, player in enumerate(players):
+            for oi, opponent in enumerate(opponents):
+                for period in PERIODS:
+                    if cells.get((player, opponent, period)):
+                        bits |= 1 << ((pi * len(opponents) + oi) * len(PERIODS) + period - 1)
+        nbytes = (len(players) * len(opponents) * len(PERIODS) + 7) // 8
+        return bits.to_bytes(nbytes, 'little')
+
+    def load_cells(self, tournament):
+        row = self._row(tournament)
+        if row is None:
+            return {}
+        players, opponents, bits = self.decode(row)
+        # Opponent → period → player, the order the row store was written in
+        cells = {}
+        for oi, opponent in enumerate(opponents):
+            for period in PERIODS:
+                for pi, player in enumerate(players):
+                    bit = (pi * len(opponents) + oi) * len(PERIODS) + period - 1
+                    cells[(player, opponent, period)] = bool(bits >> bit & 1)
+        return cells
+
+    def _write(self, tournament, players, opponents, cells):
+        row = self._row(tournament)
+        if row is None:
+            row = TournamentMatrixBitmapModel(
+                tournament_id=tournament.id,
+                user_id=tournament.user_id,
+                season_id=tournament.season_id,
+            )
+            db.session.add(row)
+        row.player_names = ','.join(players)
+        row.opponent_names = ','.join(opponents)
+        row.cells = self.encode(players, opponents, cells)
+
+    def save_cells(self, tournament, cells):
+        current = self.load_cells(tournament)
+        changed = sum(1 for key, played in cells.items() if current.get(key, False) != played)
+
+        row = self._row(tournament)
+        players, opponents = ([], []) if row is None else self.decode(row)[:2]
+        grew = False
+        for player, opponent, _ in cells:
+            if player not in players:
+                players.append(player)
+                grew = True
+            if opponent not in opponents:
+                opponents.append(opponent)
+                grew = True
+
+        if changed or grew or row is None:
+            current.update(cells)
+            self._write(tournament, players, opponents, current)
+        return changed
+
+    def delete_player(self, tournament, player_name):
+        row = self._row(tournament)
+        if row is None:
+            return
+        cells = self.load_cells(tournament)
+        players, opponents, _ = self.decode(row)
+        self._write(tournament, [p for p in players if p != player_name], opponents, cells)
+
+    def delete_opponent(self, tournament, opponent_name):
+        row = self._row(tournament)
+        if row is None:
+            return
+        cells = self.load_cells(tournament)
+        players, opponents, _ = self.decode(row)
+        self._write(tournament, players, [o for o in opponents if o != opponent_name], cells)
+
+    def delete_tournament(self, tournament):
+        TournamentMatrixBitmapModel.query.filter_by(tournament_id=tournament.id).delete()
+
+    def player_names(self, tournament, opponent_name=None):
+        row = self._row(tournament)
+        return set(self.decode(row)[0]) if row is not None else set()
+
+    def iter_season_cells(self, user_id, season_id, batch_size=50):
+        """Decode one tournament row at a time (server-side cursor, in batches)."""
+        rows = TournamentMatrixBitmapModel.query.filter_by(
+            user_id=user_id, season_id=season_id
+        ).order_by(TournamentMatrixBitmapModel.tournament_id).yield_per(batch_size)
+
+        for row in rows:
+            players, opponents, bits = self.decode(row)
+            for oi, opponent in enumerate(opponents):
+                for period in PERIODS:
+                    for pi, player in enumerate(players):
+                        bit = (pi * len(opponents) + oi) * len(PERIODS) + period - 1
+                        yield row.tournament_id, player, opponent, period, bool(bits >> bit & 1)
+
+    def game_totals(self, user_id, season_id, player_names=None):
+        """Popcounts over one row per tournament in the season."""
+        wanted = set(player_names) if player_names is not None else None
+        totals = {}
+        rows = TournamentMatrixBitmapModel.query.filter_by(user_id=user_id, season_id=season_id)
+        for row in rows:
+            players, opponents, bits = self.decode(row)
+            width = len(opponents) * len(PERIODS)
+            for pi, player in enumerate(players):
+                if wanted is not None and player not in wanted:
+                    continue
+                player_bits = bits >> (pi * width) & ((1 << width) - 1)
+                if not player_bits:
+                    continue
+                games = sum(1 for oi in range(len(opponents)) if player_bits >> (oi * len(PERIODS)) & ((1 << len(PERIODS)) - 1))
+                minutes, played = totals.get(player, (0, 0))
+                totals[player] = (minutes + player_bits.bit_count() * MINUTES_PER_PERIOD, played + games)
+        return totals
+
+
+MATRIX_STORES = {store.name: store for store in (RowMatrixStore(), BitmapMatrixStore())}
+
+
+def get_matrix_store(name=None):
+    return MATRIX_STORES[name or current_app.config.get('MATRIX_STORAGE', 'rows')]
+
+
+def add_matrix_unique_key():
+    """One-off migration for existing databases: drop duplicate matrix cells
+    (keeping the newest row) and create the unique cell index."""
+    removed = db.session.execute(text(
+        "DELETE FROM tournament_matrix_model WHERE id NOT IN ("
+        " SELECT MAX(id) FROM tournament_matrix_model"
+        " GROUP BY tournament_id, opponent_name, period, player_name)"
+    )).rowcount
+    db.session.execute(text(
+        "CREATE UNIQUE INDEX IF NOT EXISTS uq_tournament_matrix_cell"
+        " ON tournament_matrix_model (tournament_id, opponent_name, period, player_name)"
+    ))
+    return removed
+
+
+def convert_matrix(target, tournaments):
+    """Copy every tournament's cells into the ``target`` store and clear the other one.
+
+    Does not commit. Returns the number of tournaments converted.
+    """
+    target_store = get_matrix_store(target)
+    converted = 0
+    for source_store in MATRIX_STORES.values():
+        if source_store is target_store:
+            continue
+        for tournament in tournaments:
+            cells = source_store.load_cells(tournament)
+            if not cells:
+                continue
+            target_store.save_cells(tournament, cells)
+            source_store.delete_tournament(tournament)
+            converted += 1
+    return converted
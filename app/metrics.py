@@ -0,0 +1,129 @@
+import os
+import time
+
+from flask import abort, current_app, g, request
+
+from .sql_instrumentation import current_sql_stats
+
+try:
+    from prometheus_client import (
+        CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, generate_latest,
+    )
+    from prometheus_client import multiprocess
+    PROMETHEUS_AVAILABLE = True
+except ImportError:
+    PROMETHEUS_AVAILABLE = False
+
+# Prometheus metrics, served at /metrics in the text exposition format.
+#
+# Under gunicorn every worker is its own process, so gunicorn.conf.py sets
+# PROMETHEUS_MULTIPROC_DIR: each process writes its samples to files there
+# and /metrics (in whichever worker answers) sums them all up. Without that
+# variable (python run.py) the default in-process registry is used.
+#
+# METRICS_TOKEN must be sent as "Authorization: Bearer <token>". Without a
+# token /metrics only answers in debug or testing and is a 404 otherwise, so
+# a production deploy never exposes it by accident.
+#
+# Everything here is a no-op when prometheus_client isn't installed.
+
+LATENCY_BUCKETS = (.005, .01, .025, .05, .1, .25, .5, 1, 2.5, 5, 10, 30, 60)
+SIZE_BUCKETS = (10e3, 50e3, 100e3, 250e3, 500e3, 1e6, 2.5e6, 5e6, 10e6, 25e6)
+
+if PROMETHEUS_AVAILABLE:
+    REQUEST_LATENCY = Histogram(
+        'teammanager_http_request_duration_seconds', 'Request latency by endpoint.',
+        ['endpoint', 'method', 'status'], buckets=LATENCY_BUCKETS)
+    REQUESTS_IN_PROGRESS = Gauge(
+        'teammanager_http_requests_in_progress', 'Requests being handled right now.',
+        ['endpoint'], multiprocess_mode='livesum')
+    REQUEST_DB_TIME = Histogram(
+        'teammanager_http_request_db_seconds', 'Time spent in SQL per request.',
+        ['endpoint'], buckets=LATENCY_BUCKETS)
+    DB_QUERIES = Counter(
+        'teammanager_db_queries', 'SQL statements executed.', ['endpoint'])
+    PDF_RENDER_TIME = Histogram(
+        'teammanager_pdf_render_duration_seconds', 'PDF render time by export route.',
+        ['route'], buckets=LATENCY_BUCKETS)
+    PDF_SIZE = Histogram(
+        'teammanager_pdf_output_bytes', 'Rendered PDF size by export route.',
+        ['route'], buckets=SIZE_BUCKETS)
+    CSV_ROWS = Counter(
+        'teammanager_csv_rows', 'Rows written to CSV exports.', ['route'])
+    CACHE_LOOKUPS = Counter(
+        'teammanager_cache_lookups', 'Export/aggregate cache lookups by result.', ['cache', 'result'])
+
+
+def _endpoint():
+    return request.endpoint or 'unmatched'
+
+
+def observe_pdf(route, seconds, size):
+    if PROMETHEUS_AVAILABLE:
+        if seconds is not None:
+            PDF_RENDER_TIME.labels(route).observe(seconds)
+        PDF_SIZE.labels(route).observe(size)
+
+
+def count_csv_rows(route, rows):
+    if PROMETHEUS_AVAILABLE and rows:
+        CSV_ROWS.labels(route).inc(rows)
+
+
+def count_cache_lookup(cache, result):
+    if PROMETHEUS_AVAILABLE:
+        CACHE_LOOKUPS.labels(cache, result).inc()
+
+
+def _start_request():
+    g.metrics_started = time.perf_counter()
+    g.metrics_endpoint = _endpoint()
+    REQUESTS_IN_PROGRESS.labels(g.metrics_endpoint).inc()
+
+
+def _record_status(response):
+    g.metrics_status = response.status_code
+    return response
+
+
+def _finish_request(exc):
+    if 'metrics_started' not in g:
+        return
+    endpoint = g.metrics_endpoint
+    REQUESTS_IN_PROGRESS.labels(endpoint).dec()
+    status = g.get('metrics_status', 500)
+    REQUEST_LATENCY.labels(endpoint, request.method, str(status)).observe(time.perf_counter() - g.metrics_started)
+
+    stats = current_sql_stats()
+    if stats is not None and stats.count:
+        REQUEST_DB_TIME.labels(endpoint).observe(stats.duration)
+        DB_QUERIES.labels(endpoint).inc(stats.count)
+
+
+def metrics_view():
+    token = current_app.config['METRICS_TOKEN']
+    if not token and not (current_app.debug or current_app.testing):
+        abort(404)
+    if token and request.headers.get('Authorization') != f'Bearer {token}':
+        return "⛔ Unauthorized", 401
+
+    if 'PROMETHEUS_MULTIPROC_DIR' in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), 200, {'Content-Type': CONTENT_TYPE_LATEST}
+
+
+def init_metrics(app):
+    app.config.setdefault('METRICS_TOKEN', os.environ.get('METRICS_TOKEN'))
+    if not PROMETHEUS_AVAILABLE:
+        app.logger.info("prometheus_client not installed - /metrics disabled")
+        return
+
+    app.before_request(_start_request)
+    app.after_request(_record_status)
+    app.teardown_request(_finish_request)
+    app.add_url_rule('/metrics', 'metrics', metrics_view)
+    if not app.config['METRICS_TOKEN']:
+        app.logger.warning("METRICS_TOKEN not set - /metrics only answers in debug/testing")
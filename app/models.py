@@ -21,6 +21,10 @@ class PlayerModel(db.Model):
 
     season = db.relationship('SeasonModel', backref='players')
 
+    __table_args__ = (
+        db.Index('ix_player_model_user_season', 'user_id', 'season_id', 'name'),
+    )
+
 class PracticeExerciseModel(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user_model.id'))
@@ -35,6 +39,10 @@ class PracticeExerciseModel(db.Model):
     season_id = db.Column(db.Integer, db.ForeignKey('season_model.id'), nullable=False)
     season = db.relationship('SeasonModel', backref='practice_exercises')
 
+    __table_args__ = (
+        db.Index('ix_practice_exercise_user_season', 'user_id', 'season_id'),
+    )
+
 class TournamentModel(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user_model.id'))
@@ -47,6 +55,10 @@ class TournamentModel(db.Model):
     season_id = db.Column(db.Integer, db.ForeignKey('season_model.id'), nullable=False)
     season = db.relationship('SeasonModel', backref='tournaments')
 
+    __table_args__ = (
+        db.Index('ix_tournament_user_season', 'user_id', 'season_id', 'date'),
+    )
+
 class TournamentMatrixModel(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user_model.id'), nullable=False) 
@@ -58,6 +70,32 @@ class TournamentMatrixModel(db.Model):
     season_id = db.Column(db.Integer, db.ForeignKey('season_model.id'), nullable=False)
     season = db.relationship('SeasonModel', backref='matrix_entries')
 
+    __table_args__ = (
+        # One cell per (tournament, opponent, period, player); target of the bulk upsert
+        db.Index('uq_tournament_matrix_cell', 'tournament_id', 'opponent_name', 'period', 'player_name', unique=True),
+        # Season-wide reads (game totals, archive export)
+        db.Index('ix_tournament_matrix_user_season', 'user_id', 'season_id', 'tournament_id'),
+    )
+
+class TournamentMatrixBitmapModel(db.Model):
+    """Packed alternative to TournamentMatrixModel: one row per tournament.
+
+    Bit ``(player_idx * len(opponents) + opponent_idx) * 4 + (period - 1)`` of
+    ``cells`` (little-endian) is set when that player played that period.
+    """
+    __tablename__ = 'tournament_matrix_bitmap'
+
+    tournament_id = db.Column(db.Integer, db.ForeignKey('tournament_model.id', ondelete='CASCADE'), primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user_model.id'), nullable=False)
+    season_id = db.Column(db.Integer, db.ForeignKey('season_model.id'), nullable=False)
+    player_names = db.Column(db.Text, nullable=False, default='')    # comma-separated, bitmap row order
+    opponent_names = db.Column(db.Text, nullable=False, default='')  # comma-separated, bitmap column order
+    cells = db.Column(db.LargeBinary, nullable=False, default=b'')
+
+    __table_args__ = (
+        db.Index('ix_tournament_matrix_bitmap_user_season', 'user_id', 'season_id'),
+    )
+
 class PracticeRegisterModel(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user_model.id'))
@@ -69,6 +107,54 @@ class PracticeRegisterModel(db.Model):
     season_id = db.Column(db.Integer, db.ForeignKey('season_model.id'), nullable=False)
     season = db.relationship('SeasonModel', backref='practice_registers')
 
+    __table_args__ = (
+        # Date-range lists (practice register, monthly PDF)
+        db.Index('ix_practice_register_user_season_date', 'user_id', 'season_id', 'date'),
+    )
+
+# Association tables (indexed replacements for the comma-separated TEXT columns)
+class TournamentPlayerModel(db.Model):
+    __tablename__ = 'tournament_player'
+
+    tournament_id = db.Column(db.Integer, db.ForeignKey('tournament_model.id', ondelete='CASCADE'), primary_key=True)
+    player_id = db.Column(db.Integer, db.ForeignKey('player_model.id', ondelete='CASCADE'), primary_key=True)
+    position = db.Column(db.Integer, nullable=False, default=0)  # roster order
+
+    __table_args__ = (
+        db.Index('ix_tournament_player_player', 'player_id', 'tournament_id'),
+    )
+
+class TournamentOpponentModel(db.Model):
+    __tablename__ = 'tournament_opponent'
+
+    tournament_id = db.Column(db.Integer, db.ForeignKey('tournament_model.id', ondelete='CASCADE'), primary_key=True)
+    position = db.Column(db.Integer, primary_key=True)  # 0..5, form order
+    name = db.Column(db.String(100), nullable=False)
+
+    __table_args__ = (
+        db.Index('ix_tournament_opponent_name', 'tournament_id', 'name'),
+    )
+
+class PracticeAttendanceModel(db.Model):
+    __tablename__ = 'practice_attendance'
+
+    register_id = db.Column(db.Integer, db.ForeignKey('practice_register_model.id', ondelete='CASCADE'), primary_key=True)
+    player_id = db.Column(db.Integer, db.ForeignKey('player_model.id', ondelete='CASCADE'), primary_key=True)
+
+    __table_args__ = (
+        db.Index('ix_practice_attendance_player', 'player_id', 'register_id'),
+    )
+
+class PracticeRegisterExerciseModel(db.Model):
+    __tablename__ = 'practice_register_exercise'
+
+    register_id = db.Column(db.Integer, db.ForeignKey('practice_register_model.id', ondelete='CASCADE'), primary_key=True)
+    exercise_id = db.Column(db.Integer, db.ForeignKey('practice_exercise_model.id', ondelete='CASCADE'), primary_key=True)
+
+    __table_args__ = (
+        db.Index('ix_practice_register_exercise_exercise', 'exercise_id', 'register_id'),
+    )
+
 class UserModel(db.Model, UserMixin):
     __tablename__ = 'user_model'  # Add this line!
 
@@ -95,6 +181,10 @@ class SeasonModel(db.Model):
 
     user = db.relationship('UserModel', backref='seasons')
 
+    __table_args__ = (
+        db.Index('ix_season_user', 'user_id', 'created_at'),
+    )
+
 class PlayerSeasonStatsModel(db.Model):
     __tablename__ = 'player_season_stats'
 
@@ -110,4 +200,59 @@ class PlayerSeasonStatsModel(db.Model):
     weight_kg = db.Column(db.Integer)
 
     player = db.relationship('PlayerModel', backref='season_stats')
-    season = db.relationship('SeasonModel', backref='player_stats')
\ No newline at end of file
+    season = db.relationship('SeasonModel', backref='player_stats')
+
+    __table_args__ = (
+        db.Index('ix_player_season_stats_player_season', 'player_id', 'season_id'),
+    )
+
+class PlayerSeasonAggregateModel(db.Model):
+    """Read model: per-player season totals, maintained on every matrix/register write."""
+    __tablename__ = 'player_season_aggregate'
+
+    player_id = db.Column(db.Integer, db.ForeignKey('player_model.id', ondelete='CASCADE'), primary_key=True)
+    season_id = db.Column(db.Integer, db.ForeignKey('season_model.id'), primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user_model.id'), nullable=False)
+
+    game_minutes = db.Column(db.Integer, nullable=False, default=0)
+    games_played = db.Column(db.Integer, nullable=False, default=0)
+    practices_attended = db.Column(db.Integer, nullable=False, default=0)
+    practice_minutes = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        db.Index('ix_player_season_aggregate_user_season', 'user_id', 'season_id'),
+    )
+
+class ExportJobModel(db.Model):
+    """Queued PDF export; rendered off the request by app/export_jobs.py."""
+    __tablename__ = 'export_job'
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user_model.id'), nullable=False)
+    season_id = db.Column(db.Integer, db.ForeignKey('season_model.id'))
+    kind = db.Column(db.String(50), nullable=False)
+    filename = db.Column(db.String(200), nullable=False)
+    status = db.Column(db.String(20), nullable=False, default='queued')  # queued / running / done / failed
+
+    html = db.Column(db.Text)  # rendered template, cleared once the PDF exists
+    cache_key = db.Column(db.String(64))  # export cache entry the result is stored under
+    result = db.Column(db.LargeBinary)
+    error = db.Column(db.Text)
+
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime)
+    finished_at = db.Column(db.DateTime)
+
+    __table_args__ = (
+        db.Index('ix_export_job_status', 'status', 'id'),
+        db.Index('ix_export_job_user', 'user_id', 'created_at'),
+    )
+
+class SeasonDataVersionModel(db.Model):
+    """Per-season counter bumped by every write; cache keys include it (app/data_version.py)."""
+    __tablename__ = 'season_data_version'
+
+    season_id = db.Column(db.Integer, db.ForeignKey('season_model.id', ondelete='CASCADE'), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
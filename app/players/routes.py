@@ -1,13 +1,20 @@
 from flask import Blueprint, render_template, request, redirect, session
 from flask_login import login_required, current_user
-from ..models import PlayerModel, PlayerSeasonStatsModel, PracticeRegisterModel, TournamentMatrixModel, SeasonModel  
+from sqlalchemy.orm import joinedload
+from ..models import PlayerModel, PlayerSeasonStatsModel, PracticeRegisterModel, SeasonModel, PracticeAttendanceModel, PlayerSeasonAggregateModel
 from .. import db 
+from ..roster import delete_player_links
+from ..stats import refresh_aggregates, game_totals
+from ..data_version import bump_data_version
+from ..aggregate_cache import aggregate_cache
+from ..conditional import conditional_get
 from flask import url_for                
 
 players_bp = Blueprint('players', __name__, url_prefix='/players')
 
 @players_bp.route('/', methods=['GET', 'POST'])
 @login_required
+@conditional_get
 def manage_players():
 
     season_id = session.get('season_id')
@@ -27,6 +34,9 @@ def manage_players():
             email=request.form['email']
         )
         db.session.add(new_player)
+        db.session.flush()
+        refresh_aggregates(current_user.id, season_id, player_ids=[new_player.id])
+        bump_data_version(season_id)
         db.session.commit()
         return redirect('/players')
 
@@ -37,6 +47,7 @@ from app.models import SeasonModel  # or whatever your season model is called
 
 @players_bp.route('/edit-player/<int:player_id>', methods=['GET', 'POST'])
 @login_required
+@conditional_get
 def edit_player(player_id):
     player = PlayerModel.query.get_or_404(player_id)
 
@@ -54,6 +65,9 @@ def edit_player(player_id):
         player.dob = request.form['dob']
         player.mobile_phone = request.form['mobile_phone']
         player.email = request.form['email']
+        # Matrix cells reference players by name, so a rename changes their totals
+        refresh_aggregates(current_user.id, player.season_id, player_ids=[player.id])
+        bump_data_version(player.season_id)
         db.session.commit()
         return redirect('/players')
 
@@ -73,12 +87,16 @@ def delete_player(player_id):
     if player.user_id != current_user.id or player.season_id != season_id:
         return "⛔ Unauthorized", 403
 
+    delete_player_links(player.id)
+    PlayerSeasonAggregateModel.query.filter_by(player_id=player.id).delete()
     db.session.delete(player)
+    bump_data_version(season_id)
     db.session.commit()
     return redirect(url_for('players.manage_players'))
 
 @players_bp.route('/player/<int:player_id>/season-stats', methods=['GET', 'POST'])
 @login_required
+@conditional_get
 def player_season_stats(player_id):
     season_id = session.get('season_id')
     if not season_id:
@@ -90,20 +108,20 @@ def player_season_stats(player_id):
     if player.user_id != current_user.id or player.season_id != season_id:
         return "⛔ Unauthorized", 403
 
-    # Try to find existing stats or create new
+    # Existing stats, or an unsaved blank form: the row is only created on POST
     stats = PlayerSeasonStatsModel.query.filter_by(player_id=player.id, season_id=season_id).first()
     if not stats:
         stats = PlayerSeasonStatsModel(player_id=player.id, season_id=season_id)
-        db.session.add(stats)
-        db.session.commit()
 
     if request.method == 'POST':
+        db.session.add(stats)
         stats.behavior = request.form.get('behavior')
         stats.technical_skills = request.form.get('technical_skills')
         stats.team_relation = request.form.get('team_relation')
         stats.improvement_areas = request.form.get('improvement_areas')
         stats.height_cm = request.form.get('height_cm') or None
         stats.weight_kg = request.form.get('weight_kg') or None
+        bump_data_version(season_id)
         db.session.commit()
         return redirect(url_for('players.manage_players'))
 
@@ -111,6 +129,7 @@ def player_season_stats(player_id):
 
 @players_bp.route('/player/<int:player_id>/history')
 @login_required
+@conditional_get
 def player_history(player_id):
     season_id = session.get('season_id')
     if not season_id:
@@ -123,21 +142,27 @@ def player_history(player_id):
         return "⛔ Unauthorized", 403
 
     # ✅ Fetch season-scoped data for this user/player
-    all_stats = PlayerSeasonStatsModel.query.filter_by(player_id=player_id, season_id=season_id).all()
-    all_registers = PracticeRegisterModel.query.filter_by(user_id=current_user.id, season_id=season_id).all()
-    all_matrix_entries = TournamentMatrixModel.query.filter_by(
-        user_id=current_user.id,
-        season_id=season_id,
-        played=True,
-    ).all()
-
-    # 🔢 Aggregate stats
-    total_practices = 0
-    for r in all_registers:
-        if r.players_present and player.name in r.players_present:
-            total_practices += 1
-
-    total_games = sum(1 for entry in all_matrix_entries if entry.player_name == player.name)
+    all_stats = PlayerSeasonStatsModel.query.options(
+        joinedload(PlayerSeasonStatsModel.season)
+    ).filter_by(player_id=player_id, season_id=season_id).all()
+
+    # 🔢 Aggregate stats (cached until the season's next write)
+    def compute():
+        practices = PracticeAttendanceModel.query.join(
+            PracticeRegisterModel, PracticeRegisterModel.id == PracticeAttendanceModel.register_id
+        ).filter(
+            PracticeAttendanceModel.player_id == player.id,
+            PracticeRegisterModel.user_id == current_user.id,
+            PracticeRegisterModel.season_id == season_id,
+        ).count()
+
+        # Distinct games (tournament × opponent), read through the configured matrix store
+        _, games = game_totals(current_user.id, season_id, [player.name]).get(player.name, (0, 0))
+        return practices, games
+
+    total_practices, total_games = aggregate_cache.get_or_compute(
+        'player-history', current_user.id, season_id, compute, {'player_id': player.id}
+    )
 
     # 🧠 Latest stats entry (optional)
     latest_stats = all_stats[-1] if all_stats else None
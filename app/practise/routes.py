@@ -1,7 +1,12 @@
 from flask import Blueprint, render_template, request, redirect, url_for, session
 from flask_login import login_required, current_user
 from app import db
-from app.models import PlayerModel, PracticeExerciseModel, PracticeRegisterModel
+from app.models import PracticeExerciseModel, PracticeRegisterModel
+from app.roster import sync_register_links, delete_register_links, delete_exercise_links, split_csv
+from app.stats import refresh_aggregates
+from app.data_version import bump_data_version
+from app.identity import season_roster
+from app.conditional import conditional_get
 from datetime import datetime, timedelta
 
 practise_bp = Blueprint('practise', __name__, url_prefix='/practise')
@@ -15,11 +20,8 @@ def practice_register():
     if not season_id:
         return redirect(url_for('season.manage_seasons'))
 
-    raw_players = PlayerModel.query.filter_by(user_id=current_user.id, season_id=season_id).all()
-    all_players = sorted(
-    [{"name": p.name, "alias": p.alias or p.name} for p in raw_players],
-    key=lambda x: x["alias"].lower())
-    alias_lookup = {p["name"]: p["alias"] for p in all_players}
+    all_players = season_roster()  # sorted by alias
+    alias_lookup = {p.name: p.alias for p in all_players}
 
     all_exercises = PracticeExerciseModel.query.filter_by(user_id=current_user.id, season_id=season_id).all()
 
@@ -41,6 +43,10 @@ def practice_register():
             duration_minutes=duration
         )
         db.session.add(register)
+        db.session.flush()
+        sync_register_links(register)
+        refresh_aggregates(current_user.id, season_id, player_names=split_csv(players_present))
+        bump_data_version(season_id)
         db.session.commit()
         return redirect(url_for('practise.practice_register'))
 
@@ -80,6 +86,7 @@ def practice_register():
 
 @practise_bp.route('/practice-register/<int:register_id>/edit', methods=['GET', 'POST'])
 @login_required
+@conditional_get
 def edit_practice_register(register_id):
 
     season_id=session.get('season_id')
@@ -93,20 +100,22 @@ def edit_practice_register(register_id):
     if register.user_id != current_user.id or register.season_id != season_id:
         return "⛔️ Unauthorized", 403
 
-    raw_players = PlayerModel.query.filter_by(user_id=current_user.id, season_id=season_id).all()
-    all_players = sorted(
-    [{"name": p.name, "alias": p.alias or p.name} for p in raw_players],
-    key=lambda x: x["alias"].lower())
+    all_players = season_roster()
 
     all_exercises = PracticeExerciseModel.query.filter_by(user_id=current_user.id, season_id=season_id).all()
 
     if request.method == 'POST':
+        previous_players = split_csv(register.players_present)
         date_str = request.form['date']
         register.date = datetime.strptime(date_str, '%Y-%m-%d').date()
         register.players_present = ','.join(request.form.getlist('players'))
         register.exercises_used = ','.join(request.form.getlist('exercises'))
         register.coach_notes = request.form.get('coach_notes', '')
         register.duration_minutes = int(request.form.get('duration_minutes', 0))
+        sync_register_links(register)
+        refresh_aggregates(current_user.id, season_id,
+                           player_names=previous_players + split_csv(register.players_present))
+        bump_data_version(season_id)
         db.session.commit()
         return redirect(url_for('practise.practice_register'))
 
@@ -122,6 +131,7 @@ def edit_practice_register(register_id):
 
 @practise_bp.route('/practice-exercises', methods=['GET', 'POST'])
 @login_required
+@conditional_get
 def practice_exercises():
 
     season_id = session.get('season_id')
@@ -144,6 +154,7 @@ def practice_exercises():
             creation_date=datetime.now().strftime("%Y-%m-%d")  # optional: ensure it's set
         )
         db.session.add(new_exercise)
+        bump_data_version(season_id)
         db.session.commit()
         return redirect(url_for('practise.practice_exercises', open='form'))
 
@@ -156,6 +167,7 @@ def practice_exercises():
 
 @practise_bp.route('/practice-exercise/<int:exercise_id>/edit', methods=['GET', 'POST'])
 @login_required
+@conditional_get
 def edit_practice_exercise(exercise_id):
 
     season_id = session.get('season_id')
@@ -177,6 +189,7 @@ def edit_practice_exercise(exercise_id):
         exercise.image2 = request.form.get('image2')
         exercise.image3 = request.form.get('image3')
         exercise.image4 = request.form.get('image4')
+        bump_data_version(season_id)
         db.session.commit()
         return redirect(url_for('practise.practice_exercises'))
 
@@ -197,7 +210,9 @@ def delete_practice_exercise(exercise_id):
     if exercise.user_id != current_user.id or exercise.season_id != season_id:
         return "⛔ Unauthorized", 403
     
+    delete_exercise_links(exercise.id)
     db.session.delete(exercise)
+    bump_data_version(season_id)
     db.session.commit()
     return redirect(url_for('practise.practice_exercises'))
 
@@ -215,6 +230,10 @@ def delete_practice_register(register_id):
     if register.user_id != current_user.id or register.season_id != season_id:
         return "⛔ Unauthorized", 403
     
+    previous_players = split_csv(register.players_present)
+    delete_register_links(register.id)
     db.session.delete(register)
+    refresh_aggregates(current_user.id, season_id, player_names=previous_players)
+    bump_data_version(season_id)
     db.session.commit()
     return redirect(url_for('practise.practice_register'))
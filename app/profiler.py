@@ -0,0 +1,210 @@
+import cProfile
+import json
+import os
+import pstats
+import re
+import tempfile
+import time
+from collections import Counter, defaultdict
+from datetime import datetime
+
+from flask import abort, current_app, g, jsonify, request, send_from_directory, url_for
+from flask_login import current_user
+
+# On-demand request profiler.
+#
+# A request carrying "X-Profile: 1" (or "?profile=1") from an allowed user
+# runs under cProfile. The result lands in PROFILER_DIR as
+#     <id>.pstats     for `python -m pstats`, snakeviz, ...
+#     <id>.collapsed  folded stacks for flamegraph.pl / speedscope
+#     <id>.json       endpoint, method, path, user, wall time
+# and the response carries "X-Profile-Id: <id>". /admin/profiles lists the
+# most recent ones with download links.
+#
+# Who may profile: everyone logged in when PROFILER_ENABLED is set (local,
+# staging), otherwise only the usernames in PROFILER_USERS (production).
+# Profiles carry other accounts' routes and timings, so the usernames in
+# PROFILER_USERS see all of them; anyone else only their own.
+# Profiled requests skip the export/aggregate caches and conditional GET so
+# the profile shows the real work. PDFs rendered in the EXPORT_JOB_WORKERS
+# process pool run outside the request and are not included.
+
+_PROFILE_ID = re.compile(r'^[\w.-]+$')
+
+
+def _allowed():
+    if not current_user.is_authenticated:
+        return False
+    config = current_app.config
+    return config['PROFILER_ENABLED'] or current_user.username in config['PROFILER_USERS']
+
+
+def _sees_all_profiles():
+    return current_user.is_authenticated and current_user.username in current_app.config['PROFILER_USERS']
+
+
+def _visible(profile):
+    return _sees_all_profiles() or profile.get('user_id') == current_user.id
+
+
+def _requested():
+    return request.headers.get('X-Profile') == '1' or request.args.get('profile') == '1'
+
+
+def is_profiling():
+    """True while the current request is being profiled."""
+    return g.get('profiler') is not None
+
+
+def _label(func):
+    filename, line, name = func
+    if filename == '~':  # builtins
+        return name.replace(';', ',')
+    return f"{name} ({os.path.basename(filename)}:{line})".replace(';', ',')
+
+
+def collapsed_stacks(stats, min_fraction=0.0005):
+    """Folded stacks ("a;b;c <microseconds>") rebuilt from cProfile's caller graph.
+
+    cProfile only records caller -> callee edges, so a function's time is
+    split between the paths leading to it in proportion to the time of each
+    incoming edge. Recursion is cut at the first repeat; paths worth less
+    than ``min_fraction`` of the total are dropped.
+    """
+    children = defaultdict(list)
+    for func, (_, _, _, _, callers) in stats.items():
+        for caller, edge in callers.items():
+            children[caller].append((func, edge[3]))
+    roots = [func for func, entry in stats.items() if not entry[4]]
+    floor = sum(stats[func][3] for func in roots) * min_fraction
+
+    folded = Counter()
+    # (function, labels of the path so far, functions on it, share of the function's time)
+    pending = [(func, (), frozenset(), 1.0) for func in roots]
+    while pending:
+        func, path, seen, share = pending.pop()
+        path += (_label(func),)
+        seen |= {func}
+        own = stats[func][2] * share
+        if own > 0:
+            folded[';'.join(path)] += own
+        for child, edge_time in children[func]:
+            child_total = stats[child][3]
+            if child in seen or child_total <= 0 or edge_time * share < floor:
+                continue
+            pending.append((child, path, seen, min(1.0, edge_time * share / child_total)))
+
+    return [f"{stack} {round(seconds * 1e6)}" for stack, seconds in folded.most_common() if seconds * 1e6 >= 1]
+
+
+def _start_profile():
+    if not _requested() or not _allowed():
+        return
+    g.profile_id = f"{datetime.now():%Y%m%d-%H%M%S-%f}-{request.endpoint or 'unmatched'}-{os.getpid()}"
+    g.profile_started = time.perf_counter()
+    g.profiler = cProfile.Profile()
+    g.profiler.enable()
+
+
+def _add_profile_id(response):
+    if is_profiling():
+        response.headers['X-Profile-Id'] = g.profile_id
+    return response
+
+
+def _finish_profile(exc):
+    profiler = g.pop('profiler', None)
+    if profiler is None:
+        return
+    profiler.disable()
+    elapsed = time.perf_counter() - g.profile_started
+    profile_id = g.profile_id
+
+    directory = current_app.config['PROFILER_DIR']
+    os.makedirs(directory, exist_ok=True)
+    base = os.path.join(directory, profile_id)
+    profiler.dump_stats(base + '.pstats')
+    stats = pstats.Stats(profiler).stats
+    with open(base + '.collapsed', 'w') as f:
+        f.write('\n'.join(collapsed_stacks(stats)) + '\n')
+    with open(base + '.json', 'w') as f:
+        json.dump({
+            'id': profile_id,
+            'endpoint': request.endpoint,
+            'method': request.method,
+            'path': request.full_path.rstrip('?'),
+            'user': current_user.username if current_user.is_authenticated else None,
+            'user_id': current_user.id if current_user.is_authenticated else None,
+            'duration_ms': round(elapsed * 1000, 1),
+            'error': repr(exc) if exc else None,
+            'created': datetime.now().isoformat(timespec='seconds'),
+        }, f)
+    current_app.logger.info("🔬 Profiled %s %s in %.0f ms → %s", request.method, request.path, elapsed * 1000, base)
+    _prune(directory, current_app.config['PROFILER_KEEP'])
+
+
+def _recent(directory):
+    """Metadata of the stored profiles, newest first."""
+    try:
+        names = [name for name in os.listdir(directory) if name.endswith('.json')]
+    except FileNotFoundError:
+        return []
+    profiles = []
+    for name in names:
+        try:
+            with open(os.path.join(directory, name)) as f:
+                profiles.append(json.load(f))
+        except (OSError, ValueError):
+            continue  # being written or pruned by another worker
+    return sorted(profiles, key=lambda p: p['id'], reverse=True)  # ids start with a timestamp
+
+
+def _prune(directory, keep):
+    for profile in _recent(directory)[keep:]:
+        for suffix in ('.json', '.pstats', '.collapsed'):
+            try:
+                os.remove(os.path.join(directory, profile['id'] + suffix))
+            except FileNotFoundError:
+                pass
+
+
+def list_profiles():
+    if not _allowed():
+        return "⛔ Unauthorized", 403
+    profiles = [profile for profile in _recent(current_app.config['PROFILER_DIR']) if _visible(profile)]
+    for profile in profiles:
+        profile['pstats'] = url_for('profile_file', filename=profile['id'] + '.pstats')
+        profile['collapsed'] = url_for('profile_file', filename=profile['id'] + '.collapsed')
+    return jsonify(profiles)
+
+
+def profile_file(filename):
+    stem, _, suffix = filename.rpartition('.')
+    if not _allowed():
+        return "⛔ Unauthorized", 403
+    if suffix not in ('pstats', 'collapsed') or not _PROFILE_ID.match(stem):
+        abort(404)
+    try:
+        with open(os.path.join(current_app.config['PROFILER_DIR'], stem + '.json')) as f:
+            profile = json.load(f)
+    except (OSError, ValueError):
+        abort(404)
+    if not _visible(profile):
+        return "⛔ Unauthorized", 403
+    return send_from_directory(current_app.config['PROFILER_DIR'], filename, as_attachment=True)
+
+
+def init_profiler(app):
+    app.config.setdefault('PROFILER_ENABLED', os.environ.get('PROFILER_ENABLED') == '1')
+    app.config.setdefault('PROFILER_USERS', {
+        name.strip() for name in os.environ.get('PROFILER_USERS', '').split(',') if name.strip()
+    })
+    app.config.setdefault('PROFILER_DIR', os.environ.get(
+        'PROFILER_DIR', os.path.join(tempfile.gettempdir(), 'team-manager-profiles')))
+    app.config.setdefault('PROFILER_KEEP', int(os.environ.get('PROFILER_KEEP', 50)))
+
+    app.before_request(_start_profile)
+    app.after_request(_add_profile_id)
+    app.teardown_request(_finish_profile)
+    app.add_url_rule('/admin/profiles', 'profiles', list_profiles)
+    app.add_url_rule('/admin/profiles/<filename>', 'profile_file', profile_file)
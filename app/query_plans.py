@@ -0,0 +1,198 @@
+import re
+from datetime import date, timedelta
+
+from sqlalchemy import event, insert, inspect, select
+
+from .extensions import db
+from .models import (
+    UserModel, SeasonModel, PlayerModel, PracticeExerciseModel, TournamentModel, TournamentMatrixModel,
+    PracticeRegisterModel, PlayerSeasonStatsModel,
+)
+
+# Query plans: EXPLAIN for the slow-query log (app/sql_instrumentation.py),
+# the migration that adds the model indexes to existing databases, and the
+# plan check behind `flask check-query-plans`.
+#
+# The check seeds a few thousand rows for throwaway users inside a
+# transaction, runs the hot queries below, and fails if any of their plans
+# reads a whole table. The transaction is always rolled back.
+
+_SEQ_SCAN = (
+    re.compile(r'Seq Scan on (\w+)'),          # PostgreSQL
+    re.compile(r'^SCAN (\w+)(?!.*\bUSING\b)'),  # SQLite: "SCAN t" without "USING [COVERING] INDEX"
+)
+
+
+def explain(dbapi_connection, dialect, statement, parameters, analyze=False):
+    """Plan of ``statement`` as text lines, or [] for dialects without support.
+
+    Runs on the raw DBAPI connection, so no SQLAlchemy events fire. On
+    PostgreSQL the EXPLAIN is wrapped in a savepoint: a failure leaves the
+    surrounding transaction usable, and with ``analyze`` only SELECTs are
+    actually executed again.
+    """
+    postgres = dialect == 'postgresql'
+    if postgres:
+        analyze = analyze and statement.lstrip()[:6].upper() == 'SELECT'
+        prefix = 'EXPLAIN (ANALYZE, BUFFERS) ' if analyze else 'EXPLAIN '
+    elif dialect == 'sqlite':
+        prefix = 'EXPLAIN QUERY PLAN '
+    else:
+        return []
+
+    cursor = dbapi_connection.cursor()
+    try:
+        if postgres:
+            cursor.execute('SAVEPOINT query_plan')
+        try:
+            cursor.execute(prefix + statement, parameters)
+            rows = cursor.fetchall()
+        finally:
+            if postgres:
+                cursor.execute('ROLLBACK TO SAVEPOINT query_plan')
+                cursor.execute('RELEASE SAVEPOINT query_plan')
+    finally:
+        cursor.close()
+    return [row[0] for row in rows] if postgres else [row[3] for row in rows]  # SQLite: (id, parent, _, detail)
+
+
+def sequential_scans(plan):
+    """Tables the plan reads in full."""
+    tables = set()
+    for line in plan:
+        for pattern in _SEQ_SCAN:
+            match = pattern.search(line.strip())
+            if match:
+                tables.add(match.group(1))
+    return tables
+
+
+def create_missing_indexes():
+    """Create every index declared on the models that the database lacks.
+
+    ``db.create_all()`` only creates missing tables, so indexes added to
+    existing tables need this. Does not commit. Returns the names created.
+    """
+    connection = db.session.connection()
+    inspector = inspect(connection)
+    created = []
+    for table in db.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {index['name'] for index in inspector.get_indexes(table.name)}
+        for index in sorted(table.indexes, key=lambda i: i.name):
+            if index.name not in existing:
+                index.create(connection)
+                created.append(index.name)
+    return created
+
+
+# Hot queries, as the routes issue them: name → f(ids) returning a select
+HOT_QUERIES = {
+    'season players': lambda ids: select(PlayerModel).where(
+        PlayerModel.user_id == ids['user_id'], PlayerModel.season_id == ids['season_id'],
+    ).order_by(PlayerModel.name),
+    'season tournaments': lambda ids: select(TournamentModel).where(
+        TournamentModel.user_id == ids['user_id'], TournamentModel.season_id == ids['season_id'],
+    ).order_by(TournamentModel.date.desc()),
+    'season exercises': lambda ids: select(PracticeExerciseModel).where(
+        PracticeExerciseModel.user_id == ids['user_id'], PracticeExerciseModel.season_id == ids['season_id'],
+    ),
+    'tournament matrix': lambda ids: select(TournamentMatrixModel).where(
+        TournamentMatrixModel.tournament_id == ids['tournament_id'],
+        TournamentMatrixModel.season_id == ids['season_id'],
+        TournamentMatrixModel.user_id == ids['user_id'],
+    ),
+    'season matrix': lambda ids: select(
+        TournamentMatrixModel.player_name, TournamentMatrixModel.period,
+    ).where(
+        TournamentMatrixModel.user_id == ids['user_id'], TournamentMatrixModel.season_id == ids['season_id'],
+        TournamentMatrixModel.played.is_(True),
+    ),
+    'monthly practice registers': lambda ids: select(PracticeRegisterModel).where(
+        PracticeRegisterModel.user_id == ids['user_id'],
+        PracticeRegisterModel.season_id == ids['season_id'],
+        PracticeRegisterModel.date >= ids['month_start'],
+        PracticeRegisterModel.date <= ids['month_start'] + timedelta(days=30),
+    ).order_by(PracticeRegisterModel.date),
+    'player evaluations': lambda ids: select(PlayerSeasonStatsModel).where(
+        PlayerSeasonStatsModel.player_id == ids['player_id'],
+        PlayerSeasonStatsModel.season_id == ids['season_id'],
+    ),
+}
+
+
+def seed_plan_dataset(users=50, seasons=2, players=25, tournaments=10, registers=30):
+    """Throwaway data shaped like real accounts. Does not commit; returns ids for HOT_QUERIES."""
+    session = db.session
+    user_ids = session.scalars(insert(UserModel).returning(UserModel.id, sort_by_parameter_order=True), [
+        {'username': f'__plan_check_{i}', 'email': f'__plan_check_{i}@example.invalid', 'password_hash': '-'}
+        for i in range(users)
+    ]).all()
+    season_rows = [(user_id, n) for user_id in user_ids for n in range(seasons)]
+    season_ids = session.scalars(insert(SeasonModel).returning(SeasonModel.id, sort_by_parameter_order=True), [
+        {'user_id': user_id, 'name': f'20{20 + n}/20{21 + n}'} for user_id, n in season_rows
+    ]).all()
+    scopes = [{'user_id': user_id, 'season_id': season_id}
+              for (user_id, _), season_id in zip(season_rows, season_ids)]
+
+    player_ids = session.scalars(insert(PlayerModel).returning(PlayerModel.id, sort_by_parameter_order=True), [
+        dict(scope, name=f'Player {n:02d}', alias=f'P{n}') for scope in scopes for n in range(players)
+    ]).all()
+    session.execute(insert(PlayerSeasonStatsModel), [
+        {'player_id': player_id, 'season_id': scopes[i // players]['season_id'], 'behavior': '-'}
+        for i, player_id in enumerate(player_ids)
+    ])
+    session.execute(insert(PracticeExerciseModel), [
+        dict(scope, category='Passing', execution_description='-') for scope in scopes for _ in range(20)
+    ])
+
+    tournament_rows = [scope for scope in scopes for _ in range(tournaments)]
+    tournament_ids = session.scalars(insert(TournamentModel).returning(TournamentModel.id, sort_by_parameter_order=True), [
+        dict(scope, date=f'2025-01-{n % 28 + 1:02d}', place='-', team_name='-')
+        for n, scope in enumerate(tournament_rows)
+    ]).all()
+    session.execute(insert(TournamentMatrixModel), [
+        dict(scope, tournament_id=tournament_id, player_name=f'Player {p:02d}',
+             opponent_name=f'Opponent {o}', period=period, played=(p + period) % 2 == 0)
+        for scope, tournament_id in zip(tournament_rows, tournament_ids)
+        for p in range(8) for o in range(3) for period in range(1, 5)
+    ])
+
+    start = date(2025, 9, 1)
+    session.execute(insert(PracticeRegisterModel), [
+        dict(scope, date=start + timedelta(days=3 * n), duration_minutes=90)
+        for scope in scopes for n in range(registers)
+    ])
+
+    if session.get_bind().dialect.name == 'postgresql':
+        # Fresh rows have no statistics yet; the planner needs them to pick an index
+        for table in db.metadata.sorted_tables:
+            session.execute(db.text(f'ANALYZE {table.name}'))
+
+    middle = len(scopes) // 2
+    return dict(scopes[middle], tournament_id=tournament_ids[middle * tournaments],
+                player_id=player_ids[middle * players], month_start=start + timedelta(days=30))
+
+
+def check_hot_queries(ids):
+    """{query name: (plan lines, tables read in full)} for every entry of HOT_QUERIES."""
+    connection = db.session.connection()
+    dialect = connection.dialect.name
+    captured = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        captured.append((cursor.connection, statement, parameters))
+
+    results = {}
+    event.listen(connection, 'before_cursor_execute', capture)
+    try:
+        for name, build in HOT_QUERIES.items():
+            captured.clear()
+            connection.execute(build(ids)).all()
+            dbapi_connection, statement, parameters = captured[-1]
+            plan = explain(dbapi_connection, dialect, statement, parameters)
+            results[name] = (plan, sequential_scans(plan))
+    finally:
+        event.remove(connection, 'before_cursor_execute', capture)
+    return results
@@ -0,0 +1,105 @@
+from sqlalchemy import and_, exists, func, insert, literal, select
+from sqlalchemy.orm import aliased
+
+from .data_version import bump_data_version
+from .extensions import db
+from .models import PlayerModel, PracticeExerciseModel, PlayerSeasonStatsModel
+
+# Season rollover: copy the squad and the exercise library from one season
+# into another with set-based INSERT ... SELECT statements, one per entity,
+# whatever the roster size. Players are matched across the two seasons by
+# name (the key the rest of the app uses) and exercises by category and
+# description, so copies are skipped for rows already in the target and a
+# rollover can be re-run safely.
+
+ROLLOVER_ENTITIES = ('players', 'exercises', 'evaluations')
+
+
+def _copy_players(user_id, source_season_id, target_season_id):
+    p, existing = PlayerModel, aliased(PlayerModel)
+    columns = ['user_id', 'season_id', 'name', 'dob', 'mobile_phone', 'email', 'escalao', 'n_carteira', 'alias']
+    rows = select(
+        p.user_id, literal(target_season_id), p.name, p.dob, p.mobile_phone,
+        p.email, p.escalao, p.n_carteira, p.alias,
+    ).where(
+        p.user_id == user_id,
+        p.season_id == source_season_id,
+        ~exists().where(
+            existing.user_id == user_id,
+            existing.season_id == target_season_id,
+            existing.name == p.name,
+        ),
+    ).order_by(p.id)
+    return db.session.execute(insert(p).from_select(columns, rows)).rowcount
+
+
+def _copy_exercises(user_id, source_season_id, target_season_id):
+    e, existing = PracticeExerciseModel, aliased(PracticeExerciseModel)
+    columns = ['user_id', 'season_id', 'category', 'needed_material', 'execution_description',
+               'image1', 'image2', 'image3', 'image4', 'creation_date']
+    rows = select(
+        e.user_id, literal(target_season_id), e.category, e.needed_material, e.execution_description,
+        e.image1, e.image2, e.image3, e.image4, e.creation_date,
+    ).where(
+        e.user_id == user_id,
+        e.season_id == source_season_id,
+        ~exists().where(
+            existing.user_id == user_id,
+            existing.season_id == target_season_id,
+            existing.category == e.category,
+            existing.execution_description.is_not_distinct_from(e.execution_description),
+        ),
+    ).order_by(e.id)
+    return db.session.execute(insert(e).from_select(columns, rows)).rowcount
+
+
+def _copy_evaluations(user_id, source_season_id, target_season_id):
+    """Each player's latest evaluation of the source season, attached to the same-named target player."""
+    s = PlayerSeasonStatsModel
+    old, new, evaluated = aliased(PlayerModel), aliased(PlayerModel), aliased(s)
+
+    latest = select(func.max(s.id)).where(s.season_id == source_season_id).group_by(s.player_id)
+    # One target player per name, even if the target season has duplicates
+    target_players = select(
+        func.min(new.id).label('id'), new.name
+    ).where(
+        new.user_id == user_id,
+        new.season_id == target_season_id,
+    ).group_by(new.name).subquery()
+
+    columns = ['player_id', 'season_id', 'behavior', 'technical_skills', 'team_relation',
+               'improvement_areas', 'height_cm', 'weight_kg']
+    rows = select(
+        target_players.c.id, literal(target_season_id), s.behavior, s.technical_skills, s.team_relation,
+        s.improvement_areas, s.height_cm, s.weight_kg,
+    ).join(
+        old, and_(old.id == s.player_id, old.user_id == user_id)
+    ).join(
+        target_players, target_players.c.name == old.name
+    ).where(
+        s.id.in_(latest),
+        ~exists().where(evaluated.player_id == target_players.c.id, evaluated.season_id == target_season_id),
+    ).order_by(s.id)
+    return db.session.execute(insert(s).from_select(columns, rows)).rowcount
+
+
+def rollover_season(user_id, source_season_id, target_season_id, entities=('players', 'exercises')):
+    """Copy ``entities`` (see ROLLOVER_ENTITIES) from one season of the user into another.
+
+    Does not commit. Returns ``{entity: rows copied}``.
+    """
+    unknown = set(entities) - set(ROLLOVER_ENTITIES)
+    if unknown:
+        raise ValueError(f"Unknown rollover entities: {', '.join(sorted(unknown))}")
+
+    summary = {}
+    if 'players' in entities:
+        summary['players'] = _copy_players(user_id, source_season_id, target_season_id)
+    if 'exercises' in entities:
+        summary['exercises'] = _copy_exercises(user_id, source_season_id, target_season_id)
+    if 'evaluations' in entities:
+        summary['evaluations'] = _copy_evaluations(user_id, source_season_id, target_season_id)
+
+    if any(summary.values()):
+        bump_data_version(target_season_id)
+    return summary
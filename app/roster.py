@@ -0,0 +1,127 @@
+from .extensions import db
+from .models import (
+    PlayerModel,
+    PracticeExerciseModel,
+    PracticeRegisterModel,
+    TournamentModel,
+    TournamentPlayerModel,
+    TournamentOpponentModel,
+    PracticeAttendanceModel,
+    PracticeRegisterExerciseModel,
+)
+
+# The comma-separated TEXT columns stay as the display copy; the association
+# tables below are what attendance and roster queries join against.
+
+
+def split_csv(value):
+    return [s.strip() for s in (value or '').split(',') if s.strip()]
+
+
+def player_ids_by_name(user_id, season_id, names):
+    """Map player names → ids for one user/season (first match wins on duplicates)."""
+    if not names:
+        return {}
+    rows = db.session.query(PlayerModel.id, PlayerModel.name).filter(
+        PlayerModel.user_id == user_id,
+        PlayerModel.season_id == season_id,
+        PlayerModel.name.in_(set(names)),
+    ).order_by(PlayerModel.id).all()
+
+    lookup = {}
+    for player_id, name in rows:
+        lookup.setdefault(name, player_id)
+    return lookup
+
+
+def sync_register_links(register):
+    """Rewrite attendance and exercise link rows from the register's TEXT columns.
+
+    The register must already have an id (call ``db.session.flush()`` first).
+    """
+    PracticeAttendanceModel.query.filter_by(register_id=register.id).delete()
+    PracticeRegisterExerciseModel.query.filter_by(register_id=register.id).delete()
+
+    names = split_csv(register.players_present)
+    ids = player_ids_by_name(register.user_id, register.season_id, names)
+    player_ids = {ids[n] for n in names if n in ids}
+    db.session.add_all([
+        PracticeAttendanceModel(register_id=register.id, player_id=pid)
+        for pid in player_ids
+    ])
+
+    wanted = {int(e) for e in split_csv(register.exercises_used) if e.isdigit()}
+    if wanted:
+        exercise_ids = [eid for (eid,) in db.session.query(PracticeExerciseModel.id).filter(
+            PracticeExerciseModel.user_id == register.user_id,
+            PracticeExerciseModel.season_id == register.season_id,
+            PracticeExerciseModel.id.in_(wanted),
+        )]
+        db.session.add_all([
+            PracticeRegisterExerciseModel(register_id=register.id, exercise_id=eid)
+            for eid in exercise_ids
+        ])
+
+
+def sync_tournament_links(tournament):
+    """Rewrite roster and opponent link rows from the tournament's TEXT columns.
+
+    The tournament must already have an id (call ``db.session.flush()`` first).
+    """
+    TournamentPlayerModel.query.filter_by(tournament_id=tournament.id).delete()
+    TournamentOpponentModel.query.filter_by(tournament_id=tournament.id).delete()
+
+    names = split_csv(tournament.players)
+    ids = player_ids_by_name(tournament.user_id, tournament.season_id, names)
+    seen = set()
+    for position, name in enumerate(names):
+        player_id = ids.get(name)
+        if player_id is None or player_id in seen:
+            continue
+        seen.add(player_id)
+        db.session.add(TournamentPlayerModel(
+            tournament_id=tournament.id, player_id=player_id, position=position))
+
+    for position, name in enumerate(split_csv(tournament.opponents)):
+        db.session.add(TournamentOpponentModel(
+            tournament_id=tournament.id, position=position, name=name))
+
+
+def delete_register_links(register_id):
+    PracticeAttendanceModel.query.filter_by(register_id=register_id).delete()
+    PracticeRegisterExerciseModel.query.filter_by(register_id=register_id).delete()
+
+
+def delete_tournament_links(tournament_id):
+    TournamentPlayerModel.query.filter_by(tournament_id=tournament_id).delete()
+    TournamentOpponentModel.query.filter_by(tournament_id=tournament_id).delete()
+
+
+def delete_player_links(player_id):
+    PracticeAttendanceModel.query.filter_by(player_id=player_id).delete()
+    TournamentPlayerModel.query.filter_by(player_id=player_id).delete()
+
+
+def delete_exercise_links(exercise_id):
+    PracticeRegisterExerciseModel.query.filter_by(exercise_id=exercise_id).delete()
+
+
+def backfill_links(batch_size=500):
+    """One-off migration: populate every link table from the TEXT columns.
+
+    Safe to re-run; each register/tournament has its links rewritten.
+    Returns ``(registers, tournaments)`` processed.
+    """
+    counts = []
+    for model, sync in ((PracticeRegisterModel, sync_register_links),
+                        (TournamentModel, sync_tournament_links)):
+        ids = [row_id for (row_id,) in db.session.query(model.id).order_by(model.id)]
+        for start in range(0, len(ids), batch_size):
+            chunk = ids[start:start + batch_size]
+            for obj in model.query.filter(model.id.in_(chunk)).all():
+                sync(obj)
+            db.session.flush()
+        counts.append(len(ids))
+
+    db.session.commit()
+    return tuple(counts)
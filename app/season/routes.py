@@ -1,7 +1,10 @@
-from flask import Blueprint, render_template, request, redirect, url_for, session
+from flask import Blueprint, render_template, request, redirect, url_for, session, flash
 from flask_login import login_required, current_user
-from app.models import SeasonModel, PlayerModel
+from app.models import SeasonModel
 from app.extensions import db
+from app.identity import identity_cache
+from app.rollover import rollover_season, ROLLOVER_ENTITIES
+from app.season_archive import open_archive, import_season_archive
 
 season_bp = Blueprint('season', __name__, url_prefix='/season')
 
@@ -14,30 +17,15 @@ def manage_seasons():
 
         new_season = SeasonModel(name=name, year=year, user_id=current_user.id)
         db.session.add(new_season)
-        db.session.commit()
+        db.session.flush()
 
-        # ✅ If user selected to copy players from the current season
-        if request.form.get('copy_players') == 'on':
-            current_season_id = session.get('season_id')
-            if current_season_id:
-                current_players = PlayerModel.query.filter_by(
-                    user_id=current_user.id,
-                    season_id=current_season_id
-                ).all()
-
-                for p in current_players:
-                    copied = PlayerModel(
-                        user_id=p.user_id,
-                        season_id=new_season.id,
-                        name=p.name,
-                        dob=p.dob,
-                        mobile_phone=p.mobile_phone,
-                        email=p.email,
-                        escalao=p.escalao,
-                        n_carteira=p.n_carteira
-                    )
-                    db.session.add(copied)
-                db.session.commit()
+        # ✅ Roll the selected entities over from the current season
+        entities = [e for e in ROLLOVER_ENTITIES if request.form.get(f'copy_{e}') == 'on']
+        current_season_id = session.get('season_id')
+        if entities and current_season_id:
+            summary = rollover_season(current_user.id, current_season_id, new_season.id, entities)
+            flash("✅ Copied " + ", ".join(f"{count} {entity}" for entity, count in summary.items()), "success")
+        db.session.commit()
 
         # ✅ Auto-select the new season after creation
         session['season_id'] = new_season.id
@@ -60,4 +48,30 @@ def set_season():
             session['season_id'] = season_id
             current_user.last_season_id = season_id
             db.session.commit()
-    return redirect(request.referrer or url_for('home.dashboard'))
\ No newline at end of file
+            identity_cache.invalidate_user(current_user.id)
+    return redirect(request.referrer or url_for('home.dashboard'))
+
+@season_bp.route('/import', methods=['POST'])
+@login_required
+def import_season():
+    """Load an uploaded season archive (NDJSON, optionally gzip/zstd) as a new season."""
+    upload = request.files.get('archive')
+    if not upload or not upload.filename:
+        flash("⚠️ Choose an archive file to import", "warning")
+        return redirect(url_for('season.manage_seasons'))
+
+    try:
+        season, counts = import_season_archive(
+            open_archive(upload.stream), current_user.id, name=request.form.get('name') or None
+        )
+        db.session.commit()
+    except (ValueError, UnicodeDecodeError, OSError, EOFError) as exc:
+        db.session.rollback()
+        flash(f"❌ Import failed: {exc}", "danger")
+        return redirect(url_for('season.manage_seasons'))
+
+    # ✅ Auto-select the imported season
+    session['season_id'] = season.id
+    flash(f"✅ Imported '{season.name}': {counts.get('player', 0)} players, "
+          f"{counts.get('register', 0)} practices, {counts.get('tournament', 0)} tournaments", "success")
+    return redirect(url_for('season.manage_seasons'))
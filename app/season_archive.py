@@ -0,0 +1,396 @@
+import gzip
+import io
+import json
+import zlib
+from datetime import date, datetime
+
+from flask import current_app
+from sqlalchemy import insert, text
+
+from .data_version import bump_data_version
+from .extensions import db
+from .matrix_store import BitmapMatrixStore, get_matrix_store
+from .models import (
+    SeasonModel,
+    PlayerModel,
+    PlayerSeasonStatsModel,
+    PracticeExerciseModel,
+    PracticeRegisterModel,
+    PracticeRegisterExerciseModel,
+    PracticeAttendanceModel,
+    TournamentModel,
+    TournamentPlayerModel,
+    TournamentOpponentModel,
+    TournamentMatrixModel,
+    TournamentMatrixBitmapModel,
+)
+from .stats import refresh_aggregates
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+# Whole-season archive as NDJSON: one JSON object per line, each tagged with
+# its record "type". The stream starts with an "archive" header and the
+# "season" record, then every table of the season with parents before
+# children, and ends with an "end" record holding the per-type counts (an
+# archive without it was truncated).
+#
+# Records keep their original ids; user_id/season_id are left out. The
+# importer gives every row a new id in the target database and remaps the
+# references through those ids, so an archive can be loaded into another
+# season or another account. Matrix cells are stored store-independent
+# (tournament, player, opponent, period, played) and written into whatever
+# MATRIX_STORAGE the importing app uses.
+#
+# Bulk loading uses COPY FROM STDIN on PostgreSQL (psycopg2) and batched
+# executemany inserts elsewhere.
+
+ARCHIVE_FORMAT = 1
+ARCHIVE_BATCH_ROWS = 5000
+COMPRESSIONS = ('none', 'gzip', 'zstd')
+
+# type → (model, columns remapped through another type's new ids).
+# Ordered: a record's references always point to types listed above it.
+RECORD_TYPES = {
+    'player': (PlayerModel, {'id': 'player'}),
+    'player_stats': (PlayerSeasonStatsModel, {'id': 'player_stats', 'player_id': 'player'}),
+    'exercise': (PracticeExerciseModel, {'id': 'exercise'}),
+    'register': (PracticeRegisterModel, {'id': 'register'}),
+    'register_exercise': (PracticeRegisterExerciseModel, {'register_id': 'register', 'exercise_id': 'exercise'}),
+    'attendance': (PracticeAttendanceModel, {'register_id': 'register', 'player_id': 'player'}),
+    'tournament': (TournamentModel, {'id': 'tournament'}),
+    'tournament_player': (TournamentPlayerModel, {'tournament_id': 'tournament', 'player_id': 'player'}),
+    'tournament_opponent': (TournamentOpponentModel, {'tournament_id': 'tournament'}),
+    'matrix': (TournamentMatrixModel, {'tournament_id': 'tournament'}),
+}
+MATRIX_FIELDS = ('tournament_id', 'player_name', 'opponent_name', 'period', 'played')
+SCOPE_COLUMNS = ('user_id', 'season_id')
+
+
+def _json_default(value):
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    raise TypeError(f"{value.__class__.__name__} is not JSON serializable")
+
+
+def _line(record):
+    return json.dumps(record, default=_json_default, ensure_ascii=False, separators=(',', ':')) + '\n'
+
+
+def _exported_columns(model):
+    return [c for c in model.__table__.columns if c.name not in SCOPE_COLUMNS]
+
+
+def _season_query(record_type, model, columns, user_id, season_id):
+    query = db.session.query(*columns)
+    if record_type in ('register_exercise', 'attendance'):
+        parent = PracticeRegisterModel
+        query = query.join(parent, parent.id == model.register_id)
+    elif record_type in ('tournament_player', 'tournament_opponent'):
+        parent = TournamentModel
+        query = query.join(parent, parent.id == model.tournament_id)
+    else:
+        parent = model
+
+    query = query.filter(parent.season_id == season_id)
+    if 'user_id' in parent.__table__.columns:
+        query = query.filter(parent.user_id == user_id)
+    return query.order_by(*model.__table__.primary_key.columns)
+
+
+def iter_season_archive(user_id, season_id, batch_size=ARCHIVE_BATCH_ROWS):
+    """Yield the season as NDJSON lines (str), reading every table in batches."""
+    season = SeasonModel.query.filter_by(id=season_id, user_id=user_id).first()
+    if season is None:
+        raise ValueError(f"Season {season_id} not found")
+
+    yield _line({
+        'type': 'archive',
+        'format': ARCHIVE_FORMAT,
+        'created_at': datetime.utcnow(),
+        'source_season_id': season.id,
+    })
+    yield _line({'type': 'season', 'name': season.name, 'year': season.year})
+
+    counts = {}
+    for record_type, (model, _) in RECORD_TYPES.items():
+        count = 0
+        if record_type == 'matrix':
+            rows = get_matrix_store().iter_season_cells(user_id, season_id)
+            names = MATRIX_FIELDS
+        else:
+            columns = _exported_columns(model)
+            names = [c.name for c in columns]
+            rows = _season_query(record_type, model, [getattr(model, n) for n in names],
+                                 user_id, season_id).yield_per(batch_size)
+
+        for row in rows:
+            record = {'type': record_type}
+            record.update(zip(names, row))
+            yield _line(record)
+            count += 1
+        counts[record_type] = count
+
+    yield _line({'type': 'end', 'counts': counts})
+
+
+def compress_stream(lines, compression='none'):
+    """Encode NDJSON lines to bytes, optionally gzip/zstd-compressed as they stream."""
+    if compression == 'gzip':
+        z = zlib.compressobj(6, zlib.DEFLATED, 31)
+        compress, finish = z.compress, z.flush
+    elif compression == 'zstd':
+        if not ZSTD_AVAILABLE:
+            raise ValueError("zstd compression needs the 'zstandard' package")
+        z = zstandard.ZstdCompressor().compressobj()
+        compress, finish = z.compress, z.flush
+    elif compression == 'none':
+        compress, finish = (lambda data: data), (lambda: b'')
+    else:
+        raise ValueError(f"Unknown compression '{compression}'")
+
+    pending, size = [], 0
+    for line in lines:
+        data = line.encode()
+        pending.append(data)
+        size += len(data)
+        if size >= 64 * 1024:
+            out = compress(b''.join(pending))
+            pending, size = [], 0
+            if out:
+                yield out
+    out = compress(b''.join(pending)) + finish()
+    if out:
+        yield out
+
+
+def open_archive(fileobj):
+    """Text stream over an archive file object, sniffing gzip/zstd from its magic bytes."""
+    buffered = io.BufferedReader(fileobj) if not hasattr(fileobj, 'peek') else fileobj
+    magic = buffered.peek(4)[:4]
+    if magic[:2] == b'\x1f\x8b':
+        raw = gzip.GzipFile(fileobj=buffered)
+    elif magic == b'\x28\xb5\x2f\xfd':
+        if not ZSTD_AVAILABLE:
+            raise ValueError("This archive is zstd-compressed; install the 'zstandard' package")
+        raw = zstandard.ZstdDecompressor().stream_reader(buffered)
+    else:
+        raw = buffered
+    return io.TextIOWrapper(raw, encoding='utf-8')
+
+
+# --- Import ---------------------------------------------------------------
+
+
+def _copy_value(value):
+    """One field in PostgreSQL COPY text format."""
+    if value is None:
+        return '\\N'
+    if isinstance(value, bool):
+        return 't' if value else 'f'
+    if isinstance(value, bytes):
+        return '\\\\x' + value.hex()
+    return str(value).replace('\\', '\\\\').replace('\t', '\\t').replace('\n', '\\n').replace('\r', '\\r')
+
+
+class _BulkWriter:
+    """Inserts row dicts into one table per call: COPY on PostgreSQL, executemany elsewhere."""
+
+    def __init__(self):
+        self.connection = db.session.connection()
+        self.copy = self.connection.dialect.name == 'postgresql' and self.connection.dialect.driver == 'psycopg2'
+
+    def insert(self, table, rows):
+        if not rows:
+            return
+        if not self.copy:
+            db.session.execute(insert(table), rows)
+            return
+
+        names = list(rows[0])
+        buffer = io.StringIO()
+        for row in rows:
+            buffer.write('\t'.join(_copy_value(row[n]) for n in names))
+            buffer.write('\n')
+        buffer.seek(0)
+        columns = ', '.join(f'"{n}"' for n in names)
+        cursor = self.connection.connection.cursor()
+        try:
+            cursor.copy_expert(f'COPY {table.name} ({columns}) FROM STDIN', buffer)
+        finally:
+            cursor.close()
+
+    def reserve_ids(self, table, count):
+        """``count`` fresh primary key values for ``table``."""
+        if self.connection.dialect.name == 'postgresql':
+            return list(self.connection.execute(text(
+                "SELECT nextval(pg_get_serial_sequence(:table, 'id')) FROM generate_series(1, :n)"
+            ), {'table': table.name, 'n': count}).scalars())
+        # SQLite & co.: the import transaction already holds the write lock
+        start = (self.connection.execute(text(f"SELECT MAX(id) FROM {table.name}")).scalar() or 0) + 1
+        return list(range(start, start + count))
+
+
+def _coerce(columns, record):
+    """JSON values → Python values the column types accept."""
+    row = {}
+    for name, value in record.items():
+        column = columns.get(name)
+        if column is None:
+            continue
+        if isinstance(value, str):
+            if isinstance(column.type, db.DateTime):
+                value = datetime.fromisoformat(value)
+            elif isinstance(column.type, db.Date):
+                value = date.fromisoformat(value)
+        row[name] = value
+    return row
+
+
+class _SeasonImporter:
+
+    def __init__(self, user_id, season_id):
+        self.user_id = user_id
+        self.season_id = season_id
+        self.writer = _BulkWriter()
+        self.ids = {record_type: {} for record_type in RECORD_TYPES}
+        self.counts = {}
+        self.bitmap = get_matrix_store().name == 'bitmap'
+        self._bitmap_tournament = None
+        self._bitmap_cells = {}
+
+    def load(self, record_type, records):
+        model, remap = RECORD_TYPES[record_type]
+        table = model.__table__
+        columns = table.columns
+
+        own = remap.get('id') == record_type
+        if own:
+            new_ids = self.writer.reserve_ids(table, len(records))
+            self.ids[record_type].update((r['id'], new_id) for r, new_id in zip(records, new_ids))
+
+        rows = []
+        for record in records:
+            row = _coerce(columns, record)
+            try:
+                for name, target in remap.items():
+                    row[name] = self.ids[target][row[name]]
+            except KeyError as exc:
+                raise ValueError(f"{record_type} record refers to an unknown {name} {exc}") from None
+            for name in SCOPE_COLUMNS:
+                if name in columns:
+                    row[name] = getattr(self, name)
+            if record_type == 'register':
+                row['exercises_used'] = self._remap_exercises(row.get('exercises_used'))
+            rows.append(row)
+
+        if record_type == 'matrix' and self.bitmap:
+            for row in rows:
+                self._add_bitmap_cell(row)
+        else:
+            self.writer.insert(table, rows)
+        self.counts[record_type] = self.counts.get(record_type, 0) + len(rows)
+
+    def _remap_exercises(self, value):
+        # exercises_used is a comma-separated list of exercise ids
+        exercise_ids = self.ids['exercise']
+        mapped = []
+        for item in (value or '').split(','):
+            item = item.strip()
+            if item.isdigit() and int(item) in exercise_ids:
+                mapped.append(str(exercise_ids[int(item)]))
+        return ','.join(mapped)
+
+    def _add_bitmap_cell(self, row):
+        # Cells arrive grouped by tournament: pack each one when the next starts
+        if row['tournament_id'] != self._bitmap_tournament:
+            self.flush_bitmap()
+            self._bitmap_tournament = row['tournament_id']
+        key = (row['player_name'], row['opponent_name'], row['period'])
+        self._bitmap_cells[key] = bool(row['played'])
+
+    def flush_bitmap(self):
+        if not self._bitmap_cells:
+            return
+        players, opponents = [], []
+        for player, opponent, _ in self._bitmap_cells:
+            if player not in players:
+                players.append(player)
+            if opponent not in opponents:
+                opponents.append(opponent)
+        self.writer.insert(TournamentMatrixBitmapModel.__table__, [{
+            'tournament_id': self._bitmap_tournament,
+            'user_id': self.user_id,
+            'season_id': self.season_id,
+            'player_names': ','.join(players),
+            'opponent_names': ','.join(opponents),
+            'cells': BitmapMatrixStore.encode(players, opponents, self._bitmap_cells),
+        }])
+        self._bitmap_cells = {}
+
+
+def import_season_archive(lines, user_id, name=None, batch_size=ARCHIVE_BATCH_ROWS):
+    """Load an archive (iterable of NDJSON lines) as a new season of ``user_id``.
+
+    Everything happens in the current transaction; the caller commits (or
+    rolls back on error). Returns ``(season, counts)``.
+    """
+    lines = iter(lines)
+    try:
+        header = json.loads(next(lines))
+        season_record = json.loads(next(lines))
+    except (StopIteration, ValueError):
+        raise ValueError("Not a season archive") from None
+    if header.get('type') != 'archive' or season_record.get('type') != 'season':
+        raise ValueError("Not a season archive")
+    if header.get('format') != ARCHIVE_FORMAT:
+        raise ValueError(f"Unsupported archive format {header.get('format')}")
+
+    season = SeasonModel(user_id=user_id, name=name or season_record['name'], year=season_record.get('year'))
+    db.session.add(season)
+    db.session.flush()
+
+    importer = _SeasonImporter(user_id, season.id)
+    order = list(RECORD_TYPES)
+    current, batch, end = None, [], None
+
+    for number, line in enumerate(lines, start=3):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError:
+            raise ValueError(f"Line {number} is not valid JSON") from None
+        record_type = record.pop('type', None)
+
+        if record_type == 'end':
+            end = record
+            break
+        if record_type not in RECORD_TYPES:
+            raise ValueError(f"Line {number}: unknown record type '{record_type}'")
+        if current is not None and order.index(record_type) < order.index(current):
+            raise ValueError(f"Line {number}: '{record_type}' records must come before '{current}'")
+
+        if record_type != current or len(batch) >= batch_size:
+            if batch:
+                importer.load(current, batch)
+            current, batch = record_type, []
+        batch.append(record)
+
+    if end is None:
+        raise ValueError("Archive is truncated (no end record)")
+    if batch:
+        importer.load(current, batch)
+    importer.flush_bitmap()
+
+    expected = {k: v for k, v in end.get('counts', {}).items() if v}
+    if expected != importer.counts:
+        raise ValueError(f"Archive counts don't match: expected {expected}, loaded {importer.counts}")
+
+    refresh_aggregates(user_id, season.id, player_ids=importer.ids['player'].values())
+    bump_data_version(season.id)
+    current_app.logger.info("Imported season archive into season %s: %s", season.id, importer.counts)
+    return season, importer.counts
@@ -0,0 +1,200 @@
+import os
+import re
+import threading
+import time
+from collections import Counter
+
+from flask import before_render_template, g, has_request_context, request, template_rendered
+from sqlalchemy import event
+
+from .extensions import db
+from .query_plans import explain
+
+# Per-request SQL accounting.
+#
+# Cursor events count every statement a request runs and time it; the
+# totals go out as a Server-Timing header (visible in the browser's network
+# panel):
+#     Server-Timing: db;desc="7 queries";dur=3.1, app;dur=18.4
+# A streamed body (CSV exports, the report-card ZIP) runs most of its
+# queries after the headers are gone: its header only covers the time
+# before the body, and the full totals are logged when the stream ends.
+#
+# With SQL_REPEAT_THRESHOLD set (on by default in debug/testing), a
+# statement *shape* (literals and IN-lists collapsed) that runs more than
+# that many times in one request is reported as a probable N+1, naming the
+# route and the template being rendered at the time. SQL_REPEAT_ACTION is
+# "log" (default) or "raise" (RepeatedQueryError, for tests).
+#
+# Any statement slower than SLOW_QUERY_MS is logged with its parameters and
+# plan: plain EXPLAIN on PostgreSQL, EXPLAIN QUERY PLAN on SQLite.
+# SLOW_QUERY_EXPLAIN=analyze opts into EXPLAIN (ANALYZE, BUFFERS) for
+# SELECTs, which runs the slow query a second time. A statement shape is
+# explained at most once per SLOW_QUERY_EXPLAIN_INTERVAL seconds per
+# worker; SLOW_QUERY_EXPLAIN=off logs without plans.
+
+_LIST = re.compile(r'\((?:\s*(?:\?|%\(\w+\)s|%s|:\w+|\$\d+)\s*,)+\s*(?:\?|%\(\w+\)s|%s|:\w+|\$\d+)\s*\)')
+_NUMBER = re.compile(r'\b\d+\b')
+_WHITESPACE = re.compile(r'\s+')
+
+
+class RepeatedQueryError(RuntimeError):
+    pass
+
+
+def statement_shape(statement):
+    """Statement text with IN-lists, numbers and whitespace normalized."""
+    shape = _LIST.sub('(?)', statement)
+    shape = _NUMBER.sub('N', shape)
+    return _WHITESPACE.sub(' ', shape).strip()
+
+
+class SQLStats:
+    """Queries of the current request (``g.sql_stats``)."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.shapes = Counter()
+        self.template = None
+        self.reported = set()
+
+
+def current_sql_stats():
+    if not has_request_context():
+        return None
+    if 'sql_stats' not in g:
+        g.sql_stats = SQLStats()
+    return g.sql_stats
+
+
+class SQLInstrumentation:
+
+    def __init__(self, app=None):
+        self._explained = {}  # shape → monotonic time of its last EXPLAIN
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        testing = app.debug or app.testing
+        app.config.setdefault('SQL_SERVER_TIMING', True)
+        app.config.setdefault('SQL_REPEAT_THRESHOLD', 10 if testing else 0)  # 0 disables detection
+        app.config.setdefault('SQL_REPEAT_ACTION', 'log')
+        app.config.setdefault('SLOW_QUERY_MS', float(os.environ.get('SLOW_QUERY_MS', 500)))  # 0 disables the log
+        app.config.setdefault('SLOW_QUERY_EXPLAIN', os.environ.get('SLOW_QUERY_EXPLAIN', 'plan'))
+        app.config.setdefault('SLOW_QUERY_EXPLAIN_INTERVAL', int(os.environ.get('SLOW_QUERY_EXPLAIN_INTERVAL', 300)))
+        app.extensions['sql_instrumentation'] = self
+        self.app = app
+
+        with app.app_context():
+            for engine in db.engines.values():
+                event.listen(engine, 'before_cursor_execute', self._before_cursor_execute)
+                event.listen(engine, 'after_cursor_execute', self._after_cursor_execute)
+
+        app.before_request(self._start_request)
+        app.after_request(self._add_server_timing)
+        app.teardown_request(self._log_streamed_totals)
+        before_render_template.connect(self._template_started, app)
+        template_rendered.connect(self._template_finished, app)
+
+    @staticmethod
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('sql_started', []).append(time.perf_counter())
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info['sql_started'].pop()
+        slow_ms = self.app.config['SLOW_QUERY_MS']
+        if slow_ms and elapsed * 1000 >= slow_ms:
+            self._log_slow_query(conn, cursor, statement, parameters, executemany, elapsed)
+
+        stats = current_sql_stats()
+        if stats is None:
+            return
+        stats.count += 1
+        stats.duration += elapsed
+
+        threshold = self.app.config['SQL_REPEAT_THRESHOLD']
+        if not threshold:
+            return
+        shape = statement_shape(statement)
+        stats.shapes[shape] += 1
+        if stats.shapes[shape] > threshold and shape not in stats.reported:
+            stats.reported.add(shape)
+            self._report_repeat(stats, shape)
+
+    def _report_repeat(self, stats, shape):
+        message = (
+            f"Possible N+1: statement ran {stats.shapes[shape]} times in {request.method} {request.path} "
+            f"(endpoint {request.endpoint}, template {stats.template or '-'}): {shape[:300]}"
+        )
+        if self.app.config['SQL_REPEAT_ACTION'] == 'raise':
+            raise RepeatedQueryError(message)
+        self.app.logger.warning(message)
+
+    def _should_explain(self, shape):
+        interval = self.app.config['SLOW_QUERY_EXPLAIN_INTERVAL']
+        now = time.monotonic()
+        with self._lock:
+            if now - self._explained.get(shape, -interval) < interval:
+                return False
+            if len(self._explained) >= 1000:
+                self._explained.clear()
+            self._explained[shape] = now
+        return True
+
+    def _log_slow_query(self, conn, cursor, statement, parameters, executemany, elapsed):
+        where = f"{request.method} {request.path} ({request.endpoint})" if has_request_context() else "outside a request"
+        lines = [f"🐢 Slow query: {elapsed * 1000:.1f} ms in {where}", statement.strip(), f"params: {parameters!r:.1000}"]
+
+        mode = self.app.config['SLOW_QUERY_EXPLAIN']
+        if mode != 'off' and not executemany and self._should_explain(statement_shape(statement)):
+            try:
+                plan = explain(cursor.connection, conn.dialect.name, statement, parameters, analyze=mode == 'analyze')
+            except Exception as exc:
+                plan = [f"(EXPLAIN failed: {exc})"]
+            if plan:
+                lines.append("plan:")
+                lines.extend(f"  {line}" for line in plan)
+        self.app.logger.warning("\n".join(lines))
+
+    @staticmethod
+    def _template_started(sender, template, context, **extra):
+        stats = current_sql_stats()
+        if stats is not None:
+            stats.template = template.name
+
+    @staticmethod
+    def _template_finished(sender, template, context, **extra):
+        stats = current_sql_stats()
+        if stats is not None:
+            stats.template = None
+
+    @staticmethod
+    def _start_request():
+        g.request_started = time.perf_counter()
+
+    def _add_server_timing(self, response):
+        if not self.app.config['SQL_SERVER_TIMING'] or 'request_started' not in g:
+            return response
+        stats = current_sql_stats()
+        total = (time.perf_counter() - g.request_started) * 1000
+        # A streamed body runs its queries after this point: _log_streamed_totals reports them
+        g.sql_streamed = response.is_streamed
+        desc = f"{stats.count} queries before the body" if response.is_streamed else f"{stats.count} queries"
+        response.headers.add('Server-Timing', f'db;desc="{desc}";dur={stats.duration * 1000:.1f}, app;dur={total:.1f}')
+        return response
+
+    def _log_streamed_totals(self, exc):
+        # Streamed responses tear down once the body has been sent (stream_with_context)
+        if not g.pop('sql_streamed', False):
+            return
+        stats = current_sql_stats()
+        total = (time.perf_counter() - g.request_started) * 1000
+        self.app.logger.info(
+            "⏱️ Streamed %s %s (%s): %d queries, db %.1f ms, total %.1f ms",
+            request.method, request.path, request.endpoint, stats.count, stats.duration * 1000, total,
+        )
+
+
+sql_instrumentation = SQLInstrumentation()
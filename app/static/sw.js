@@ -0,0 +1,282 @@
+/* Team Manager service worker
+ *
+ * - Precaches the app shell (icons, CSS, Bootstrap, Chart.js). /sw.js injects
+ *   SHELL_URLS/ASSET_VERSION so the list follows `flask assets build` output.
+ * - Pages: network first, falling back to the last cached copy when offline.
+ * - Data POSTs (players, tournaments, practise; see QUEUEABLE) that fail
+ *   because the network is down are queued in IndexedDB with the user and
+ *   season they were made under, and replayed in order when connectivity
+ *   returns, but only while that same user and season are active. Logins,
+ *   season switches and file uploads are never queued. Logging out clears
+ *   the queue.
+ */
+const CACHE_VERSION = self.ASSET_VERSION || 'v1';
+const SHELL_CACHE = `shell-${CACHE_VERSION}`;
+const PAGE_CACHE = `pages-${CACHE_VERSION}`;
+
+const SHELL_URLS = self.SHELL_URLS || [
+  '/',
+  '/static/static.css',
+  '/static/manifest.webmanifest',
+  '/static/icons/favicon.svg',
+  '/static/icons/team-manager-icon.svg',
+  'https://cdn.jsdelivr.net/npm/bootstrap@5.3.3/dist/css/bootstrap.min.css',
+  'https://cdn.jsdelivr.net/npm/bootstrap@5.3.3/dist/js/bootstrap.bundle.min.js',
+  'https://cdn.jsdelivr.net/npm/chart.js'
+];
+
+// Pages worth keeping for offline use (tournament and practice screens)
+const OFFLINE_PAGES = [/^\/tournament\//, /^\/practise\//, /^\/players\/?$/, /^\/$/];
+
+// Writes that may be queued while offline (everything else just goes to the network)
+const QUEUEABLE = [/^\/players\//, /^\/tournament\//, /^\/practise\//];
+
+self.addEventListener('install', event => {
+  event.waitUntil(
+    caches.open(SHELL_CACHE).then(cache => cache.addAll(SHELL_URLS)).then(() => self.skipWaiting())
+  );
+});
+
+self.addEventListener('activate', event => {
+  event.waitUntil(
+    caches.keys()
+      .then(keys => Promise.all(
+        keys.filter(key => key !== SHELL_CACHE && key !== PAGE_CACHE).map(key => caches.delete(key))
+      ))
+      .then(() => self.clients.claim())
+      .then(replayQueue)
+  );
+});
+
+self.addEventListener('fetch', event => {
+  const request = event.request;
+  const url = new URL(request.url);
+
+  if (request.method !== 'GET') {
+    if (url.origin === self.location.origin && isQueueable(request, url)) {
+      event.respondWith(sendOrQueue(request));
+    }
+    return;
+  }
+
+  if (url.origin === self.location.origin && url.pathname.startsWith('/auth/logout')) {
+    // Don't leave another coach's pages or unsent changes on a shared device
+    event.respondWith(
+      Promise.all([caches.delete(PAGE_CACHE), clearQueue()]).then(() => fetch(request))
+    );
+    return;
+  }
+
+  if (request.mode === 'navigate') {
+    event.respondWith(networkFirst(request));
+    return;
+  }
+
+  event.respondWith(
+    caches.match(request).then(cached => cached || fetch(request))
+  );
+});
+
+async function networkFirst(request) {
+  const url = new URL(request.url);
+  try {
+    const response = await fetch(request);
+    if (response.ok && !response.redirected && OFFLINE_PAGES.some(re => re.test(url.pathname))) {
+      const cache = await caches.open(PAGE_CACHE);
+      cache.put(request, response.clone());
+    }
+    return response;
+  } catch (err) {
+    const cached = await caches.match(request, { ignoreSearch: false });
+    return cached || caches.match('/');
+  }
+}
+
+// ---- Offline POST queue -------------------------------------------------
+
+const DB_NAME = 'team-manager-offline';
+const STORE = 'requests';
+const META = 'meta';  // 'identity' → { user, season } of the open session, sent by every page
+
+function openQueue() {
+  return new Promise((resolve, reject) => {
+    const open = indexedDB.open(DB_NAME, 2);
+    open.onupgradeneeded = () => {
+      const db = open.result;
+      if (!db.objectStoreNames.contains(STORE)) {
+        db.createObjectStore(STORE, { keyPath: 'id', autoIncrement: true });
+      }
+      if (!db.objectStoreNames.contains(META)) {
+        db.createObjectStore(META);
+      }
+    };
+    open.onsuccess = () => resolve(open.result);
+    open.onerror = () => reject(open.error);
+  });
+}
+
+function queueTx(mode, fn, storeName = STORE) {
+  return openQueue().then(db => new Promise((resolve, reject) => {
+    const tx = db.transaction(storeName, mode);
+    const result = fn(tx.objectStore(storeName));
+    tx.oncomplete = () => resolve(result && result.result);
+    tx.onerror = () => reject(tx.error);
+  }));
+}
+
+function getIdentity() {
+  return queueTx('readonly', store => store.get('identity'), META);
+}
+
+function setIdentity(identity) {
+  return queueTx('readwrite', store => store.put(identity, 'identity'), META);
+}
+
+function clearQueue() {
+  return Promise.all([
+    queueTx('readwrite', store => store.clear()),
+    queueTx('readwrite', store => store.delete('identity'), META)
+  ]).then(notifyClients);
+}
+
+function isQueueable(request, url) {
+  const contentType = request.headers.get('Content-Type') || '';
+  return QUEUEABLE.some(re => re.test(url.pathname)) && !contentType.startsWith('multipart/');
+}
+
+function sameIdentity(item, identity) {
+  return identity && item.user === identity.user && item.season === identity.season;
+}
+
+async function sendOrQueue(request) {
+  const copy = request.clone();
+  const isNavigation = request.mode === 'navigate';
+  const identity = await getIdentity();
+  if (!identity || identity.user == null) {
+    return fetch(request);  // no known session to attach the change to: never queue it
+  }
+
+  // Older queued requests go first; if they can't be sent, this one waits behind them
+  await replayQueue();
+  const queued = (await queueTx('readonly', store => store.getAll())) || [];
+  const backlog = queued.filter(item => !item.rejected && sameIdentity(item, identity)).length;
+  if (!backlog) {
+    try {
+      return await fetch(request);
+    } catch (err) {
+      // offline: fall through and queue it
+    }
+  }
+
+  const entry = {
+    url: copy.url,
+    method: copy.method,
+    contentType: copy.headers.get('Content-Type'),
+    body: await copy.text(),  // urlencoded or JSON only; multipart is never queued
+    referrer: copy.referrer,
+    user: identity.user,
+    season: identity.season,
+    queuedAt: Date.now()
+  };
+  await queueTx('readwrite', store => store.add(entry));
+  if (self.registration.sync) {
+    self.registration.sync.register('replay-queue').catch(() => {});
+  }
+  notifyClients();
+
+  if (isNavigation) {
+    // Form post: go back to the (cached) page it came from
+    return Response.redirect(copy.referrer || '/', 303);
+  }
+  return new Response(JSON.stringify({ queued: true }), {
+    status: 202,
+    headers: { 'Content-Type': 'application/json' }
+  });
+}
+
+let replaying = null;
+
+function replayQueue() {
+  // One replay at a time so requests are sent strictly in queue order
+  if (!replaying) {
+    replaying = doReplay().finally(() => { replaying = null; });
+  }
+  return replaying;
+}
+
+async function doReplay() {
+  // Only the changes made under the session that is open now are sent; the
+  // rest wait until their user and season are active again.
+  const identity = await getIdentity();
+  const items = await queueTx('readonly', store => store.getAll());
+  let blocked = null;
+  for (const item of items || []) {
+    if (item.rejected || !sameIdentity(item, identity)) {
+      continue;
+    }
+    let response;
+    try {
+      response = await fetch(item.url, {
+        method: item.method,
+        headers: item.contentType ? { 'Content-Type': item.contentType } : {},
+        body: item.body,
+        credentials: 'same-origin'
+      });
+    } catch (err) {
+      break;  // still offline: keep this and later requests for the next attempt
+    }
+    const loginPage = response.redirected && new URL(response.url).pathname.startsWith('/auth/login');
+    if (loginPage || response.status === 401 || response.status === 403) {
+      blocked = 'login';  // session expired or not allowed: keep it until the coach logs in again
+      break;
+    }
+    if (response.status >= 500) {
+      break;
+    }
+    if (response.ok) {
+      await queueTx('readwrite', store => store.delete(item.id));
+    } else {
+      // Refused (400, 404, ...): keep it for the coach to see instead of dropping it silently
+      item.rejected = response.status;
+      await queueTx('readwrite', store => store.put(item));
+    }
+  }
+  notifyClients(blocked);
+}
+
+async function notifyClients(blocked = null) {
+  const identity = await getIdentity();
+  const items = (await queueTx('readonly', store => store.getAll())) || [];
+  const status = {
+    type: 'queue',
+    pending: items.filter(item => !item.rejected && sameIdentity(item, identity)).length,
+    held: items.filter(item => !item.rejected && !sameIdentity(item, identity)).length,
+    rejected: items.filter(item => item.rejected).length,
+    blocked: blocked
+  };
+  const clients = await self.clients.matchAll();
+  clients.forEach(client => client.postMessage(status));
+}
+
+self.addEventListener('sync', event => {
+  if (event.tag === 'replay-queue') {
+    event.waitUntil(replayQueue());
+  }
+});
+
+self.addEventListener('message', event => {
+  const data = event.data || {};
+  if (data.type === 'identity') {
+    // Every page reports the session it was rendered for
+    event.waitUntil(setIdentity({ user: data.user, season: data.season }).then(replayQueue));
+  } else if (data.type === 'replay') {
+    event.waitUntil(replayQueue());
+  } else if (data.type === 'discard-rejected') {
+    event.waitUntil(
+      queueTx('readwrite', store => store.getAll())
+        .then(items => Promise.all((items || []).filter(item => item.rejected)
+          .map(item => queueTx('readwrite', store => store.delete(item.id)))))
+        .then(() => notifyClients())
+    );
+  }
+});
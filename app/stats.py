@@ -0,0 +1,166 @@
+from collections import namedtuple
+
+from sqlalchemy import func
+
+from .extensions import db
+from .matrix_store import get_matrix_store
+from .models import (
+    PlayerModel,
+    PracticeRegisterModel,
+    PracticeAttendanceModel,
+    PlayerSeasonAggregateModel,
+)
+
+PlayerTotals = namedtuple(
+    'PlayerTotals',
+    ['game_minutes', 'games_played', 'practices_attended', 'practice_minutes'],
+)
+EMPTY_TOTALS = PlayerTotals(0, 0, 0, 0)
+
+
+def game_totals(user_id, season_id, player_names=None):
+    """player_name → (game_minutes, games_played) from the configured matrix store.
+
+    A game is a distinct (tournament, opponent) pair with at least one played period.
+    """
+    return get_matrix_store().game_totals(user_id, season_id, player_names)
+
+
+def practice_totals(user_id, season_id, player_ids=None):
+    """player_id → (practices_attended, practice_minutes), aggregated in SQL."""
+    a, r = PracticeAttendanceModel, PracticeRegisterModel
+    query = db.session.query(
+        a.player_id,
+        func.count(),
+        func.coalesce(func.sum(r.duration_minutes), 0),
+    ).join(
+        r, r.id == a.register_id
+    ).filter(
+        r.user_id == user_id,
+        r.season_id == season_id,
+    )
+    if player_ids is not None:
+        query = query.filter(a.player_id.in_(player_ids))
+
+    return {
+        player_id: (practices, minutes)
+        for player_id, practices, minutes in query.group_by(a.player_id)
+    }
+
+
+def season_totals(user_id, season_id, players):
+    """player name → PlayerTotals for the given roster (two grouped queries)."""
+    by_id = totals_by_player_id(user_id, season_id, players)
+    return {p.name: by_id[p.id] for p in players}
+
+
+def totals_by_player_id(user_id, season_id, players):
+    """player id → PlayerTotals; game stats are matched on the player's name."""
+    games = game_totals(user_id, season_id, [p.name for p in players])
+    practices = practice_totals(user_id, season_id, [p.id for p in players])
+
+    totals = {}
+    for p in players:
+        game_minutes, games_played = games.get(p.name, (0, 0))
+        attended, practice_minutes = practices.get(p.id, (0, 0))
+        totals[p.id] = PlayerTotals(
+            game_minutes=game_minutes,
+            games_played=games_played,
+            practices_attended=attended,
+            practice_minutes=int(practice_minutes),
+        )
+    return totals
+
+
+# --- PlayerSeasonAggregateModel read model -------------------------------
+# Write routes call refresh_aggregates() for the players they touched, before
+# their commit, so the aggregate lands in the same transaction as the write.
+
+
+def aggregate_totals(user_id, season_id, players):
+    """player name → PlayerTotals read from the aggregate table (O(players) rows)."""
+    by_id = aggregate_totals_by_player_id(user_id, season_id)
+    return {p.name: by_id.get(p.id, EMPTY_TOTALS) for p in players}
+
+
+def aggregate_totals_by_player_id(user_id, season_id):
+    rows = db.session.query(
+        PlayerSeasonAggregateModel.player_id,
+        PlayerSeasonAggregateModel.game_minutes,
+        PlayerSeasonAggregateModel.games_played,
+        PlayerSeasonAggregateModel.practices_attended,
+        PlayerSeasonAggregateModel.practice_minutes,
+    ).filter_by(user_id=user_id, season_id=season_id)
+    return {player_id: PlayerTotals(*values) for player_id, *values in rows}
+
+
+def refresh_aggregates(user_id, season_id, player_names=(), player_ids=()):
+    """Recompute aggregate rows for the affected players. Does not commit."""
+    player_names, player_ids = set(player_names), set(player_ids)
+    if not player_names and not player_ids:
+        return
+
+    players = PlayerModel.query.filter(
+        PlayerModel.user_id == user_id,
+        PlayerModel.season_id == season_id,
+        db.or_(PlayerModel.name.in_(player_names), PlayerModel.id.in_(player_ids)),
+    ).all()
+    _store_aggregates(user_id, season_id, players)
+
+
+def _store_aggregates(user_id, season_id, players):
+    if not players:
+        return
+    totals = totals_by_player_id(user_id, season_id, players)
+    existing = {
+        a.player_id: a
+        for a in PlayerSeasonAggregateModel.query.filter(
+            PlayerSeasonAggregateModel.season_id == season_id,
+            PlayerSeasonAggregateModel.player_id.in_([p.id for p in players]),
+        )
+    }
+    for p in players:
+        row = existing.get(p.id)
+        if row is None:
+            row = PlayerSeasonAggregateModel(player_id=p.id, season_id=season_id, user_id=user_id)
+            db.session.add(row)
+        t = totals[p.id]
+        row.game_minutes = t.game_minutes
+        row.games_played = t.games_played
+        row.practices_attended = t.practices_attended
+        row.practice_minutes = t.practice_minutes
+
+
+def _season_rosters():
+    """(user_id, season_id) → players, for every season in the database."""
+    rosters = {}
+    for p in PlayerModel.query.order_by(PlayerModel.user_id, PlayerModel.season_id, PlayerModel.id):
+        rosters.setdefault((p.user_id, p.season_id), []).append(p)
+    return rosters
+
+
+def rebuild_aggregates():
+    """Drop and recompute the whole aggregate table. Returns rows written."""
+    PlayerSeasonAggregateModel.query.delete()
+    written = 0
+    for (user_id, season_id), players in _season_rosters().items():
+        _store_aggregates(user_id, season_id, players)
+        written += len(players)
+    db.session.commit()
+    return written
+
+
+def verify_aggregates():
+    """Compare the aggregate table with a full recompute.
+
+    Returns a list of ``(player_id, season_id, stored, expected)`` mismatches.
+    """
+    mismatches = []
+    for (user_id, season_id), players in _season_rosters().items():
+        stored = aggregate_totals_by_player_id(user_id, season_id)
+        expected = totals_by_player_id(user_id, season_id, players)
+        for p in players:
+            row = stored.get(p.id, EMPTY_TOTALS)
+            if row != expected[p.id]:
+                mismatches.append((p.id, season_id, row, expected[p.id]))
+    return mismatches
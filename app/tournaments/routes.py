@@ -1,13 +1,24 @@
-from flask import Blueprint, render_template, request, redirect, session, flash
+from flask import Blueprint, render_template, request, redirect, session, flash, make_response, jsonify
 from flask_login import login_required, current_user
-from app.models import TournamentModel, TournamentMatrixModel, PlayerModel
+from app.models import TournamentModel, PlayerModel, TournamentPlayerModel, TournamentOpponentModel
 from app.extensions import db
+from app.roster import sync_tournament_links, delete_tournament_links
+from app.stats import refresh_aggregates
+from app.data_version import bump_data_version
+from app.identity import season_roster
+from app.aggregate_cache import aggregate_cache
+from app.conditional import conditional_get
+from app.matrix_store import get_matrix_store, PERIODS, MINUTES_PER_PERIOD
 from flask import url_for
 
 tournaments_bp = Blueprint('tournaments', __name__, url_prefix='/tournament')
 
+# How many open matrix pages per session keep a replay-protection seq
+MATRIX_SEQ_CLIENTS = 10
+
 @tournaments_bp.route('/tournaments', methods=['GET', 'POST'])
 @login_required
+@conditional_get
 def manage_tournaments():
 
     season_id=session.get('season_id')
@@ -15,12 +26,8 @@ def manage_tournaments():
     if not season_id:
         return redirect(url_for('season.manage_seasons'))  # or return a default response
     
-    raw_players = PlayerModel.query.filter_by(user_id=current_user.id, season_id=season_id).all()
-    all_players = sorted(
-    [{"name": p.name, "alias": p.alias or p.name} for p in raw_players],
-    key=lambda x: x["alias"].lower())
-
-    alias_lookup = {p.name: (p.alias or p.name) for p in raw_players}
+    all_players = season_roster()  # sorted by alias
+    alias_lookup = {p.name: p.alias for p in all_players}
 
     if request.method == 'POST':
         opponents = [
@@ -42,6 +49,9 @@ def manage_tournaments():
             coach_notes=request.form.get('coach_notes', '')
         )
         db.session.add(tournament)
+        db.session.flush()
+        sync_tournament_links(tournament)
+        bump_data_version(season_id)
         db.session.commit()
         return redirect(url_for('tournaments.manage_tournaments', open='form'))
 
@@ -51,6 +61,7 @@ def manage_tournaments():
 
 @tournaments_bp.route('/<int:tournament_id>', methods=['GET', 'POST'])
 @login_required
+@conditional_get
 def tournament_detail(tournament_id):
 
     season_id=session.get('season_id')
@@ -64,80 +75,60 @@ def tournament_detail(tournament_id):
     if tournament.user_id != current_user.id or tournament.season_id != season_id:
         return "⛔️ Unauthorized", 403
  
-    #players = [p.strip() for p in tournament.players.split(',') if p.strip()]
-    
-    # Get player objects with names in tournament.players
-    player_names = [p.strip() for p in tournament.players.split(',') if p.strip()]
-    player_objs = PlayerModel.query.filter(
-        PlayerModel.user_id == current_user.id,
-        PlayerModel.season_id == season_id,
-        PlayerModel.name.in_(player_names)
-    ).all()
+    # Roster via the tournament_player link table (roster order preserved)
+    player_objs = PlayerModel.query.join(
+        TournamentPlayerModel, TournamentPlayerModel.player_id == PlayerModel.id
+    ).filter(
+        TournamentPlayerModel.tournament_id == tournament_id
+    ).order_by(TournamentPlayerModel.position).all()
 
     # Create a mapping: player name → alias
-    players = [
-        {"name": p.name, "alias": p.alias or p.name}
-        for p in sorted(player_objs, key=lambda x: player_names.index(x.name))  # preserve order
-    ]
+    players = [{"name": p.name, "alias": p.alias or p.name} for p in player_objs]
 
-    opponents = [op.strip() for op in tournament.opponents.split(',') if op.strip()]
-    periods = [1, 2, 3, 4]
+    opponents = [
+        o.name for o in TournamentOpponentModel.query.filter_by(
+            tournament_id=tournament_id
+        ).order_by(TournamentOpponentModel.position)
+    ]
+    periods = list(PERIODS)
+    store = get_matrix_store()
 
     if request.method == 'POST':
-        existing_entries = TournamentMatrixModel.query.filter_by(
-            tournament_id=tournament_id,
-            season_id=season_id,
-            user_id=current_user.id,
-        ).all()
-        existing_lookup = {
-            (m.opponent_name, m.period, m.player_name): m
-            for m in existing_entries
-        }
-
+        cells = {}
         for opponent in opponents:
             for period in periods:
                 for player in players:
                     field_name = f"{opponent}_{period}_{player['name']}".replace(" ", "_")
-                    played = request.form.get(field_name) == "on"
-
-                    key = (opponent, period, player['name'])
-                    matrix_entry = existing_lookup.get(key)
-                    if matrix_entry is None:
-                        matrix_entry = TournamentMatrixModel(
-                            tournament_id=tournament_id,
-                            user_id=current_user.id,
-                            season_id=season_id,
-                            player_name=player['name'],
-                            opponent_name=opponent,
-                            period=period,
-                        )
-                        db.session.add(matrix_entry)
-
-                    matrix_entry.played = played
+                    cells[(player['name'], opponent, period)] = request.form.get(field_name) == "on"
 
+        changed = store.save_cells(tournament, cells)
+        if changed:
+            refresh_aggregates(current_user.id, season_id, player_names=[p['name'] for p in players])
+            bump_data_version(season_id)
         db.session.commit()
-        return redirect(f'/tournament/{tournament_id}')
 
-    # Preload existing matrix data
-    existing_matrix = {
-        f"{m.opponent_name}_{m.period}_{m.player_name}".replace(" ", "_"): m.played
-        for m in TournamentMatrixModel.query.filter_by(
-            tournament_id=tournament_id,
-            season_id=season_id,
-            user_id=current_user.id,
-        ).all()
-    }
-
-    # Stats summary
-    from collections import defaultdict
-    stats = defaultdict(int)
-    for entry in TournamentMatrixModel.query.filter_by(
-        tournament_id=tournament_id,
-        season_id=season_id,
-        user_id=current_user.id,
-    ).all():
-        if entry.played:
-            stats[entry.player_name.strip()] += 6  # 6 minutes per period
+        flash(f'✅ {changed} matrix cells updated', 'success')
+        response = make_response(redirect(f'/tournament/{tournament_id}'))
+        response.headers['X-Matrix-Cells-Changed'] = str(changed)
+        return response
+
+    # Grid + stats summary, cached until the season's next write
+    def compute():
+        cells = store.load_cells(tournament)
+        matrix = {
+            f"{opponent}_{period}_{player}".replace(" ", "_"): played
+            for (player, opponent, period), played in cells.items()
+        }
+        stats = {}
+        for (player, _, _), played in cells.items():
+            if played:
+                stats[player] = stats.get(player, 0) + MINUTES_PER_PERIOD
+        return matrix, stats
+
+    existing_matrix, stats = aggregate_cache.get_or_compute(
+        'tournament-matrix', current_user.id, season_id, compute,
+        {'tournament_id': tournament.id, 'storage': store.name},
+    )
 
     return render_template("tournament_detail.html",
                            tournament=tournament,
@@ -147,8 +138,71 @@ def tournament_detail(tournament_id):
                            matrix=existing_matrix,
                            stats=stats)
 
+@tournaments_bp.route('/<int:tournament_id>/matrix/cells', methods=['POST'])
+@login_required
+def update_matrix_cells(tournament_id):
+    """Apply a batch of cell toggles from the courtside grid.
+
+    Body: ``{"client": "<page id>", "seq": 7, "changes": [{"player": "...", "opponent": "...", "period": 2, "played": true}]}``.
+    ``seq`` increases per flush on each page; batches at or below the last seq applied
+    for that page are acknowledged without being re-applied (safe retries).
+    """
+    season_id = session.get('season_id')
+    if not season_id:
+        return jsonify(error='No season selected'), 400
+
+    tournament = TournamentModel.query.get_or_404(tournament_id)
+    if tournament.user_id != current_user.id or tournament.season_id != season_id:
+        return jsonify(error='Unauthorized'), 403
+
+    payload = request.get_json(silent=True) or {}
+    try:
+        seq = int(payload.get('seq', 0))
+    except (TypeError, ValueError):
+        return jsonify(error='Invalid seq'), 400
+
+    roster = {p.name for p in PlayerModel.query.join(
+        TournamentPlayerModel, TournamentPlayerModel.player_id == PlayerModel.id
+    ).filter(TournamentPlayerModel.tournament_id == tournament_id)}
+    opponents = {o.name for o in TournamentOpponentModel.query.filter_by(tournament_id=tournament_id)}
+
+    cells = {}
+    for change in payload.get('changes') or []:
+        try:
+            key = (change['player'], change['opponent'], int(change['period']))
+        except (KeyError, TypeError, ValueError):
+            return jsonify(error='Invalid change'), 400
+        if key[0] not in roster or key[1] not in opponents or key[2] not in PERIODS:
+            return jsonify(error=f'Unknown cell {key}'), 400
+        cells[key] = bool(change.get('played'))  # last toggle in the batch wins
+
+    applied_seqs = session.get('matrix_seq', {})
+    seq_key = f"{tournament_id}:{str(payload.get('client', ''))[:36]}"
+    last_seq = applied_seqs.pop(seq_key, 0)
+
+    store = get_matrix_store()
+    changed = 0
+    if seq > last_seq:
+        changed = store.save_cells(tournament, cells)
+        if changed:
+            refresh_aggregates(current_user.id, season_id, player_names={player for player, _, _ in cells})
+            bump_data_version(season_id)
+        db.session.commit()
+
+    # Remember the last applied seq for the most recent pages only
+    applied_seqs[seq_key] = max(seq, last_seq)
+    session['matrix_seq'] = dict(list(applied_seqs.items())[-MATRIX_SEQ_CLIENTS:])
+
+    minutes = {name: 0 for name in roster}
+    for (player, _, _), played in store.load_cells(tournament).items():
+        if played:
+            minutes[player] = minutes.get(player, 0) + MINUTES_PER_PERIOD
+
+    return jsonify(seq=max(seq, last_seq), applied=seq > last_seq, changed=changed, minutes=minutes)
+
 @tournaments_bp.route('/edit/<int:tournament_id>', methods=['GET', 'POST'])
 @login_required
+@conditional_get
 def edit_tournament(tournament_id):
 
     season_id=session.get('season_id')
@@ -162,10 +216,7 @@ def edit_tournament(tournament_id):
     if tournament.user_id != current_user.id or tournament.season_id != season_id:
         return "⛔️ Unauthorized", 403
     
-    raw_players = PlayerModel.query.filter_by(user_id=current_user.id, season_id=season_id).all()
-    all_players = sorted(
-    [{"name": p.name, "alias": p.alias or p.name} for p in raw_players],
-    key=lambda x: x["alias"].lower())
+    all_players = season_roster()
 
     if request.method == 'POST':
         tournament.date = request.form['date']
@@ -174,6 +225,8 @@ def edit_tournament(tournament_id):
         tournament.opponents = ','.join([request.form.get(f'opponent{i}') for i in range(1, 7) if request.form.get(f'opponent{i}')])
         tournament.players = ','.join(request.form.getlist('players'))
         tournament.coach_notes = request.form.get('coach_notes', '')
+        sync_tournament_links(tournament)
+        bump_data_version(season_id)
         db.session.commit()
         return redirect(f'/tournament/{tournament_id}')
 
@@ -201,17 +254,15 @@ def delete_matrix_player(tournament_id):
 
     player_name = (request.form.get('player_name') or '').strip()
     if player_name:
-        TournamentMatrixModel.query.filter_by(
-            tournament_id=tournament_id,
-            season_id=season_id,
-            user_id=current_user.id,
-            player_name=player_name,
-        ).delete()
+        get_matrix_store().delete_player(tournament, player_name)
+        refresh_aggregates(current_user.id, season_id, player_names=[player_name])
 
         # Also remove from tournament roster so UI no longer shows it
         current_players = [p.strip() for p in (tournament.players or '').split(',') if p.strip()]
         updated_players = [p for p in current_players if p != player_name]
         tournament.players = ','.join(updated_players)
+        sync_tournament_links(tournament)
+        bump_data_version(season_id)
 
         db.session.commit()
         flash('✅ Player removed from matrix', 'success')
@@ -235,17 +286,17 @@ def delete_matrix_opponent(tournament_id):
 
     opponent_name = (request.form.get('opponent_name') or '').strip()
     if opponent_name:
-        TournamentMatrixModel.query.filter_by(
-            tournament_id=tournament_id,
-            season_id=season_id,
-            user_id=current_user.id,
-            opponent_name=opponent_name,
-        ).delete()
+        store = get_matrix_store()
+        affected = store.player_names(tournament, opponent_name=opponent_name)
+        store.delete_opponent(tournament, opponent_name)
+        refresh_aggregates(current_user.id, season_id, player_names=affected)
 
         # Also remove from tournament opponents so UI no longer shows it
         current_opponents = [o.strip() for o in (tournament.opponents or '').split(',') if o.strip()]
         updated_opponents = [o for o in current_opponents if o != opponent_name]
         tournament.opponents = ','.join(updated_opponents)
+        sync_tournament_links(tournament)
+        bump_data_version(season_id)
 
         db.session.commit()
         flash('✅ Opponent removed from matrix', 'success')
@@ -270,6 +321,7 @@ def update_coach_notes(tournament_id):
         return "⛔️ Unauthorized", 403         
    
     tournament.coach_notes = request.form.get('coach_notes', '')
+    bump_data_version(season_id)
     db.session.commit()
     return redirect(url_for('tournaments.tournament_detail', tournament_id=tournament_id))
 
@@ -288,8 +340,13 @@ def delete_tournament(tournament_id):
         return "⛔ Unauthorized", 403
 
     # 🧼 First delete all related tournament matrix rows manually
-    TournamentMatrixModel.query.filter_by(tournament_id=tournament_id, season_id=season_id).delete()
+    store = get_matrix_store()
+    affected = store.player_names(tournament)
+    store.delete_tournament(tournament)
+    delete_tournament_links(tournament_id)
 
     db.session.delete(tournament)
+    refresh_aggregates(current_user.id, season_id, player_names=affected)
+    bump_data_version(season_id)
     db.session.commit()
     return redirect(url_for('tournaments.manage_tournaments'))
@@ -0,0 +1,88 @@
+# Gunicorn settings for production (`gunicorn -c gunicorn.conf.py wsgi:app`).
+# Every value can be overridden through the environment.
+import os
+import shutil
+import tempfile
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '10000')}"
+
+
+def _available_cpus():
+    """CPUs this process may use: its affinity set, capped by a cgroup v2 CPU quota."""
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:  # macOS
+        cpus = os.cpu_count() or 1
+    try:
+        with open('/sys/fs/cgroup/cpu.max') as f:
+            quota, period = f.read().split()
+        if quota != 'max':
+            cpus = min(cpus, max(1, int(quota) // int(period)))
+    except (OSError, ValueError):
+        pass
+    return cpus
+
+
+# 🧵 Threaded workers: a coach waiting on a long PDF render only blocks one
+# thread, not a whole process. Processes scale with CPUs, threads with I/O,
+# so one worker per available core (container quota included) is enough.
+# Each worker also owns up to EXPORT_JOB_WORKERS + EXPORT_BATCH_WORKERS
+# WeasyPrint renderer processes (1 + 2 by default, app/export_jobs.py): a
+# host runs up to WEB_CONCURRENCY × 4 Python processes. Size memory for that.
+worker_class = 'gthread'
+workers = int(os.environ.get('WEB_CONCURRENCY', _available_cpus()))
+threads = int(os.environ.get('GUNICORN_THREADS', 4))
+
+# 📦 Load create_app(), WeasyPrint and ReportLab once in the master so the
+# workers share those pages copy-on-write instead of importing them each.
+preload_app = os.environ.get('GUNICORN_PRELOAD', '1') == '1'
+
+# ♻️ Recycle workers periodically to cap memory growth from PDF rendering;
+# the jitter keeps them from all restarting at the same moment.
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 1000))
+max_requests_jitter = int(os.environ.get('GUNICORN_MAX_REQUESTS_JITTER', 100))
+
+# ⏱️ Large PDF exports can take a while; don't kill the worker mid-render.
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 120))
+graceful_timeout = int(os.environ.get('GUNICORN_GRACEFUL_TIMEOUT', 30))
+keepalive = int(os.environ.get('GUNICORN_KEEPALIVE', 5))
+
+accesslog = '-'
+errorlog = '-'
+loglevel = os.environ.get('GUNICORN_LOG_LEVEL', 'info')
+
+# 📈 Each worker writes its Prometheus samples here so /metrics can sum them.
+# Must be set before the app (and prometheus_client) is imported.
+os.environ.setdefault('PROMETHEUS_MULTIPROC_DIR', os.path.join(tempfile.gettempdir(), 'team-manager-metrics'))
+
+
+def on_starting(server):
+    # Samples left over from a previous run would be added to the new ones
+    metrics_dir = os.environ['PROMETHEUS_MULTIPROC_DIR']
+    shutil.rmtree(metrics_dir, ignore_errors=True)
+    os.makedirs(metrics_dir, exist_ok=True)
+
+
+def post_fork(server, worker):
+    # Database connections opened in the master during preload must not be
+    # shared between processes: give every worker its own pool.
+    from app.extensions import db
+
+    from app.export_jobs import export_jobs
+
+    app = server.app.wsgi()
+    with app.app_context():
+        db.engine.dispose(close=False)
+
+    # Export dispatchers are threads: start this worker's own, so queued jobs
+    # are picked up right away rather than on the first enqueue or poll
+    export_jobs.start()
+
+
+def child_exit(server, worker):
+    # Drop the live gauges of a recycled worker
+    try:
+        from prometheus_client import multiprocess
+    except ImportError:
+        return
+    multiprocess.mark_process_dead(worker.pid)
@@ -0,0 +1,54 @@
+import os
+from types import SimpleNamespace
+
+import pytest
+
+os.environ.setdefault('DATABASE_URL', 'sqlite://')
+os.environ.setdefault('AGGREGATE_CACHE', 'none')
+
+from app import create_app  # noqa: E402
+from app.extensions import db  # noqa: E402
+from app.identity import identity_cache  # noqa: E402
+from app.models import UserModel, SeasonModel  # noqa: E402
+
+
+@pytest.fixture
+def app(tmp_path):
+    # No app context stays pushed: every test request must get its own ``g``
+    app = create_app()
+    app.config.update(
+        TESTING=True,
+        EXPORT_CACHE_DIR=str(tmp_path / 'exports'),
+        PROFILER_DIR=str(tmp_path / 'profiles'),
+        IDENTITY_CACHE_TTL=0,
+    )
+    with app.app_context():
+        db.create_all()
+    yield app
+    identity_cache.clear()  # module-level, shared by every app
+    with app.app_context():
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def make_season(app):
+    """Factory: a new coach with an empty season, as ``(user_id, id)``."""
+    def make_season(username):
+        with app.app_context():
+            user = UserModel(username=username, email=f'{username}@example.com', password_hash='-')
+            db.session.add(user)
+            db.session.flush()
+            season = SeasonModel(user_id=user.id, name='2025/2026')
+            db.session.add(season)
+            db.session.commit()
+            return SimpleNamespace(user_id=user.id, id=season.id)
+    return make_season
+
+
+def login(client, season):
+    """Log the test client in as the season's coach, with the season selected."""
+    with client.session_transaction() as sess:
+        sess['_user_id'] = str(season.user_id)
+        sess['_fresh'] = True
+        sess['season_id'] = season.id
@@ -0,0 +1,43 @@
+from datetime import datetime, timedelta, timezone
+
+from werkzeug.http import http_date
+
+from tests.conftest import login
+
+
+def test_etag_round_trip(app, make_season):
+    client = app.test_client()
+    login(client, make_season('coach'))
+
+    first = client.get('/players/')
+    assert first.status_code == 200 and first.headers['ETag'].startswith('W/')
+    assert 'Last-Modified' not in first.headers
+
+    again = client.get('/players/', headers={'If-None-Match': first.headers['ETag']})
+    assert again.status_code == 304
+
+    # Another locale is another page
+    other = client.get('/players/?lang=pt', headers={'If-None-Match': first.headers['ETag']})
+    assert other.status_code == 200
+
+
+def test_if_modified_since_alone_is_not_enough(app, make_season):
+    client = app.test_client()
+    login(client, make_season('coach'))
+
+    future = http_date(datetime.now(timezone.utc) + timedelta(days=1))
+    assert client.get('/players/', headers={'If-Modified-Since': future}).status_code == 200
+
+
+def test_practice_register_is_not_conditional(app, make_season):
+    # Its default window moves with the date, not with the season's data
+    client = app.test_client()
+    login(client, make_season('coach'))
+    assert 'ETag' not in client.get('/practise/practice-register').headers
+
+
+def test_release_is_the_same_in_every_process(app, monkeypatch):
+    # Each gunicorn worker (or host) builds its own app; their ETags must agree
+    monkeypatch.delenv('RELEASE', raising=False)
+    from app import create_app
+    assert create_app().config['RELEASE'] == app.config['RELEASE']
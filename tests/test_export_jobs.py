@@ -0,0 +1,46 @@
+import shutil
+from datetime import datetime, timedelta
+
+from app.export_jobs import export_jobs
+from app.extensions import db
+from app.models import ExportJobModel, PlayerModel
+from tests.conftest import login
+
+
+def test_cache_hit_job_keeps_only_the_cache_key(app, make_season):
+    season = make_season('coach')
+    with app.app_context():
+        db.session.add(PlayerModel(user_id=season.user_id, season_id=season.id, name='Ana'))
+        db.session.commit()
+
+    client = app.test_client()
+    login(client, season)
+    job = client.post('/export/jobs', data={'kind': 'players_pdf', 'engine': 'reportlab'}).get_json()
+    assert job['status'] == 'done'
+    with app.app_context():
+        stored = db.session.get(ExportJobModel, job['id'])
+        assert stored.result is None and stored.cache_key
+
+    response = client.get(job['download_url'])
+    assert response.status_code == 200 and response.data.startswith(b'%PDF')
+
+    shutil.rmtree(app.config['EXPORT_CACHE_DIR'])
+    assert client.get(job['download_url']).status_code == 410
+
+
+def test_housekeeping_is_throttled(app, make_season):
+    season = make_season('coach')
+    old = datetime.utcnow() - timedelta(seconds=app.config['EXPORT_JOB_RETENTION'] + 60)
+    with app.app_context():
+        export_jobs._next_housekeeping = 0
+        export_jobs._housekeeping()  # runs: nothing to expire yet
+
+        db.session.add(ExportJobModel(user_id=season.user_id, season_id=season.id, kind='players_pdf',
+                                      filename='x.pdf', status='done', created_at=old))
+        db.session.commit()
+        export_jobs._housekeeping()  # within the interval: skipped
+        assert ExportJobModel.query.count() == 1
+
+        export_jobs._next_housekeeping = 0
+        export_jobs._housekeeping()
+        assert ExportJobModel.query.count() == 0
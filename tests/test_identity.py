@@ -0,0 +1,21 @@
+from app.data_version import bump_data_version
+from app.extensions import db
+from app.identity import identity_cache
+from app.models import SeasonModel
+
+
+def test_cached_season_follows_data_version(app, make_season):
+    season = make_season('coach')
+    app.config['IDENTITY_CACHE_TTL'] = 30
+
+    with app.test_request_context():
+        assert identity_cache.load_season(season.user_id, season.id).name == '2025/2026'
+
+    # Another worker renames the season: its cache isn't reachable from here
+    with app.app_context():
+        db.session.get(SeasonModel, season.id).name = 'Renamed'
+        bump_data_version(season.id)
+        db.session.commit()
+
+    with app.test_request_context():
+        assert identity_cache.load_season(season.user_id, season.id).name == 'Renamed'
@@ -0,0 +1,17 @@
+import pytest
+
+pytest.importorskip('prometheus_client')
+
+
+def test_metrics_needs_a_token_outside_debug(app):
+    client = app.test_client()
+    assert client.get('/metrics').status_code == 200  # testing
+
+    app.config['TESTING'] = False
+    assert client.get('/metrics').status_code == 404
+
+    app.config['METRICS_TOKEN'] = 'secret'
+    assert client.get('/metrics').status_code == 401
+    response = client.get('/metrics', headers={'Authorization': 'Bearer secret'})
+    assert response.status_code == 200
+    assert b'teammanager_http_request_duration_seconds' in response.data
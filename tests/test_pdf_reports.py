@@ -0,0 +1,37 @@
+import base64
+import re
+import zlib
+from datetime import datetime
+
+from flask import render_template
+
+from app.extensions import db
+from app.models import PlayerModel
+from tests.conftest import login
+
+
+def _page_text(pdf):
+    """Content streams of a ReportLab PDF, inflated (ReportLab stores them ASCII85 + Flate)."""
+    text = b''
+    for stream in re.findall(rb'/Filter \[ /ASCII85Decode /FlateDecode \].*?stream\r?\n(.*?)endstream', pdf, re.S):
+        text += zlib.decompress(base64.a85decode(stream.strip().removesuffix(b'~>'), ignorechars=b' \t\n\r'))
+    return text
+
+
+def test_roster_title_names_the_selected_season(app, make_season):
+    season = make_season('coach')  # "2025/2026"
+    with app.app_context():
+        db.session.add(PlayerModel(user_id=season.user_id, season_id=season.id, name='Ana'))
+        db.session.commit()
+
+    client = app.test_client()
+    login(client, season)
+    job = client.post('/export/jobs', data={'kind': 'players_summary_pdf', 'engine': 'reportlab'}).get_json()
+    text = _page_text(client.get(job['download_url']).data)
+    assert b'Team Roster' in text and b'2025/2026' in text
+    assert b'2024/2025' not in text
+
+    with app.test_request_context():
+        html = render_template('players_summary.html', players=[], logo_data=None,
+                               season_name='2025/2026', now=datetime.now())
+    assert 'Team Roster – 2025/2026' in html
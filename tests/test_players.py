@@ -0,0 +1,28 @@
+from app.data_version import data_version
+from app.extensions import db
+from app.models import PlayerModel, PlayerSeasonStatsModel
+from tests.conftest import login
+
+
+def test_opening_an_evaluation_writes_nothing(app, make_season):
+    season = make_season('coach')
+    with app.app_context():
+        player = PlayerModel(user_id=season.user_id, season_id=season.id, name='Ana')
+        db.session.add(player)
+        db.session.commit()
+        player_id, version = player.id, data_version(season.id)
+
+    client = app.test_client()
+    login(client, season)
+    url = f'/players/player/{player_id}/season-stats'
+    first = client.get(url)
+    assert first.status_code == 200
+    assert client.get(url, headers={'If-None-Match': first.headers['ETag']}).status_code == 304
+    with app.app_context():
+        assert data_version(season.id) == version
+        assert PlayerSeasonStatsModel.query.count() == 0
+
+    assert client.post(url, data={'behavior': 'Good'}).status_code == 302
+    with app.app_context():
+        assert PlayerSeasonStatsModel.query.one().behavior == 'Good'
+        assert data_version(season.id) != version
@@ -0,0 +1,22 @@
+from tests.conftest import login
+
+
+def test_profiles_are_scoped_to_their_user(app, make_season):
+    app.config['PROFILER_ENABLED'] = True
+    coach, other, admin = make_season('coach'), make_season('other'), make_season('admin')
+    app.config['PROFILER_USERS'] = {'admin'}
+
+    client = app.test_client()
+    login(client, coach)
+    profile_id = client.get('/players/', headers={'X-Profile': '1'}).headers['X-Profile-Id']
+    download = f'/admin/profiles/{profile_id}.pstats'
+    assert [p['id'] for p in client.get('/admin/profiles').get_json()] == [profile_id]
+    assert client.get(download).status_code == 200
+
+    login(client, other)
+    assert client.get('/admin/profiles').get_json() == []
+    assert client.get(download).status_code == 403
+
+    login(client, admin)
+    assert [p['id'] for p in client.get('/admin/profiles').get_json()] == [profile_id]
+    assert client.get(download).status_code == 200
@@ -0,0 +1,81 @@
+from datetime import date, timedelta
+
+import pytest
+from flask import g
+
+from app.export_jobs import WEASYPRINT_AVAILABLE
+from app.extensions import db
+from app.matrix_store import get_matrix_store
+from app.models import PlayerModel, PlayerSeasonStatsModel, PracticeRegisterModel, TournamentModel
+from app.roster import sync_register_links, sync_tournament_links
+from app.stats import refresh_aggregates
+from tests.conftest import login
+
+ROSTER = 4
+
+# Routes that walk the whole roster; each must run the same number of
+# queries whether the season has ROSTER or 10 × ROSTER players.
+HOT_ROUTES = [
+    '/players/',
+    '/dashboard/dashboard-totals',
+    '/dashboard/dashboard-minutes',
+    '/export/export/players/pdf-html?engine=reportlab',
+    '/export/export/players/pdf-summary?engine=reportlab',
+    pytest.param('/export/export/players/pdf-html?engine=weasyprint',
+                 marks=pytest.mark.skipif(not WEASYPRINT_AVAILABLE, reason="WeasyPrint not installed")),
+    '/export/totals/csv',
+]
+
+
+def seed_roster(app, season, players):
+    """``players`` players with an evaluation, two practices and a played tournament."""
+    with app.app_context():
+        _seed_roster(season, players)
+
+
+def _seed_roster(season, players):
+    roster = [PlayerModel(user_id=season.user_id, season_id=season.id, name=f'Player {n:03d}')
+              for n in range(players)]
+    db.session.add_all(roster)
+    db.session.flush()
+    db.session.add_all(PlayerSeasonStatsModel(player_id=p.id, season_id=season.id, behavior='Good')
+                       for p in roster)
+
+    for day in range(2):
+        register = PracticeRegisterModel(user_id=season.user_id, season_id=season.id, duration_minutes=90,
+                                         date=date(2025, 10, 1) + timedelta(days=day),
+                                         players_present=','.join(p.name for p in roster))
+        db.session.add(register)
+        db.session.flush()
+        sync_register_links(register)
+
+    tournament = TournamentModel(user_id=season.user_id, season_id=season.id, date='2025-10-05',
+                                 place='Home', team_name='Team', opponents='A,B',
+                                 players=','.join(p.name for p in roster))
+    db.session.add(tournament)
+    db.session.flush()
+    sync_tournament_links(tournament)
+    get_matrix_store().save_cells(tournament, {
+        (p.name, opponent, period): True for p in roster for opponent in ('A', 'B') for period in (1, 2)
+    })
+    refresh_aggregates(season.user_id, season.id, player_ids=[p.id for p in roster])
+    db.session.commit()
+
+
+def query_count(app, season, url):
+    client = app.test_client()
+    login(client, season)
+    with client:
+        response = client.get(url)
+        response.get_data()
+        assert response.status_code == 200, response.status_code
+        return g.sql_stats.count
+
+
+@pytest.mark.parametrize('url', HOT_ROUTES)
+def test_query_count_does_not_grow_with_roster(app, make_season, url):
+    small, large = make_season('small'), make_season('large')
+    seed_roster(app, small, ROSTER)
+    seed_roster(app, large, 10 * ROSTER)
+
+    assert query_count(app, large, url) == query_count(app, small, url)
@@ -0,0 +1,45 @@
+import pytest
+
+from app import create_app
+from app.extensions import db
+from app.query_plans import HOT_QUERIES, check_hot_queries, seed_plan_dataset, sequential_scans
+
+
+@pytest.fixture(scope='module')
+def plans():
+    """{query name: (plan, full scans)} over a seeded dataset, as `flask check-query-plans` sees it.
+
+    Runs against DATABASE_URL (SQLite in memory unless set), so pointing it
+    at a PostgreSQL scratch database checks the production planner.
+    """
+    app = create_app()
+    with app.app_context():
+        db.create_all()  # tables and model indexes
+        try:
+            yield check_hot_queries(seed_plan_dataset())
+        finally:
+            db.session.rollback()
+            db.drop_all()
+
+
+@pytest.mark.parametrize('name', HOT_QUERIES)
+def test_hot_query_uses_an_index(plans, name):
+    plan, scans = plans[name]
+    assert plan, f"no plan for {name!r} on this database"
+    assert not scans, '\n'.join(plan)
+
+
+def test_sequential_scans():
+    assert sequential_scans([
+        'Sort  (cost=10.1..10.2 rows=25 width=72)',
+        '  ->  Seq Scan on player_model  (cost=0.00..9.5 rows=25 width=72)',
+    ]) == {'player_model'}
+    assert sequential_scans([
+        'Index Scan using ix_player_model_user_season on player_model  (cost=0.28..8.3 rows=25)',
+    ]) == set()
+    assert sequential_scans(['SCAN tournament_model']) == {'tournament_model'}
+    assert sequential_scans([
+        'SEARCH player_model USING INDEX ix_player_model_user_season (user_id=? AND season_id=?)',
+        'SCAN practice_register_model USING COVERING INDEX ix_practice_register_user_season_date',
+        'USE TEMP B-TREE FOR ORDER BY',
+    ]) == set()
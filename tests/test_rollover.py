@@ -0,0 +1,39 @@
+from sqlalchemy import func, select
+
+from app.extensions import db
+from app.models import PlayerModel, PlayerSeasonStatsModel, PracticeExerciseModel, SeasonModel
+from app.rollover import ROLLOVER_ENTITIES, rollover_season
+
+
+def _count(model, season_id):
+    return db.session.scalar(select(func.count()).select_from(model).where(model.season_id == season_id))
+
+
+def test_rollover_can_be_rerun(app, make_season):
+    source = make_season('coach')
+    with app.app_context():
+        for n in range(3):
+            player = PlayerModel(user_id=source.user_id, season_id=source.id, name=f'Player {n}')
+            db.session.add(player)
+            db.session.flush()
+            db.session.add(PlayerSeasonStatsModel(player_id=player.id, season_id=source.id, behavior='-'))
+        db.session.add_all([
+            PracticeExerciseModel(user_id=source.user_id, season_id=source.id, category='Passing',
+                                  execution_description='Rondo'),
+            PracticeExerciseModel(user_id=source.user_id, season_id=source.id, category='Passing',
+                                  execution_description=None),
+            PracticeExerciseModel(user_id=source.user_id, season_id=source.id, category='Shooting',
+                                  execution_description='Rondo'),
+        ])
+        target = SeasonModel(user_id=source.user_id, name='2026/2027')
+        db.session.add(target)
+        db.session.commit()
+
+        first = rollover_season(source.user_id, source.id, target.id, ROLLOVER_ENTITIES)
+        assert first == {'players': 3, 'exercises': 3, 'evaluations': 3}
+
+        again = rollover_season(source.user_id, source.id, target.id, ROLLOVER_ENTITIES)
+        assert again == {'players': 0, 'exercises': 0, 'evaluations': 0}
+        assert _count(PlayerModel, target.id) == 3
+        assert _count(PracticeExerciseModel, target.id) == 3
+        assert _count(PlayerSeasonStatsModel, target.id) == 3
@@ -0,0 +1,25 @@
+import logging
+
+from flask import Response, stream_with_context
+
+from app.extensions import db
+
+
+def test_streamed_body_queries_are_accounted(app, caplog):
+    app.config['SQL_REPEAT_THRESHOLD'] = 10
+    @app.route('/test-stream')
+    def stream():
+        def generate():
+            for n in range(12):
+                db.session.execute(db.select(db.literal(n))).scalar()
+                yield f'{n}\n'
+        return Response(stream_with_context(generate()), mimetype='text/csv')
+
+    with caplog.at_level(logging.INFO, logger=app.logger.name):
+        response = app.test_client().get('/test-stream')
+        assert response.data.count(b'\n') == 12
+
+    assert 'queries before the body' in response.headers['Server-Timing']
+    messages = [record.getMessage() for record in caplog.records]
+    assert any(m.startswith('Possible N+1: statement ran 11 times in GET /test-stream') for m in messages)
+    assert any(m.startswith('⏱️ Streamed GET /test-stream (stream): 12 queries') for m in messages)